@@ -0,0 +1,110 @@
+"""Compara a varredura linear do catálogo com as consultas pelo CatalogIndex.
+
+Para catálogos grandes, os treinos são gerados como tuplas leves com os
+mesmos atributos usados pelas estratégias, evitando o custo de instanciar
+milhões de models.
+
+Uso:
+    python -m benchmarks.catalog_index [--tamanhos N [N ...]] [--repeticoes N]
+"""
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+django.setup()
+
+from recommendation.strategies import (  # noqa: E402
+    CatalogIndex,
+    CalorieBasedStrategy,
+    GoalBasedStrategy,
+    BeginnerFriendlyStrategy,
+)
+from recommendation.strategies.base import MAX_RECOMENDACOES, top_k  # noqa: E402
+from benchmarks.synthetic import gerar_workouts_leves  # noqa: E402
+
+
+META_CALORICA = 2600.0
+
+
+def consultas_lineares(workouts):
+    return [
+        top_k(
+            (w for w in workouts
+             if w.intensidade in ['media', 'alta'] and w.calorias_estimadas >= 250),
+            MAX_RECOMENDACOES,
+            key=lambda w: -w.calorias_estimadas
+        ),
+        top_k(
+            (w for w in workouts
+             if w.intensidade in ['baixa', 'media'] and w.duracao_minutos <= 45),
+            MAX_RECOMENDACOES,
+            key=lambda w: (w.intensidade == 'baixa', -w.duracao_minutos),
+            reverse=True
+        ),
+        top_k(
+            workouts,
+            MAX_RECOMENDACOES,
+            key=lambda w: abs(w.calorias_estimadas - META_CALORICA * 0.2)
+        ),
+    ]
+
+
+def consultas_indexadas(index):
+    goal = GoalBasedStrategy()
+    beginner = BeginnerFriendlyStrategy()
+    calorie = CalorieBasedStrategy()
+    return [
+        goal._selecionar_treinos_por_objetivo(index, 'emagrecer'),
+        beginner._selecionar_treinos_iniciantes(index),
+        calorie._selecionar_treinos_por_calorias(index, META_CALORICA),
+    ]
+
+
+class _CatalogoIndexado(list):
+    """Lista de treinos com o índice já construído, como um WorkoutCatalog."""
+    
+    def __init__(self, workouts):
+        super().__init__(workouts)
+        self._index = CatalogIndex(self)
+    
+    def derive(self, key, builder):
+        return self._index
+
+
+def medir(funcao, repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+    
+    print(f'{"Treinos":>10}{"índice (s)":>14}{"linear (ms)":>14}{"indexado (ms)":>16}{"speedup":>10}')
+    
+    for tamanho in args.tamanhos:
+        workouts = gerar_workouts_leves(tamanho)
+        
+        inicio = time.perf_counter()
+        catalogo = _CatalogoIndexado(workouts)
+        construcao = time.perf_counter() - inicio
+        
+        assert consultas_lineares(workouts) == consultas_indexadas(catalogo)
+        
+        linear = medir(lambda: consultas_lineares(workouts), args.repeticoes)
+        indexado = medir(lambda: consultas_indexadas(catalogo), args.repeticoes)
+        print(
+            f'{tamanho:>10}{construcao:>14.3f}{linear * 1000:>14.3f}'
+            f'{indexado * 1000:>16.3f}{linear / indexado:>9.0f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
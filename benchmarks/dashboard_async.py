@@ -0,0 +1,159 @@
+"""Compara o dashboard síncrono com o assíncrono sob carga concorrente.
+
+Popula um banco SQLite temporário com usuários e históricos sintéticos e
+dispara requisições concorrentes aos dois dashboards: o síncrono pelo
+handler WSGI, com uma thread por cliente, e o assíncrono pelo handler
+ASGI, com uma tarefa por cliente no mesmo event loop.
+
+Uso:
+    python -m benchmarks.dashboard_async [--users N] [--workouts N]
+        [--concorrencia N] [--requisicoes N]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+os.environ.setdefault(
+    'BENCHMARK_DATABASE', 
+    os.path.join(tempfile.mkdtemp(prefix='fitrecommend-'), 'dashboard.sqlite3')
+)
+django.setup()
+
+from django.contrib.auth.models import User as AuthUser  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import AsyncClient, Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from recommendation.models import History, Preferences, User, Workout  # noqa: E402
+from benchmarks.synthetic import gerar_users, gerar_workouts  # noqa: E402
+
+
+def popular_banco(quantidade_users: int, quantidade_workouts: int, registros: int = 20) -> list:
+    """Cria o schema e grava usuários, treinos, preferências e históricos.
+    
+    Returns:
+        Usuários de autenticação correspondentes aos usuários da aplicação.
+    """
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    
+    workouts = Workout.objects.bulk_create(gerar_workouts(quantidade_workouts))
+    users = gerar_users(quantidade_users)
+    preferencias = []
+    for user in users:
+        preferencia = getattr(user, 'preferencias', None)
+        if preferencia is not None:
+            preferencia.usuario = user
+            preferencias.append(preferencia)
+    User.objects.bulk_create(users)
+    Preferences.objects.bulk_create(preferencias)
+    
+    hoje = date.today()
+    History.objects.bulk_create(
+        History(
+            usuario=user, 
+            treino=workouts[(user.id * 31 + i) % len(workouts)], 
+            data=hoje - timedelta(days=i)
+        )
+        for user in users
+        for i in range(registros)
+    )
+    return [
+        AuthUser.objects.create_user(f'bench{user.id}', user.email, 'senha-bench')
+        for user in users
+    ]
+
+
+def aquecer(auth_users: list) -> None:
+    """Faz uma requisição por cliente antes das medições.
+    
+    Carrega o catálogo e calcula as estatísticas dos usuários, para que
+    nenhum dos dois dashboards pague esse custo na medição.
+    """
+    client = Client()
+    for auth_user in auth_users:
+        client.force_login(auth_user)
+        client.get(reverse('recommendation:home'))
+    connections.close_all()
+
+
+def resumir(nome: str, latencias: list, duracao: float) -> None:
+    p50, p95 = (statistics.quantiles(latencias, n=100)[i] * 1000 for i in (49, 94))
+    print(
+        f'{nome:<12}{len(latencias):>10}{duracao:>10.2f}'
+        f'{len(latencias) / duracao:>10.1f}{p50:>10.1f}{p95:>10.1f}'
+    )
+
+
+def medir_sincrono(auth_users: list, requisicoes: int) -> None:
+    url = reverse('recommendation:home')
+    
+    def cliente(auth_user) -> list:
+        client = Client()
+        client.force_login(auth_user)
+        latencias = []
+        try:
+            for _ in range(requisicoes):
+                inicio = time.perf_counter()
+                assert client.get(url).status_code == 200
+                latencias.append(time.perf_counter() - inicio)
+        finally:
+            connections.close_all()
+        return latencias
+    
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(auth_users)) as executor:
+        resultados = list(executor.map(cliente, auth_users))
+    resumir('sync', [t for latencias in resultados for t in latencias], time.perf_counter() - inicio)
+
+
+async def medir_assincrono(auth_users: list, requisicoes: int) -> None:
+    url = reverse('recommendation:home_async')
+    
+    async def cliente(auth_user) -> list:
+        client = AsyncClient()
+        await client.aforce_login(auth_user)
+        latencias = []
+        for _ in range(requisicoes):
+            inicio = time.perf_counter()
+            assert (await client.get(url)).status_code == 200
+            latencias.append(time.perf_counter() - inicio)
+        return latencias
+    
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*(cliente(auth_user) for auth_user in auth_users))
+    resumir('async', [t for latencias in resultados for t in latencias], time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--workouts', type=int, default=500)
+    parser.add_argument('--concorrencia', type=int, default=16)
+    parser.add_argument('--requisicoes', type=int, default=20)
+    args = parser.parse_args()
+    
+    auth_users = popular_banco(args.users, args.workouts)[:args.concorrencia]
+    aquecer(auth_users)
+    
+    print(f'Banco: {os.environ["BENCHMARK_DATABASE"]}')
+    print(
+        f'Clientes concorrentes: {len(auth_users)} | '
+        f'Requisições por cliente: {args.requisicoes}'
+    )
+    print(f'{"Dashboard":<12}{"reqs":>10}{"total (s)":>10}{"req/s":>10}{"p50 (ms)":>10}{"p95 (ms)":>10}')
+    
+    medir_sincrono(auth_users, args.requisicoes)
+    asyncio.run(medir_assincrono(auth_users, args.requisicoes))
+
+
+if __name__ == '__main__':
+    main()
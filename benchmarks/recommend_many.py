@@ -0,0 +1,57 @@
+"""Compara ``recommend_many`` com o loop ingênuo sobre ``recommend``.
+
+Uso:
+    python -m benchmarks.recommend_many [--workouts N] [--users N]
+"""
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+django.setup()
+
+from recommendation.strategies import (  # noqa: E402
+    CalorieBasedStrategy,
+    GoalBasedStrategy,
+    BeginnerFriendlyStrategy,
+    HybridStrategy,
+    VectorizedHybridStrategy,
+)
+from benchmarks.synthetic import gerar_workouts, gerar_users  # noqa: E402
+
+
+def medir(funcao) -> float:
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workouts', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=1000)
+    args = parser.parse_args()
+    
+    workouts = gerar_workouts(args.workouts)
+    users = gerar_users(args.users)
+    
+    print(f'Catálogo: {len(workouts)} treinos | Lote: {len(users)} usuários')
+    print(f'{"Estratégia":<28}{"loop (s)":>12}{"lote (s)":>12}{"speedup":>10}')
+    
+    for strategy in [
+        CalorieBasedStrategy(),
+        GoalBasedStrategy(),
+        BeginnerFriendlyStrategy(),
+        HybridStrategy(),
+        VectorizedHybridStrategy(),
+    ]:
+        loop = medir(lambda: [strategy.recommend(u, workouts) for u in users])
+        lote = medir(lambda: strategy.recommend_many(users, workouts))
+        nome = type(strategy).__name__
+        print(f'{nome:<28}{loop:>12.3f}{lote:>12.3f}{loop / lote:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Compara a pontuação híbrida por comparações encadeadas com as regras compiladas.
+
+Pontua o catálogo inteiro para uma amostra de usuários sintéticos e
+seleciona os 3 melhores treinos, como a HybridStrategy. Os treinos são
+gerados como tuplas leves, evitando o custo de instanciar models.
+
+Uso:
+    python -m benchmarks.scoring [--tamanhos N [N ...]] [--users N]
+"""
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+django.setup()
+
+from recommendation.strategies.base import MAX_RECOMENDACOES, top_k  # noqa: E402
+from recommendation.strategies.scoring_rules import ScoringRules  # noqa: E402
+from benchmarks.synthetic import gerar_users, gerar_workouts_leves  # noqa: E402
+
+
+def pontuar_encadeado(workout, user) -> float:
+    """Regra de pontuação original, avaliada treino a treino."""
+    score = 0.0
+    
+    if user.nivel == 'iniciante':
+        if workout.intensidade == 'baixa':
+            score += 3.0
+        elif workout.intensidade == 'media':
+            score += 1.5
+    elif user.nivel == 'intermediario':
+        if workout.intensidade == 'media':
+            score += 3.0
+        elif workout.intensidade in ['baixa', 'alta']:
+            score += 1.5
+    else:
+        if workout.intensidade == 'alta':
+            score += 3.0
+        elif workout.intensidade == 'media':
+            score += 1.5
+    
+    if user.objetivo == 'emagrecer':
+        score += workout.calorias_estimadas / 100
+    elif user.objetivo == 'ganhar_massa':
+        if workout.intensidade == 'alta':
+            score += 2.0
+    
+    if hasattr(user, 'preferencias'):
+        if workout.duracao_minutos <= 30 and user.preferencias.frequencia_treino_semana >= 5:
+            score += 1.0
+        elif workout.duracao_minutos >= 45 and user.preferencias.frequencia_treino_semana <= 3:
+            score += 1.0
+    
+    return score
+
+
+def recomendar_encadeado(workouts, users):
+    return [
+        top_k(workouts, MAX_RECOMENDACOES, key=lambda w: -pontuar_encadeado(w, user))
+        for user in users
+    ]
+
+
+def recomendar_compilado(regras, workouts, users):
+    resultados = []
+    for user in users:
+        pontuar = regras.scorer(user)
+        resultados.append(top_k(workouts, MAX_RECOMENDACOES, key=lambda w: -pontuar(w)))
+    return resultados
+
+
+def medir(funcao) -> float:
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--users', type=int, default=20)
+    args = parser.parse_args()
+    
+    users = gerar_users(args.users)
+    regras = ScoringRules()
+    
+    print(f'{"Treinos":>10}{"encadeado (ms)":>16}{"compilado (ms)":>16}{"speedup":>10}')
+    
+    for tamanho in args.tamanhos:
+        workouts = gerar_workouts_leves(tamanho)
+        
+        assert recomendar_encadeado(workouts, users) == recomendar_compilado(
+            regras, workouts, users
+        )
+        
+        encadeado = medir(lambda: recomendar_encadeado(workouts, users)) / len(users)
+        compilado = medir(lambda: recomendar_compilado(regras, workouts, users)) / len(users)
+        print(
+            f'{tamanho:>10}{encadeado * 1000:>16.3f}{compilado * 1000:>16.3f}'
+            f'{encadeado / compilado:>9.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
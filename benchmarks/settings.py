@@ -0,0 +1,18 @@
+"""Settings para execução dos benchmarks.
+
+Reutiliza as configurações do projeto com um banco SQLite em memória,
+já que a camada de estratégias é medida sem acesso ao banco de dados.
+Benchmarks que acessam o banco a partir de várias threads apontam
+``BENCHMARK_DATABASE`` para um arquivo.
+"""
+
+import os
+
+from workout_project.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.getenv("BENCHMARK_DATABASE", ":memory:"),
+    }
+}
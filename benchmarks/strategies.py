@@ -0,0 +1,184 @@
+"""Suíte de benchmarks das estratégias de recomendação.
+
+Mede, para cada tamanho de catálogo, o tempo de ``recommend`` (primeira
+chamada, que constrói as estruturas derivadas do catálogo, e chamadas
+seguintes) e de ``recommend_many``, além do pico de memória via
+tracemalloc. Os resultados são emitidos em JSON para comparação entre
+commits. Roda sem rede e sem banco de dados.
+
+Uso:
+    python -m benchmarks.strategies [--tamanhos N [N ...]] [--users N]
+        [--lote N] [--leve] [--saida arquivo.json]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+django.setup()
+
+from recommendation.catalog import WorkoutCatalog  # noqa: E402
+from recommendation.metabolic_profile import metabolic_profiles  # noqa: E402
+from recommendation.strategies import (  # noqa: E402
+    CalorieBasedStrategy,
+    GoalBasedStrategy,
+    BeginnerFriendlyStrategy,
+    HybridStrategy,
+    VectorizedHybridStrategy,
+)
+from recommendation.strategies.vectorized_hybrid_strategy import np  # noqa: E402
+from benchmarks.synthetic import gerar_workouts, gerar_workouts_leves, gerar_users  # noqa: E402
+
+
+TAMANHOS_PADRAO = [1000, 10000, 100000, 1000000]
+
+
+def estrategias():
+    lista = [
+        CalorieBasedStrategy(),
+        GoalBasedStrategy(),
+        BeginnerFriendlyStrategy(),
+        HybridStrategy(),
+    ]
+    if np is not None:
+        lista.append(VectorizedHybridStrategy())
+    return lista
+
+
+def medir(funcao):
+    """Executa a função uma vez e retorna o tempo decorrido em segundos."""
+    gc.collect()
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def medir_memoria(funcao) -> int:
+    """Executa a função sob tracemalloc e retorna o pico de memória em bytes."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def medir_estrategia(strategy, workouts, users, lote):
+    """Mede as operações de uma estratégia sobre um catálogo.
+    
+    ``recommend_primeira`` usa um snapshot novo do catálogo e inclui a
+    construção das estruturas derivadas (índices, colunas); ``recommend``
+    mede chamadas seguintes sobre um snapshot já aquecido.
+    
+    Returns:
+        Lista de registros, um por operação medida.
+    """
+    def novo_catalogo():
+        metabolic_profiles.clear()
+        return WorkoutCatalog(0, workouts)
+    
+    def aquecido():
+        catalogo = novo_catalogo()
+        strategy.recommend(users[0], catalogo)
+        return catalogo
+    
+    operacoes = [
+        ('recommend_primeira', 1, novo_catalogo,
+         lambda c: strategy.recommend(users[0], c)),
+        ('recommend', len(users), aquecido,
+         lambda c: [strategy.recommend(user, c) for user in users]),
+        ('recommend_many', len(lote), novo_catalogo,
+         lambda c: strategy.recommend_many(lote, c)),
+    ]
+    
+    registros = []
+    for nome, quantidade, preparar, executar in operacoes:
+        catalogo = preparar()
+        segundos = medir(lambda: executar(catalogo))
+        catalogo = preparar()
+        pico = medir_memoria(lambda: executar(catalogo))
+        registros.append({
+            'estrategia': type(strategy).__name__,
+            'operacao': nome,
+            'usuarios': quantidade,
+            'segundos': round(segundos, 6),
+            'ms_por_usuario': round(segundos * 1000 / quantidade, 4),
+            'pico_memoria_bytes': pico,
+        })
+    return registros
+
+
+def identificar_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO)
+    parser.add_argument('--users', type=int, default=20, help='Usuários medidos com recommend')
+    parser.add_argument('--lote', type=int, default=1000, help='Usuários medidos com recommend_many')
+    parser.add_argument(
+        '--leve',
+        action='store_true',
+        help='Gera o catálogo como tuplas leves em vez de models (recomendado para 1M)'
+    )
+    parser.add_argument('--saida', help='Arquivo JSON de saída (padrão: stdout)')
+    args = parser.parse_args()
+    
+    lote = gerar_users(max(args.users, args.lote))
+    users = lote[:args.users]
+    lote = lote[:args.lote]
+    gerar = gerar_workouts_leves if args.leve else gerar_workouts
+    
+    resultados = []
+    for tamanho in args.tamanhos:
+        workouts = gerar(tamanho)
+        for strategy in estrategias():
+            for registro in medir_estrategia(strategy, workouts, users, lote):
+                registro['tamanho_catalogo'] = tamanho
+                resultados.append(registro)
+                print(
+                    f"{tamanho:>9} {registro['estrategia']:<26}{registro['operacao']:<20}"
+                    f"{registro['ms_por_usuario']:>12.3f} ms/usuário"
+                    f"{registro['pico_memoria_bytes'] / 1024:>12.0f} KiB",
+                    file=sys.stderr
+                )
+        del workouts
+    
+    relatorio = {
+        'commit': identificar_commit(),
+        'executado_em': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__ if np is not None else None,
+        'catalogo': 'leve' if args.leve else 'models',
+        'resultados': resultados,
+    }
+    
+    saida = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(saida + '\n')
+    else:
+        print(saida)
+
+
+if __name__ == '__main__':
+    main()
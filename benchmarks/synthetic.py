@@ -0,0 +1,103 @@
+import random
+from collections import namedtuple
+from decimal import Decimal
+from typing import List
+from recommendation.models import User, Workout, Preferences
+
+
+INTENSIDADES = ['baixa', 'media', 'alta']
+OBJETIVOS = ['emagrecer', 'ganhar_massa', 'manter']
+NIVEIS = ['iniciante', 'intermediario', 'avancado']
+TIPOS_TREINO = [tipo for tipo, _ in Preferences.TIPO_TREINO_CHOICES]
+
+TreinoLeve = namedtuple(
+    'TreinoLeve', ['id', 'pk', 'intensidade', 'duracao_minutos', 'calorias_estimadas']
+)
+
+
+def gerar_workouts(quantidade: int, seed: int = 42) -> List[Workout]:
+    """Gera um catálogo sintético de treinos sem persistir no banco.
+    
+    Args:
+        quantidade: Número de treinos a gerar.
+        seed: Semente do gerador pseudoaleatório.
+        
+    Returns:
+        Lista de treinos com IDs sequenciais.
+    """
+    rng = random.Random(seed)
+    workouts = []
+    for i in range(quantidade):
+        intensidade = rng.choice(INTENSIDADES)
+        duracao = rng.randint(15, 90)
+        workouts.append(Workout(
+            id=i + 1,
+            nome=f'Treino {i + 1}',
+            descricao='Treino sintético',
+            intensidade=intensidade,
+            duracao_minutos=duracao,
+            calorias_estimadas=duracao * rng.randint(4, 13)
+        ))
+    return workouts
+
+
+def gerar_workouts_leves(quantidade: int, seed: int = 42) -> List[TreinoLeve]:
+    """Gera o mesmo catálogo de ``gerar_workouts`` como tuplas leves.
+    
+    As tuplas têm apenas os atributos usados pelas estratégias, permitindo
+    catálogos de milhões de treinos sem o custo de instanciar models.
+    
+    Args:
+        quantidade: Número de treinos a gerar.
+        seed: Semente do gerador pseudoaleatório.
+        
+    Returns:
+        Lista de treinos leves com IDs sequenciais.
+    """
+    rng = random.Random(seed)
+    treinos = []
+    for i in range(quantidade):
+        intensidade = rng.choice(INTENSIDADES)
+        duracao = rng.randint(15, 90)
+        treinos.append(TreinoLeve(
+            i + 1, i + 1, intensidade, duracao, duracao * rng.randint(4, 13)
+        ))
+    return treinos
+
+
+def gerar_users(quantidade: int, seed: int = 7) -> List[User]:
+    """Gera usuários sintéticos com preferências, sem persistir no banco.
+    
+    Cerca de 10% dos usuários são gerados sem preferências; a ausência
+    fica registrada no cache da relação para que nenhuma consulta seja
+    feita ao banco.
+    
+    Args:
+        quantidade: Número de usuários a gerar.
+        seed: Semente do gerador pseudoaleatório.
+        
+    Returns:
+        Lista de usuários com IDs sequenciais.
+    """
+    rng = random.Random(seed)
+    users = []
+    for i in range(quantidade):
+        user = User(
+            id=i + 1,
+            nome=f'Usuário {i + 1}',
+            email=f'user{i + 1}@bench.local',
+            idade=rng.randint(18, 70),
+            peso=Decimal(rng.randint(4500, 12000)) / 100,
+            altura=rng.randint(150, 200),
+            objetivo=rng.choice(OBJETIVOS),
+            nivel=rng.choice(NIVEIS)
+        )
+        if rng.random() >= 0.1:
+            user.preferencias = Preferences(
+                frequencia_treino_semana=rng.randint(1, 7),
+                tipo_treino_preferido=rng.choice(TIPOS_TREINO)
+            )
+        else:
+            User.preferencias.related.set_cached_value(user, None)
+        users.append(user)
+    return users
@@ -1,5 +1,16 @@
 from django.contrib import admin
-from .models import User, Workout, Preferences, History
+from .models import (
+    User,
+    Workout,
+    Preferences,
+    History,
+    WorkoutCooccurrence,
+    PrecomputedRecommendation,
+    ShadowEvaluation,
+    UserStats,
+    WeeklyHistoryRollup,
+    MonthlyHistoryRollup
+)
 
 
 @admin.register(User)
@@ -30,3 +41,44 @@ class HistoryAdmin(admin.ModelAdmin):
     list_filter = ('data',)
     search_fields = ('usuario__nome',)
     ordering = ('-data',)
+
+
+@admin.register(PrecomputedRecommendation)
+class PrecomputedRecommendationAdmin(admin.ModelAdmin):
+    list_display = ('usuario', 'estrategia', 'versao_catalogo', 'calculado_em')
+    list_filter = ('estrategia',)
+    search_fields = ('usuario__nome',)
+    ordering = ('-calculado_em',)
+
+
+@admin.register(WorkoutCooccurrence)
+class WorkoutCooccurrenceAdmin(admin.ModelAdmin):
+    list_display = ('treino_a', 'treino_b', 'contagem')
+    search_fields = ('treino_a__nome', 'treino_b__nome')
+    ordering = ('-contagem',)
+
+
+@admin.register(ShadowEvaluation)
+class ShadowEvaluationAdmin(admin.ModelAdmin):
+    list_display = (
+        'usuario', 'estrategia', 'estrategia_primaria', 'coincidentes', 'duracao_ms', 'criado_em'
+    )
+    list_filter = ('estrategia', 'estrategia_primaria')
+    search_fields = ('usuario__nome',)
+    ordering = ('-criado_em',)
+
+
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        'usuario', 'sessoes', 'minutos', 'calorias', 'ultimo_treino', 'sequencia_atual', 'atualizado_em'
+    )
+    search_fields = ('usuario__nome',)
+    ordering = ('-sessoes',)
+
+
+@admin.register(WeeklyHistoryRollup, MonthlyHistoryRollup)
+class HistoryRollupAdmin(admin.ModelAdmin):
+    list_display = ('usuario', 'inicio', 'sessoes', 'minutos', 'calorias')
+    search_fields = ('usuario__nome',)
+    ordering = ('-inicio',)
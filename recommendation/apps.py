@@ -1,5 +1,6 @@
 from django.apps import AppConfig
 from django.contrib.auth import get_user_model
+from django.db.utils import OperationalError, ProgrammingError
 
 
 class RecommendationConfig(AppConfig):
@@ -7,6 +8,11 @@ class RecommendationConfig(AppConfig):
     name = "recommendation"
 
     def ready(self):
+        from . import signals  # noqa: F401
+
         User = get_user_model()
-        if not User.objects.filter(username='admin').exists():
-            User.objects.create_superuser('admin', '', 'admin')
+        try:
+            if not User.objects.filter(username='admin').exists():
+                User.objects.create_superuser('admin', '', 'admin')
+        except (OperationalError, ProgrammingError):
+            pass
@@ -0,0 +1,158 @@
+import hashlib
+import threading
+import time
+from collections.abc import Sequence
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, List
+from django.core.cache import cache
+from .repositories import WorkoutRepository
+
+
+CATALOG_VERSION_CACHE_KEY = 'recommendation:catalog_version'
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+class WorkoutCatalog(Sequence):
+    """Snapshot imutável do catálogo de treinos em uma versão específica.
+    
+    Compartilhado por todas as requisições do processo enquanto a versão
+    do catálogo não muda. Pode ser passado diretamente às estratégias no
+    lugar da lista de treinos, e memoriza estruturas derivadas (índices,
+    colunas, tabelas) para que sejam construídas uma única vez por versão.
+    
+    Os treinos do snapshot não devem ser alterados pelos consumidores.
+    """
+    
+    def __init__(self, version: int, workouts: Iterable):
+        self._version = version
+        self._workouts = tuple(workouts)
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+    
+    @property
+    def version(self) -> int:
+        return self._version
+    
+    @property
+    def workouts(self) -> tuple:
+        return self._workouts
+    
+    def __len__(self) -> int:
+        return len(self._workouts)
+    
+    def __getitem__(self, index):
+        return self._workouts[index]
+    
+    def __iter__(self):
+        return iter(self._workouts)
+    
+    @cached_property
+    def fingerprint(self) -> str:
+        """Fingerprint persistente do conteúdo deste snapshot."""
+        return catalog_fingerprint(self._workouts)
+    
+    @cached_property
+    def by_id(self) -> Dict[int, Any]:
+        """Mapa de ID para treino."""
+        return {w.pk: w for w in self._workouts}
+    
+    def derive(self, key: str, builder: Callable[[tuple], Any]) -> Any:
+        """Retorna uma estrutura derivada do catálogo, construindo-a uma vez.
+        
+        Args:
+            key: Nome da estrutura derivada.
+            builder: Função que recebe os treinos e constrói a estrutura.
+            
+        Returns:
+            Estrutura memorizada para esta versão do catálogo.
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        
+        with self._derived_lock:
+            if key not in self._derived:
+                self._derived[key] = builder(self._workouts)
+            return self._derived[key]
+
+
+def get_catalog_version() -> int:
+    """Retorna a versão atual do catálogo de treinos.
+    
+    A versão é mantida no cache do Django, de modo que todos os processos
+    que compartilham o backend de cache convergem para a mesma versão.
+    Se a chave não existir (primeiro acesso ou eviction), é inicializada
+    com o instante atual em nanossegundos, maior que qualquer versão
+    anterior.
+    
+    Returns:
+        Número monotonicamente crescente, incrementado a cada alteração
+        em um Workout.
+    """
+    version = cache.get(CATALOG_VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_CACHE_KEY)
+    return version
+
+
+def bump_catalog_version() -> int:
+    """Incrementa a versão do catálogo de treinos.
+    
+    Chamado pelos signals de Workout sempre que um treino é criado,
+    alterado ou removido.
+    
+    Returns:
+        Nova versão do catálogo.
+    """
+    try:
+        return cache.incr(CATALOG_VERSION_CACHE_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+        return cache.incr(CATALOG_VERSION_CACHE_KEY)
+
+
+def get_catalog() -> WorkoutCatalog:
+    """Retorna o snapshot do catálogo para a versão atual.
+    
+    O snapshot é reconstruído sob demanda apenas quando a versão muda;
+    nas demais chamadas nenhuma consulta ao banco é feita.
+    
+    Returns:
+        Snapshot compartilhado do catálogo de treinos.
+    """
+    global _snapshot
+    
+    version = get_catalog_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = WorkoutCatalog(version, WorkoutRepository().get_all())
+        return _snapshot
+
+
+def catalog_fingerprint(workouts: List) -> str:
+    """Calcula uma identificação persistente do conteúdo do catálogo.
+    
+    Diferente da versão em memória, o fingerprint é o mesmo em qualquer
+    processo para o mesmo conteúdo, e pode ser gravado no banco junto com
+    resultados derivados do catálogo.
+    
+    Args:
+        workouts: Treinos do catálogo, na ordem usada pelas estratégias.
+        
+    Returns:
+        Hash hexadecimal de 16 caracteres dos campos usados nas recomendações.
+    """
+    digest = hashlib.sha1()
+    for w in workouts:
+        digest.update(
+            f"{w.pk}:{w.intensidade}:{w.duracao_minutos}:{w.calorias_estimadas};".encode()
+        )
+    return digest.hexdigest()[:16]
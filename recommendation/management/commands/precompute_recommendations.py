@@ -0,0 +1,183 @@
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from recommendation.catalog import get_catalog
+from recommendation.models import PrecomputedRecommendation, User
+from recommendation.repositories import PrecomputedRecommendationRepository
+from recommendation.strategies import RecommendationStrategyFactory
+from recommendation.strategies.registry import strategy_registry
+
+
+_catalogo = None
+
+
+def _inicializar_worker():
+    """Carrega o catálogo e aquece as estratégias uma vez em cada processo do pool."""
+    global _catalogo
+    _catalogo = get_catalog()
+    strategy_registry.warm_up(_catalogo)
+
+
+def _recomendar_lote(user_ids):
+    """Calcula as recomendações de um lote de usuários.
+    
+    Agrupa os usuários pela estratégia selecionada pela factory e usa
+    ``recommend_many`` para aproveitar o processamento em lote de cada
+    estratégia.
+    
+    Args:
+        user_ids: IDs dos usuários do lote.
+        
+    Returns:
+        Lista de tuplas (user_id, treinos_ids, justificativa, estratégia).
+    """
+    users = User.objects.filter(pk__in=user_ids).select_related('preferencias')
+    
+    por_estrategia = {}
+    for user in users:
+        strategy = RecommendationStrategyFactory.get_strategy_for_user(user)
+        nome = strategy.name
+        por_estrategia.setdefault(nome, (strategy, []))[1].append(user)
+    
+    linhas = []
+    for nome, (strategy, grupo) in por_estrategia.items():
+        resultados = strategy.recommend_many(grupo, _catalogo)
+        for user, result in zip(grupo, resultados):
+            linhas.append((
+                user.pk,
+                [w.pk for w in result.workouts],
+                result.reasoning,
+                nome
+            ))
+    return linhas
+
+
+def _em_blocos(iterable, tamanho):
+    iterador = iter(iterable)
+    while bloco := list(islice(iterador, tamanho)):
+        yield bloco
+
+
+class Command(BaseCommand):
+    """Comando de management para pré-calcular recomendações de treinos.
+    
+    Percorre os usuários em blocos, distribui os blocos entre processos
+    e grava os resultados em lote na tabela de recomendações
+    pré-calculadas, usada pelo dashboard.
+    """
+    help = 'Pré-calcula recomendações de treinos para todos os usuários'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Número de processos (1 executa no processo atual)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Quantidade de usuários por bloco'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Recalcula apenas usuários alterados desde a última execução'
+        )
+    
+    def handle(self, *args, **options):
+        workers = options['workers']
+        chunk_size = options['chunk_size']
+        if workers < 1 or chunk_size < 1:
+            raise CommandError('--workers e --chunk-size devem ser maiores que zero')
+        
+        repository = PrecomputedRecommendationRepository()
+        calculado_em = timezone.now()
+        versao_catalogo = get_catalog().fingerprint
+        
+        user_ids = repository.iter_user_ids_to_refresh(
+            versao_catalogo,
+            incremental=options['incremental'],
+            chunk_size=chunk_size
+        )
+        blocos = _em_blocos(user_ids, chunk_size)
+        
+        self.stdout.write(f'🧮 Pré-calculando recomendações (catálogo {versao_catalogo})...')
+        
+        if workers == 1:
+            _inicializar_worker()
+            total = sum(
+                self._gravar(repository, _recomendar_lote(bloco), versao_catalogo, calculado_em)
+                for bloco in blocos
+            )
+        else:
+            total = self._executar_em_pool(
+                repository, blocos, workers, versao_catalogo, calculado_em
+            )
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} recomendações atualizadas.'))
+    
+    def _executar_em_pool(self, repository, blocos, workers, versao_catalogo, calculado_em):
+        """Distribui os blocos entre processos, limitando os blocos em voo.
+        
+        As conexões com o banco são fechadas antes do fork para que cada
+        processo abra a sua. Os resultados são gravados pelo processo
+        principal à medida que os blocos terminam.
+        """
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('--workers > 1 requer suporte a fork; use --workers 1')
+        
+        connections.close_all()
+        total = 0
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_inicializar_worker
+        ) as executor:
+            # Força a criação dos processos antes que o processo principal
+            # reabra a conexão com o banco ao percorrer os usuários.
+            executor.submit(len, ()).result()
+            
+            pendentes = set()
+            for bloco in blocos:
+                pendentes.add(executor.submit(_recomendar_lote, bloco))
+                if len(pendentes) >= workers * 2:
+                    concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for future in concluidos:
+                        total += self._gravar(
+                            repository, future.result(), versao_catalogo, calculado_em
+                        )
+            
+            for future in pendentes:
+                total += self._gravar(
+                    repository, future.result(), versao_catalogo, calculado_em
+                )
+        
+        return total
+    
+    def _gravar(self, repository, linhas, versao_catalogo, calculado_em) -> int:
+        """Grava em lote as recomendações calculadas para um bloco.
+        
+        O instante gravado é o início da execução, de modo que alterações
+        feitas durante o cálculo sejam detectadas no próximo modo incremental.
+        
+        Returns:
+            Quantidade de recomendações gravadas.
+        """
+        repository.upsert_many([
+            PrecomputedRecommendation(
+                usuario_id=user_id,
+                treinos_ids=treinos_ids,
+                justificativa=justificativa,
+                estrategia=estrategia,
+                versao_catalogo=versao_catalogo,
+                calculado_em=calculado_em
+            )
+            for user_id, treinos_ids, justificativa, estrategia in linhas
+        ])
+        return len(linhas)
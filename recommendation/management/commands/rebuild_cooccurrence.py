@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from recommendation.repositories import CooccurrenceRepository
+
+
+class Command(BaseCommand):
+    """Comando de management para reconstruir a matriz de coocorrência.
+    
+    Recalcula a matriz inteira a partir do histórico de treinos. A matriz
+    é mantida incrementalmente pelos signals do histórico; a reconstrução
+    serve para cargas iniciais e backfills feitos sem signals.
+    """
+    help = 'Reconstrói a matriz de coocorrência de treinos a partir do histórico'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Quantidade de registros lidos por vez do histórico'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Quantidade de linhas por comando INSERT'
+        )
+    
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--chunk-size e --batch-size devem ser maiores que zero')
+        
+        self.stdout.write('🔁 Reconstruindo matriz de coocorrência...')
+        total = CooccurrenceRepository().rebuild(
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} pares de treinos gravados.'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from recommendation.repositories import HistoryRollupRepository
+from recommendation.repositories.history_rollup_repository import PERIODOS
+
+
+class Command(BaseCommand):
+    """Comando de management para reconstruir os totais do histórico por período.
+    
+    Recalcula os totais semanais e mensais de todos os usuários a partir
+    do histórico, em lotes. Os totais são mantidos incrementalmente pelos
+    signals do histórico e dos treinos; a reconstrução preenche as tabelas
+    pela primeira vez e corrige divergências, por exemplo após cargas
+    feitas sem signals.
+    """
+    help = 'Reconstrói os totais semanais e mensais do histórico dos usuários'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Quantidade de usuários recalculados por transação'
+        )
+        parser.add_argument(
+            '--periodo',
+            choices=sorted(PERIODOS),
+            help='Reconstrói apenas os totais do período informado'
+        )
+    
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size deve ser maior que zero')
+        
+        periodos = [options['periodo']] if options['periodo'] else list(PERIODOS)
+        for periodo in periodos:
+            self.stdout.write(f'🔁 Reconstruindo totais por {periodo}...')
+            total = HistoryRollupRepository(periodo).rebuild(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'✅ Totais por {periodo} de {total} usuários recalculados.'))
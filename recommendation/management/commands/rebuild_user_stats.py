@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from recommendation.repositories import UserStatsRepository
+
+
+class Command(BaseCommand):
+    """Comando de management para reconstruir as estatísticas dos usuários.
+    
+    Recalcula as estatísticas consolidadas de todos os usuários a partir
+    do histórico, em lotes. As estatísticas são mantidas incrementalmente
+    pelos signals do histórico e dos treinos; a reconstrução corrige
+    divergências, por exemplo após cargas feitas sem signals.
+    """
+    help = 'Reconstrói as estatísticas consolidadas dos usuários a partir do histórico'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Quantidade de usuários recalculados por transação'
+        )
+    
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size deve ser maior que zero')
+        
+        self.stdout.write('🔁 Reconstruindo estatísticas dos usuários...')
+        total = UserStatsRepository().rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Estatísticas de {total} usuários recalculadas.'))
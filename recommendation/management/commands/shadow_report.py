@@ -0,0 +1,45 @@
+import json
+from django.core.management.base import BaseCommand
+from recommendation.repositories import ShadowEvaluationRepository
+
+
+class Command(BaseCommand):
+    """Comando de management para comparar as estratégias em modo sombra.
+    
+    Resume as avaliações gravadas por estratégia candidata e estratégia
+    primária: quantidade, treinos coincidentes, durações e erros.
+    """
+    help = 'Exibe o resumo das avaliações de estratégias em modo sombra'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Emite o resumo em JSON'
+        )
+    
+    def handle(self, *args, **options):
+        resumo = ShadowEvaluationRepository().summary_by_strategy()
+        
+        if options['json']:
+            self.stdout.write(json.dumps(resumo, indent=2, ensure_ascii=False))
+            return
+        
+        if not resumo:
+            self.stdout.write(self.style.WARNING('⚠️  Nenhuma avaliação em modo sombra registrada.'))
+            return
+        
+        self.stdout.write(
+            f'{"Estratégia":<28}{"Primária":<28}{"Avaliações":>12}{"Coincidentes":>14}'
+            f'{"Média ms":>10}{"Máx ms":>10}{"Erros":>8}'
+        )
+        for linha in resumo:
+            self.stdout.write(
+                f"{linha['estrategia']:<28}{linha['estrategia_primaria']:<28}"
+                f"{linha['avaliacoes']:>12}{self._numero(linha['coincidentes_medio'], 2):>14}"
+                f"{self._numero(linha['duracao_media_ms'], 2):>10}"
+                f"{self._numero(linha['duracao_max_ms'], 2):>10}{linha['erros']:>8}"
+            )
+    
+    def _numero(self, valor, casas):
+        return '-' if valor is None else f'{valor:.{casas}f}'
@@ -0,0 +1,69 @@
+import json
+from django.core.management.base import BaseCommand
+from recommendation.metrics import metrics_enabled, strategy_metrics, summarize
+
+
+class Command(BaseCommand):
+    """Comando de management para resumir as métricas das estratégias.
+    
+    Agrega os snapshots publicados pelos workers no cache do Django e
+    exibe chamadas, vazão e percentis de latência por estratégia, além da
+    taxa de acerto dos caches.
+    """
+    help = 'Exibe o resumo das métricas das estratégias de recomendação'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Emite o resumo em JSON'
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Descarta as métricas publicadas após exibir o resumo'
+        )
+    
+    def handle(self, *args, **options):
+        resumo = summarize(strategy_metrics.collect())
+        
+        if options['json']:
+            self.stdout.write(json.dumps(resumo, indent=2, ensure_ascii=False))
+        else:
+            self._exibir(resumo)
+        
+        if options['reset']:
+            strategy_metrics.reset()
+            self.stdout.write(self.style.SUCCESS('✅ Métricas descartadas.'))
+    
+    def _exibir(self, resumo):
+        if not metrics_enabled():
+            self.stdout.write(self.style.WARNING(
+                '⚠️  RECOMMENDATION_METRICS_ENABLED está desabilitado neste processo.'
+            ))
+        
+        self.stdout.write(f"📊 Processos: {len(resumo['processos'])}")
+        self.stdout.write(
+            f'{"Estratégia":<34}{"Operação":<16}{"Chamadas":>10}{"Usuários/s":>12}'
+            f'{"Média ms":>10}{"p50":>8}{"p95":>8}{"p99":>8}'
+        )
+        for estrategia, operacoes in sorted(resumo['estrategias'].items()):
+            for operacao, m in sorted(operacoes.items()):
+                self.stdout.write(
+                    f"{estrategia:<34}{operacao:<16}{m['chamadas']:>10}"
+                    f"{self._numero(m['usuarios_por_segundo'], 0):>12}"
+                    f"{self._numero(m['latencia_media_ms'], 2):>10}"
+                    f"{self._numero(m['latencia_p50_ms'], 2):>8}"
+                    f"{self._numero(m['latencia_p95_ms'], 2):>8}"
+                    f"{self._numero(m['latencia_p99_ms'], 2):>8}"
+                )
+        
+        self.stdout.write('🗄️  Caches:')
+        for nome, c in sorted(resumo['caches'].items()):
+            self.stdout.write(
+                f"  {nome:<30} hits={c['hits']} misses={c['misses']} "
+                f"taxa de acerto={self._numero(c['taxa_acerto'], 2)}"
+            )
+    
+    def _numero(self, valor, casas):
+        return '-' if valor is None else f'{valor:.{casas}f}'
@@ -0,0 +1,185 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional
+from django.conf import settings
+from .metrics import strategy_metrics
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+FATOR_ATIVIDADE = 1.55
+
+AJUSTE_META_CALORICA = {
+    'emagrecer': 0.8,
+    'ganhar_massa': 1.15,
+}
+
+
+def calcular_tmb(peso: float, altura: int, idade: int) -> float:
+    """Calcula Taxa Metabólica Basal usando equação de Mifflin-St Jeor.
+    
+    Args:
+        peso: Peso em kg.
+        altura: Altura em cm.
+        idade: Idade em anos.
+        
+    Returns:
+        TMB em kcal/dia ajustada por fator de atividade.
+    """
+    tmb = (10 * peso) + (6.25 * altura) - (5 * idade) + 5
+    return tmb * FATOR_ATIVIDADE
+
+
+def calcular_meta_calorica(tmb: float, objetivo: str) -> float:
+    """Calcula meta calórica baseada no objetivo.
+    
+    Args:
+        tmb: Taxa metabólica basal em kcal/dia.
+        objetivo: Objetivo do usuário (emagrecer, ganhar_massa, manter).
+        
+    Returns:
+        Meta calórica diária ajustada ao objetivo.
+    """
+    ajuste = AJUSTE_META_CALORICA.get(objetivo)
+    if ajuste is None:
+        return tmb
+    return tmb * ajuste
+
+
+@dataclass(frozen=True)
+class MetabolicProfile:
+    """Perfil metabólico de um usuário.
+    
+    Attributes:
+        tmb: Taxa metabólica basal em kcal/dia.
+        objetivo: Objetivo do usuário (emagrecer, ganhar_massa, manter).
+        meta_calorica: Meta calórica diária para o objetivo do usuário.
+    """
+    tmb: float
+    objetivo: str
+    meta_calorica: float
+    
+    @classmethod
+    def from_tmb(cls, tmb: float, objetivo: str) -> 'MetabolicProfile':
+        return cls(tmb=tmb, objetivo=objetivo, meta_calorica=calcular_meta_calorica(tmb, objetivo))
+    
+    @property
+    def metas(self) -> Dict[str, float]:
+        """Metas calóricas diárias para cada objetivo."""
+        return {
+            objetivo: calcular_meta_calorica(self.tmb, objetivo)
+            for objetivo in ['emagrecer', 'manter', 'ganhar_massa']
+        }
+
+
+class MetabolicProfileService:
+    """Serviço de perfis metabólicos com memo limitado.
+    
+    Os perfis são memorizados por (ID do usuário, ``atualizado_em``): como
+    ``atualizado_em`` muda sempre que o perfil é salvo, uma edição gera uma
+    nova chave e a entrada antiga é descartada pelo LRU. Usuários sem ID ou
+    sem ``atualizado_em`` (não persistidos) são calculados sem memo.
+    """
+    
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_profile(self, user) -> MetabolicProfile:
+        """Retorna o perfil metabólico de um usuário.
+        
+        Args:
+            user: Usuário com peso, altura, idade e objetivo.
+            
+        Returns:
+            Perfil com TMB e meta calórica.
+        """
+        return self.get_profiles([user])[0]
+    
+    def get_profiles(self, users: List) -> List[MetabolicProfile]:
+        """Retorna os perfis metabólicos de vários usuários.
+        
+        Os perfis fora do memo são calculados de uma vez com operações
+        vetorizadas, produzindo os mesmos valores do cálculo individual.
+        
+        Args:
+            users: Usuários com peso, altura, idade e objetivo.
+            
+        Returns:
+            Lista de perfis na mesma ordem de ``users``.
+        """
+        chaves = [self._chave(user) for user in users]
+        perfis = [None] * len(users)
+        
+        with self._lock:
+            for i, chave in enumerate(chaves):
+                perfil = self._entries.get(chave) if chave is not None else None
+                if perfil is None:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(chave)
+                self.hits += 1
+                perfis[i] = perfil
+        
+        pendentes = [i for i, perfil in enumerate(perfis) if perfil is None]
+        if not pendentes:
+            return perfis
+        
+        tmbs = self._calcular_tmb_em_lote([users[i] for i in pendentes])
+        with self._lock:
+            for i, tmb in zip(pendentes, tmbs):
+                perfis[i] = MetabolicProfile.from_tmb(tmb, users[i].objetivo)
+                if chaves[i] is not None:
+                    self._entries[chaves[i]] = perfis[i]
+                    self._entries.move_to_end(chaves[i])
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        
+        return perfis
+    
+    def clear(self) -> None:
+        """Remove todos os perfis memorizados."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _chave(self, user) -> Optional[Hashable]:
+        if user.pk is None or user.atualizado_em is None:
+            return None
+        return (user.pk, user.atualizado_em)
+    
+    def _calcular_tmb_em_lote(self, users: List) -> List[float]:
+        """Calcula a TMB de vários usuários com operações vetorizadas.
+        
+        Sem NumPy instalado, ou para um único usuário, calcula usuário
+        a usuário.
+        
+        Args:
+            users: Usuários com peso, altura e idade.
+            
+        Returns:
+            Lista de TMBs em kcal/dia, na mesma ordem de ``users``.
+        """
+        if np is None or len(users) == 1:
+            return [calcular_tmb(float(user.peso), user.altura, user.idade) for user in users]
+        
+        peso = np.array([float(user.peso) for user in users], dtype=np.float64)
+        altura = np.array([user.altura for user in users], dtype=np.float64)
+        idade = np.array([user.idade for user in users], dtype=np.float64)
+        
+        return calcular_tmb(peso, altura, idade).tolist()
+
+
+metabolic_profiles = MetabolicProfileService(
+    max_size=getattr(settings, 'METABOLIC_PROFILE_CACHE_SIZE', 4096)
+)
+strategy_metrics.register_cache('perfis_metabolicos', metabolic_profiles)
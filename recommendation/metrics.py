@@ -0,0 +1,401 @@
+import logging
+import os
+import socket
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+# Contador de processos registrados; o processo de índice N publica seu
+# snapshot em METRICS_CACHE_KEY_PREFIX + 'processo:N'. Índices abaixo de
+# METRICS_FIRST_PROCESS_CACHE_KEY pertencem a processos que não publicam mais.
+METRICS_PROCESSES_CACHE_KEY = 'recommendation:metrics:total_processos'
+METRICS_FIRST_PROCESS_CACHE_KEY = 'recommendation:metrics:primeiro_processo'
+METRICS_CACHE_KEY_PREFIX = 'recommendation:metrics:'
+
+# Validade de cada snapshot, em intervalos de publicação; snapshots de
+# processos encerrados expiram e deixam de entrar na agregação.
+VALIDADE_EM_INTERVALOS = 3
+
+LIMITES_LATENCIA_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+LIMITES_CATALOGO = (10, 100, 1000, 10000, 100000, 1000000)
+LIMITES_RESULTADOS = (0, 1, 2, 3, 5, 10)
+LIMITES_LOTE = (1, 10, 100, 1000, 10000)
+
+
+def metrics_enabled() -> bool:
+    """Indica se a instrumentação das estratégias está habilitada."""
+    return getattr(settings, 'RECOMMENDATION_METRICS_ENABLED', False)
+
+
+class Histogram:
+    """Histograma de buckets fixos com contagem, soma, mínimo e máximo.
+    
+    Cada observação custa uma busca binária sobre os limites. O último
+    bucket acumula os valores acima do maior limite.
+    """
+    
+    def __init__(self, limites: Sequence[float]):
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1)
+        self.total = 0
+        self.soma = 0.0
+        self.minimo = None
+        self.maximo = None
+    
+    def observe(self, valor: float) -> None:
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.total += 1
+        self.soma += valor
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+    
+    def percentil(self, p: float) -> Optional[float]:
+        """Estima um percentil pelo limite superior do bucket que o contém.
+        
+        Args:
+            p: Percentil entre 0 e 100.
+            
+        Returns:
+            Limite superior do bucket (ou o máximo observado, no último
+            bucket), ou None se não houver observações.
+        """
+        if not self.total:
+            return None
+        
+        alvo = self.total * p / 100
+        acumulado = 0
+        for i, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo and contagem:
+                return self.limites[i] if i < len(self.limites) else self.maximo
+        return self.maximo
+    
+    def merge(self, outro: 'Histogram') -> None:
+        """Soma as observações de outro histograma com os mesmos limites."""
+        self.contagens = [a + b for a, b in zip(self.contagens, outro.contagens)]
+        self.total += outro.total
+        self.soma += outro.soma
+        if outro.minimo is not None:
+            self.minimo = outro.minimo if self.minimo is None else min(self.minimo, outro.minimo)
+        if outro.maximo is not None:
+            self.maximo = outro.maximo if self.maximo is None else max(self.maximo, outro.maximo)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'limites': list(self.limites),
+            'contagens': list(self.contagens),
+            'total': self.total,
+            'soma': self.soma,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+        }
+    
+    @classmethod
+    def from_dict(cls, dados: Dict[str, Any]) -> 'Histogram':
+        histograma = cls(dados['limites'])
+        histograma.contagens = list(dados['contagens'])
+        histograma.total = dados['total']
+        histograma.soma = dados['soma']
+        histograma.minimo = dados['minimo']
+        histograma.maximo = dados['maximo']
+        return histograma
+
+
+class _MetricasEstrategia:
+    """Histogramas de uma operação (recommend ou recommend_many) de uma estratégia."""
+    
+    def __init__(self):
+        self.latencia_ms = Histogram(LIMITES_LATENCIA_MS)
+        self.tamanho_catalogo = Histogram(LIMITES_CATALOGO)
+        self.resultados = Histogram(LIMITES_RESULTADOS)
+        self.usuarios = Histogram(LIMITES_LOTE)
+    
+    def histogramas(self) -> Dict[str, Histogram]:
+        return {
+            'latencia_ms': self.latencia_ms,
+            'tamanho_catalogo': self.tamanho_catalogo,
+            'resultados': self.resultados,
+            'usuarios': self.usuarios,
+        }
+
+
+class StrategyMetrics:
+    """Métricas em processo das estratégias de recomendação.
+    
+    Registra, por estratégia e operação, histogramas de latência, tamanho
+    do catálogo, quantidade de treinos retornados e usuários por chamada,
+    além dos contadores de acerto dos caches registrados. Uma thread em
+    segundo plano, iniciada na primeira chamada registrada, publica
+    periodicamente o snapshot do processo no cache do Django para que o
+    endpoint e o comando de resumo agreguem todos os workers; a requisição
+    nunca espera pela publicação.
+    
+    Cada processo publica em sua própria chave, com índice obtido por
+    ``cache.incr``, de modo que processos concorrentes nunca sobrescrevem
+    o registro uns dos outros. Os snapshots expiram após alguns intervalos
+    sem publicação, de modo que workers encerrados ou reciclados saem da
+    agregação.
+    """
+    
+    def __init__(self, intervalo_publicacao: float = 10.0):
+        self.intervalo_publicacao = intervalo_publicacao
+        self._operacoes: Dict[tuple, _MetricasEstrategia] = {}
+        self._caches: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._registro_lock = threading.Lock()
+        self._indice = None
+        self._pid_indice = None
+        self._pid_publicador = None
+        self._parado = threading.Event()
+    
+    def record(
+        self,
+        estrategia: str,
+        operacao: str,
+        segundos: float,
+        tamanho_catalogo: int,
+        resultados: int,
+        usuarios: int = 1
+    ) -> None:
+        """Registra uma chamada instrumentada.
+        
+        Args:
+            estrategia: Nome da estratégia.
+            operacao: Operação medida (recommend ou recommend_many).
+            segundos: Tempo de parede da chamada.
+            tamanho_catalogo: Quantidade de treinos do catálogo recebido.
+            resultados: Quantidade média de treinos retornados por usuário.
+            usuarios: Quantidade de usuários atendidos na chamada.
+        """
+        with self._lock:
+            metricas = self._operacoes.get((estrategia, operacao))
+            if metricas is None:
+                metricas = self._operacoes[(estrategia, operacao)] = _MetricasEstrategia()
+            metricas.latencia_ms.observe(segundos * 1000)
+            metricas.tamanho_catalogo.observe(tamanho_catalogo)
+            metricas.resultados.observe(resultados)
+            metricas.usuarios.observe(usuarios)
+        
+        if self._pid_publicador != os.getpid():
+            self._iniciar_publicador()
+    
+    def register_cache(self, nome: str, cache_instrumentado: Any) -> None:
+        """Registra um cache com contadores ``hits`` e ``misses``.
+        
+        Args:
+            nome: Nome do cache no snapshot.
+            cache_instrumentado: Objeto com atributos ``hits`` e ``misses``.
+        """
+        self._caches[nome] = cache_instrumentado
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna as métricas do processo em formato serializável."""
+        with self._lock:
+            estrategias = {}
+            for (estrategia, operacao), metricas in self._operacoes.items():
+                estrategias.setdefault(estrategia, {})[operacao] = {
+                    nome: histograma.to_dict()
+                    for nome, histograma in metricas.histogramas().items()
+                }
+        
+        return {
+            'processos': [f'{socket.gethostname()}:{os.getpid()}'],
+            'estrategias': estrategias,
+            'caches': {
+                nome: {'hits': c.hits, 'misses': c.misses}
+                for nome, c in self._caches.items()
+            },
+        }
+    
+    def publish(self) -> None:
+        """Publica o snapshot do processo no cache do Django."""
+        cache.set(
+            self._chave_do_processo(),
+            self.snapshot(),
+            timeout=self.intervalo_publicacao * VALIDADE_EM_INTERVALOS
+        )
+    
+    def stop(self) -> None:
+        """Interrompe a publicação periódica em segundo plano."""
+        self._parado.set()
+    
+    def collect(self) -> Dict[str, Any]:
+        """Agrega os snapshots publicados por todos os processos.
+        
+        O snapshot do processo atual é publicado antes da agregação, de
+        modo que o resultado sempre inclui as métricas mais recentes dele.
+        
+        Returns:
+            Snapshot agregado no mesmo formato de ``snapshot``.
+        """
+        self.publish()
+        return merge_snapshots(_snapshots_publicados())
+    
+    def reset(self) -> None:
+        """Descarta as métricas do processo e os snapshots publicados.
+        
+        O contador de processos é mantido, para que os demais processos
+        continuem publicando em chaves distintas.
+        """
+        with self._lock:
+            self._operacoes.clear()
+        for c in self._caches.values():
+            c.hits = 0
+            c.misses = 0
+        
+        cache.delete_many([_chave_publicada(indice) for indice in _indices_registrados()])
+    
+    def _iniciar_publicador(self) -> None:
+        # Por pid, para que um worker criado por fork inicie sua própria thread.
+        with self._registro_lock:
+            if self._pid_publicador == os.getpid():
+                return
+            self._pid_publicador = os.getpid()
+            threading.Thread(
+                target=self._publicar_periodicamente,
+                name='strategy-metrics',
+                daemon=True
+            ).start()
+    
+    def _publicar_periodicamente(self) -> None:
+        while not self._parado.wait(self.intervalo_publicacao):
+            try:
+                self.publish()
+            except Exception:
+                logger.exception("Falha ao publicar as métricas das estratégias")
+    
+    def _chave_do_processo(self) -> str:
+        # Um processo cujo snapshot expirou (cache indisponível por alguns
+        # intervalos) pode ter ficado abaixo do primeiro índice lido; nesse
+        # caso registra um novo índice.
+        with self._registro_lock:
+            if self._pid_indice != os.getpid() or self._indice < _primeiro_indice():
+                try:
+                    self._indice = cache.incr(METRICS_PROCESSES_CACHE_KEY)
+                except ValueError:
+                    cache.add(METRICS_PROCESSES_CACHE_KEY, 0, timeout=None)
+                    self._indice = cache.incr(METRICS_PROCESSES_CACHE_KEY)
+                self._pid_indice = os.getpid()
+            return _chave_publicada(self._indice)
+
+
+def _chave_publicada(indice: int) -> str:
+    return f'{METRICS_CACHE_KEY_PREFIX}processo:{indice}'
+
+
+def _primeiro_indice() -> int:
+    return cache.get(METRICS_FIRST_PROCESS_CACHE_KEY) or 1
+
+
+def _indices_registrados() -> range:
+    return range(_primeiro_indice(), (cache.get(METRICS_PROCESSES_CACHE_KEY) or 0) + 1)
+
+
+def _snapshots_publicados() -> List[Dict[str, Any]]:
+    """Lê os snapshots ainda válidos de todos os processos.
+    
+    Avança o primeiro índice lido até o processo vivo mais antigo, de modo
+    que as chaves de processos encerrados não são mais consultadas.
+    
+    Returns:
+        Snapshots em ordem de registro dos processos.
+    """
+    registrados = _indices_registrados()
+    indices = {_chave_publicada(indice): indice for indice in registrados}
+    publicados = cache.get_many(list(indices))
+    if publicados:
+        mais_antigo = min(indices[chave] for chave in publicados)
+        if mais_antigo > registrados.start:
+            cache.set(METRICS_FIRST_PROCESS_CACHE_KEY, mais_antigo, timeout=None)
+    return [publicados[chave] for chave in sorted(publicados, key=indices.get)]
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combina snapshots de vários processos somando histogramas e contadores.
+    
+    Args:
+        snapshots: Snapshots no formato de ``StrategyMetrics.snapshot``.
+        
+    Returns:
+        Snapshot agregado.
+    """
+    processos = []
+    histogramas = {}
+    caches = {}
+    
+    for snapshot in snapshots:
+        processos.extend(snapshot['processos'])
+        for estrategia, operacoes in snapshot['estrategias'].items():
+            for operacao, metricas in operacoes.items():
+                for nome, dados in metricas.items():
+                    chave = (estrategia, operacao, nome)
+                    if chave in histogramas:
+                        histogramas[chave].merge(Histogram.from_dict(dados))
+                    else:
+                        histogramas[chave] = Histogram.from_dict(dados)
+        for nome, contadores in snapshot['caches'].items():
+            total = caches.setdefault(nome, {'hits': 0, 'misses': 0})
+            total['hits'] += contadores['hits']
+            total['misses'] += contadores['misses']
+    
+    estrategias = {}
+    for (estrategia, operacao, nome), histograma in histogramas.items():
+        estrategias.setdefault(estrategia, {}).setdefault(operacao, {})[nome] = (
+            histograma.to_dict()
+        )
+    
+    return {'processos': processos, 'estrategias': estrategias, 'caches': caches}
+
+
+def summarize(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Resume um snapshot em contagens, vazão e percentis de latência.
+    
+    Args:
+        snapshot: Snapshot de ``StrategyMetrics``.
+        
+    Returns:
+        Dicionário com o resumo por estratégia e operação e a taxa de
+        acerto de cada cache.
+    """
+    estrategias = {}
+    for estrategia, operacoes in snapshot['estrategias'].items():
+        for operacao, metricas in operacoes.items():
+            latencia = Histogram.from_dict(metricas['latencia_ms'])
+            usuarios = Histogram.from_dict(metricas['usuarios'])
+            catalogo = Histogram.from_dict(metricas['tamanho_catalogo'])
+            resultados = Histogram.from_dict(metricas['resultados'])
+            estrategias.setdefault(estrategia, {})[operacao] = {
+                'chamadas': latencia.total,
+                'usuarios': int(usuarios.soma),
+                'latencia_media_ms': latencia.soma / latencia.total if latencia.total else None,
+                'latencia_p50_ms': latencia.percentil(50),
+                'latencia_p95_ms': latencia.percentil(95),
+                'latencia_p99_ms': latencia.percentil(99),
+                'latencia_max_ms': latencia.maximo,
+                'usuarios_por_segundo': (
+                    usuarios.soma / (latencia.soma / 1000) if latencia.soma else None
+                ),
+                'catalogo_medio': catalogo.soma / catalogo.total if catalogo.total else None,
+                'resultados_medio': (
+                    resultados.soma / resultados.total if resultados.total else None
+                ),
+            }
+    
+    caches = {}
+    for nome, contadores in snapshot['caches'].items():
+        total = contadores['hits'] + contadores['misses']
+        caches[nome] = dict(contadores, taxa_acerto=contadores['hits'] / total if total else None)
+    
+    return {'processos': snapshot['processos'], 'estrategias': estrategias, 'caches': caches}
+
+
+strategy_metrics = StrategyMetrics(
+    intervalo_publicacao=getattr(settings, 'RECOMMENDATION_METRICS_PUBLISH_SECONDS', 10.0)
+)
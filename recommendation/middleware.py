@@ -0,0 +1,69 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+from .repositories import get_user_repository
+from .repositories.identity_map import identity_map_scope
+
+
+def get_app_user(request):
+    """Busca o usuário da aplicação correspondente ao usuário autenticado.
+    
+    Args:
+        request: Requisição HTTP do Django, após o AuthenticationMiddleware.
+        
+    Returns:
+        Usuário com as preferências carregadas, ou None se o usuário não
+        estiver autenticado ou ainda não tiver configurado o perfil.
+    """
+    if not hasattr(request, '_cached_app_user'):
+        user = None
+        if request.user.is_authenticated:
+            user = get_user_repository().get_by_email_with_preferences(request.user.email)
+        request._cached_app_user = user
+    return request._cached_app_user
+
+
+async def aget_app_user(request):
+    """Versão assíncrona de ``get_app_user``, para views assíncronas.
+    
+    Em views assíncronas, ``request.app_user`` não pode ser usado: o
+    objeto lazy consultaria o banco de forma síncrona no event loop.
+    """
+    if not hasattr(request, '_cached_app_user'):
+        user = None
+        auth_user = await request.auser()
+        if auth_user.is_authenticated:
+            user = await get_user_repository().aget_by_email_with_preferences(auth_user.email)
+        request._cached_app_user = user
+    return request._cached_app_user
+
+
+class AppUserMiddleware:
+    """Resolve o usuário da aplicação uma única vez por requisição.
+    
+    Define ``request.app_user`` como um objeto lazy: o usuário é buscado,
+    com as preferências, apenas no primeiro acesso. A requisição roda em
+    um escopo de mapa de identidade, de modo que as buscas repetidas de
+    usuário pelos repositórios não consultam o banco de novo.
+    
+    Suporta os modos síncrono e assíncrono, para que views assíncronas
+    servidas via ASGI não sejam adaptadas para uma thread.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with identity_map_scope():
+            request.app_user = SimpleLazyObject(lambda: get_app_user(request))
+            return self.get_response(request)
+    
+    async def __acall__(self, request):
+        with identity_map_scope():
+            request.app_user = SimpleLazyObject(lambda: get_app_user(request))
+            return await self.get_response(request)
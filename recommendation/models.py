@@ -1,4 +1,6 @@
-from django.db import models
+from datetime import date, timedelta
+from typing import Optional
+from django.db import models, transaction
 
 
 class User(models.Model):
@@ -114,6 +116,191 @@ class History(models.Model):
         verbose_name = 'Histórico'
         verbose_name_plural = 'Históricos'
         ordering = ['-data']
+        indexes = [
+            models.Index(fields=['usuario', '-data', '-id'], name='historico_usuario_data_id'),
+        ]
     
     def __str__(self):
         return f"Histórico de {self.usuario.nome} - {self.data}"
+    
+    def save(self, *args, **kwargs):
+        # Os signals do histórico atualizam dados derivados (como o
+        # UserStats); a transação grava o registro e os derivados juntos.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+
+class WorkoutCooccurrence(models.Model):
+    """Modelo da matriz esparsa de coocorrência entre treinos.
+    
+    Cada linha guarda quantos usuários realizaram tanto o treino A quanto
+    o treino B. Os pares são gravados nas duas direções, de modo que a
+    linha de um treino na matriz é obtida filtrando por ``treino_a``; a
+    diagonal (A, A) guarda quantos usuários realizaram o treino A.
+    """
+    treino_a = models.ForeignKey(Workout, on_delete=models.CASCADE, related_name='+')
+    treino_b = models.ForeignKey(Workout, on_delete=models.CASCADE, related_name='+')
+    contagem = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'coocorrencia_treinos'
+        verbose_name = 'Coocorrência de Treinos'
+        verbose_name_plural = 'Coocorrências de Treinos'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['treino_a', 'treino_b'], 
+                name='coocorrencia_treinos_par_unico'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.treino_a_id} × {self.treino_b_id}: {self.contagem}"
+
+
+class PrecomputedRecommendation(models.Model):
+    """Modelo de recomendação pré-calculada para um usuário.
+    
+    Armazena o resultado da estratégia selecionada para o usuário,
+    permitindo que o dashboard sirva recomendações sem calculá-las
+    durante a requisição.
+    """
+    usuario = models.OneToOneField(
+        User, 
+        on_delete=models.CASCADE, 
+        related_name='recomendacao_precalculada'
+    )
+    treinos_ids = models.JSONField(default=list)
+    justificativa = models.TextField()
+    estrategia = models.CharField(max_length=100)
+    versao_catalogo = models.CharField(max_length=64)
+    calculado_em = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'recomendacoes_precalculadas'
+        verbose_name = 'Recomendação Pré-calculada'
+        verbose_name_plural = 'Recomendações Pré-calculadas'
+    
+    def __str__(self):
+        return f"Recomendação de {self.usuario.nome} ({self.estrategia})"
+
+
+class ShadowEvaluation(models.Model):
+    """Modelo de avaliação de uma estratégia em modo sombra.
+    
+    Registra, para uma requisição real, os treinos que a estratégia
+    candidata teria recomendado, o tempo que levou e quantos desses
+    treinos coincidem com a recomendação entregue ao usuário, para
+    comparação offline.
+    """
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    estrategia = models.CharField(max_length=100)
+    estrategia_primaria = models.CharField(max_length=100)
+    treinos_ids = models.JSONField(default=list)
+    treinos_primarios_ids = models.JSONField(default=list)
+    coincidentes = models.PositiveSmallIntegerField(default=0)
+    duracao_ms = models.FloatField(null=True)
+    erro = models.CharField(max_length=200, blank=True)
+    versao_catalogo = models.CharField(max_length=64)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'avaliacoes_sombra'
+        verbose_name = 'Avaliação em Modo Sombra'
+        verbose_name_plural = 'Avaliações em Modo Sombra'
+        indexes = [
+            models.Index(fields=['estrategia', 'criado_em'], name='avaliacoes_sombra_estrategia'),
+        ]
+    
+    def __str__(self):
+        return f"{self.estrategia} vs. {self.estrategia_primaria} ({self.coincidentes} coincidentes)"
+
+
+class UserStats(models.Model):
+    """Modelo de estatísticas consolidadas do histórico de um usuário.
+    
+    Mantido incrementalmente pelos signals do histórico, na mesma transação
+    da alteração, para que o dashboard leia os totais sem agregar o
+    histórico inteiro. A sequência atual conta os dias consecutivos com
+    treino registrado que terminam na data do último treino.
+    """
+    usuario = models.OneToOneField(
+        User, 
+        on_delete=models.CASCADE, 
+        related_name='estatisticas'
+    )
+    sessoes = models.IntegerField(default=0)
+    minutos = models.IntegerField(default=0)
+    calorias = models.IntegerField(default=0)
+    ultimo_treino = models.DateField(null=True, blank=True)
+    sequencia_atual = models.IntegerField(default=0)
+    atualizado_em = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'estatisticas_usuarios'
+        verbose_name = 'Estatísticas do Usuário'
+        verbose_name_plural = 'Estatísticas dos Usuários'
+    
+    def __str__(self):
+        return f"Estatísticas de {self.usuario.nome} ({self.sessoes} sessões)"
+    
+    def sequencia_ativa(self, hoje: Optional[date] = None) -> int:
+        """Retorna a sequência atual se ela ainda não foi interrompida.
+        
+        Args:
+            hoje: Data de referência (padrão: hoje).
+            
+        Returns:
+            A sequência atual, se o último treino foi hoje ou ontem, ou zero.
+        """
+        hoje = hoje or date.today()
+        if self.ultimo_treino is None or self.ultimo_treino < hoje - timedelta(days=1):
+            return 0
+        return self.sequencia_atual
+
+
+class HistoryRollup(models.Model):
+    """Totais do histórico de um usuário em um período (semana ou mês).
+    
+    Mantidos incrementalmente pelos signals do histórico, na mesma
+    transação da alteração, para que os gráficos de progresso leiam uma
+    linha por período em vez de agregar os registros do histórico.
+    """
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    inicio = models.DateField()
+    sessoes = models.IntegerField(default=0)
+    minutos = models.IntegerField(default=0)
+    calorias = models.IntegerField(default=0)
+    
+    class Meta:
+        abstract = True
+    
+    def __str__(self):
+        return f"{self.usuario.nome} - {self.inicio} ({self.sessoes} sessões)"
+
+
+class WeeklyHistoryRollup(HistoryRollup):
+    """Totais semanais do histórico; ``inicio`` é a segunda-feira da semana ISO."""
+    
+    class Meta:
+        db_table = 'historico_semanal'
+        verbose_name = 'Total Semanal do Histórico'
+        verbose_name_plural = 'Totais Semanais do Histórico'
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'inicio'], name='historico_semanal_unico'),
+        ]
+
+
+class MonthlyHistoryRollup(HistoryRollup):
+    """Totais mensais do histórico; ``inicio`` é o primeiro dia do mês."""
+    
+    class Meta:
+        db_table = 'historico_mensal'
+        verbose_name = 'Total Mensal do Histórico'
+        verbose_name_plural = 'Totais Mensais do Histórico'
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'inicio'], name='historico_mensal_unico'),
+        ]
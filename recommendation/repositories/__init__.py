@@ -1,11 +1,38 @@
 from .base import BaseRepository
+from .workout_query import WorkoutQuery
+from .history_page import HistoryPage
+from .history_stats import HistoryStats
 from .user_repository import UserRepository
 from .workout_repository import WorkoutRepository
 from .history_repository import HistoryRepository
+from .precomputed_recommendation_repository import PrecomputedRecommendationRepository
+from .cooccurrence_repository import CooccurrenceRepository
+from .shadow_evaluation_repository import ShadowEvaluationRepository
+from .user_stats_repository import UserStatsRepository
+from .history_rollup_repository import HistoryRollupRepository, SeriesPoint
+from .cached_repository import (
+    CachedUserRepository,
+    CachedWorkoutRepository,
+    get_user_repository,
+    get_workout_repository
+)
 
 __all__ = [
     'BaseRepository',
+    'WorkoutQuery',
+    'HistoryPage',
+    'HistoryStats',
     'UserRepository',
     'WorkoutRepository',
     'HistoryRepository',
+    'PrecomputedRecommendationRepository',
+    'CooccurrenceRepository',
+    'ShadowEvaluationRepository',
+    'UserStatsRepository',
+    'HistoryRollupRepository',
+    'SeriesPoint',
+    'CachedUserRepository',
+    'CachedWorkoutRepository',
+    'get_user_repository',
+    'get_workout_repository',
 ]
@@ -1,13 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from django.conf import settings
+
+
+BATCH_SIZE_PADRAO = 1000
 
 
 class BaseRepository(ABC):
     """Interface base para todos os repositórios.
     
     Define operações CRUD padrão que devem ser implementadas por todos
-    os repositórios do sistema.
+    os repositórios do sistema, e operações em lote disponíveis para os
+    repositórios que declaram o ``model`` gerenciado.
     """
+    model = None
+    
+    @property
+    def batch_size(self) -> int:
+        """Tamanho padrão dos lotes, do setting ``RECOMMENDATION_BULK_BATCH_SIZE``."""
+        return getattr(settings, 'RECOMMENDATION_BULK_BATCH_SIZE', BATCH_SIZE_PADRAO)
     
     @abstractmethod
     def get_by_id(self, id: int) -> Optional[Any]:
@@ -65,4 +76,102 @@ class BaseRepository(ABC):
             True se removida com sucesso, False caso contrário.
         """
         pass
-
+    
+    def get_many(self, ids: Iterable[int]) -> Dict[int, Any]:
+        """Busca várias entidades por ID em uma única consulta.
+        
+        Args:
+            ids: Identificadores das entidades.
+            
+        Returns:
+            Dicionário de ID para entidade; IDs inexistentes são omitidos.
+        """
+        return self._get_model().objects.in_bulk(list(ids))
+    
+    def bulk_save(self, entities: Iterable[Any], batch_size: Optional[int] = None) -> List[Any]:
+        """Insere várias entidades novas com ``bulk_create``.
+        
+        Os signals de ``save`` não são disparados; repositórios cujas
+        entidades têm efeitos colaterais os aplicam uma vez para o lote.
+        
+        Args:
+            entities: Entidades a inserir.
+            batch_size: Quantidade de linhas por comando INSERT.
+            
+        Returns:
+            Entidades inseridas, com ID atribuído quando o banco o retorna.
+        """
+        return self._get_model().objects.bulk_create(
+            list(entities), 
+            batch_size=batch_size or self.batch_size
+        )
+    
+    def bulk_update(
+        self, 
+        entities: Iterable[Any], 
+        fields: Iterable[str], 
+        batch_size: Optional[int] = None
+    ) -> int:
+        """Atualiza os campos informados de várias entidades com ``bulk_update``.
+        
+        Campos ``auto_now`` do model são atualizados junto, como em ``save``.
+        
+        Args:
+            entities: Entidades já persistidas, com os novos valores.
+            fields: Nomes dos campos a atualizar.
+            batch_size: Quantidade de entidades por comando UPDATE.
+            
+        Returns:
+            Quantidade de linhas atualizadas.
+        """
+        model = self._get_model()
+        entities = list(entities)
+        fields = list(fields)
+        
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                for entity in entities:
+                    field.pre_save(entity, add=False)
+                if field.name not in fields:
+                    fields.append(field.name)
+        
+        if not entities:
+            return 0
+        return model.objects.bulk_update(
+            entities, 
+            fields, 
+            batch_size=batch_size or self.batch_size
+        )
+    
+    def bulk_delete(self, ids: Iterable[int]) -> int:
+        """Remove várias entidades por ID.
+        
+        Args:
+            ids: Identificadores das entidades a remover.
+            
+        Returns:
+            Quantidade de entidades do model removidas.
+        """
+        model = self._get_model()
+        _, removidos = model.objects.filter(pk__in=list(ids)).delete()
+        return removidos.get(model._meta.label, 0)
+    
+    def iter_all(self, batch_size: Optional[int] = None) -> Iterator[Any]:
+        """Percorre todas as entidades em blocos, sem carregá-las de uma vez.
+        
+        Args:
+            batch_size: Quantidade de linhas lidas por vez do cursor.
+            
+        Returns:
+            Iterador de entidades em ordem de ID.
+        """
+        return self._get_model().objects.order_by('pk').iterator(
+            chunk_size=batch_size or self.batch_size
+        )
+    
+    def _get_model(self):
+        if self.model is None:
+            raise NotImplementedError(
+                f"{type(self).__name__} não declara o model para operações em lote"
+            )
+        return self.model
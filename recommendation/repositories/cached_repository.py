@@ -0,0 +1,170 @@
+import hashlib
+from functools import partial
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from ..models import User, Workout
+from .user_repository import UserRepository
+from .workout_repository import WorkoutRepository
+
+
+CACHE_PREFIX = 'recommendation:repo'
+TTL_PADRAO = 300
+TTL_AUSENTE_PADRAO = 30
+
+# Valor gravado no cache para consultas sem resultado (cache negativo).
+AUSENTE = f'{CACHE_PREFIX}:ausente'
+
+
+def user_email_key(email: str) -> str:
+    """Chave do usuário com o email informado."""
+    return f'{CACHE_PREFIX}:user:email:{hashlib.sha1(email.encode()).hexdigest()}'
+
+
+def workout_id_key(workout_id: int) -> str:
+    """Chave do treino com o ID informado."""
+    return f'{CACHE_PREFIX}:workout:{workout_id}'
+
+
+WORKOUT_ALL_KEY = f'{CACHE_PREFIX}:workout:all'
+
+
+def invalidate_users(emails: Iterable[str]) -> None:
+    """Remove do cache os usuários buscados pelos emails informados.
+    
+    Args:
+        emails: Emails anteriores e atuais dos usuários alterados.
+    """
+    cache.delete_many([user_email_key(email) for email in emails if email])
+
+
+def invalidate_workouts(ids: Iterable[int]) -> None:
+    """Remove do cache os treinos informados e a lista completa de treinos.
+    
+    Args:
+        ids: IDs dos treinos inseridos, alterados ou removidos.
+    """
+    cache.delete_many([workout_id_key(workout_id) for workout_id in ids] + [WORKOUT_ALL_KEY])
+
+
+class ReadThroughCache:
+    """Leitura através do cache do Django, com cache negativo.
+    
+    Resultados encontrados ficam em cache por ``ttl`` segundos e consultas
+    sem resultado por ``ttl_ausente`` segundos. A invalidação é feita pelos
+    signals dos models, de modo que os TTLs apenas limitam o tempo de vida
+    de entradas que uma escrita concorrente tenha deixado desatualizadas.
+    """
+    
+    def __init__(self, ttl: Optional[int] = None, ttl_ausente: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else getattr(
+            settings, 'RECOMMENDATION_REPOSITORY_CACHE_TTL', TTL_PADRAO
+        )
+        self.ttl_ausente = ttl_ausente if ttl_ausente is not None else getattr(
+            settings, 'RECOMMENDATION_REPOSITORY_CACHE_MISS_TTL', TTL_AUSENTE_PADRAO
+        )
+    
+    def get(self, key: str, carregar: Callable[[], Any]) -> Any:
+        """Busca um valor no cache, carregando-o do banco se necessário.
+        
+        Args:
+            key: Chave do valor no cache.
+            carregar: Função que busca o valor no banco; None indica ausência.
+            
+        Returns:
+            Valor em cache ou carregado, ou None se não existir.
+        """
+        valor = cache.get(key)
+        if valor == AUSENTE:
+            return None
+        if valor is not None:
+            return valor
+        
+        valor = carregar()
+        if valor is None:
+            cache.set(key, AUSENTE, self.ttl_ausente)
+        else:
+            cache.set(key, valor, self.ttl)
+        return valor
+    
+    async def aget(self, key: str, carregar: Callable[[], Awaitable[Any]]) -> Any:
+        """Versão assíncrona de ``get``, com uma função de carga assíncrona."""
+        valor = await cache.aget(key)
+        if valor == AUSENTE:
+            return None
+        if valor is not None:
+            return valor
+        
+        valor = await carregar()
+        if valor is None:
+            await cache.aset(key, AUSENTE, self.ttl_ausente)
+        else:
+            await cache.aset(key, valor, self.ttl)
+        return valor
+
+
+class CachedUserRepository(UserRepository):
+    """UserRepository com leitura através do cache para a busca por email.
+    
+    A busca por email é feita em praticamente todas as páginas para
+    identificar o usuário autenticado. O usuário é cacheado junto com
+    suas preferências, e a entrada é invalidada também quando elas mudam.
+    """
+    
+    def __init__(self, cache_leitura: Optional[ReadThroughCache] = None):
+        self.cache = cache_leitura or ReadThroughCache()
+    
+    def _carregar_por_email(self, email: str, com_preferencias: bool = False) -> Optional[User]:
+        return self.cache.get(
+            user_email_key(email), 
+            partial(super()._carregar_por_email, email, True)
+        )
+    
+    async def _acarregar_por_email(self, email: str, com_preferencias: bool = False) -> Optional[User]:
+        return await self.cache.aget(
+            user_email_key(email), 
+            partial(super()._acarregar_por_email, email, True)
+        )
+
+
+class CachedWorkoutRepository(WorkoutRepository):
+    """WorkoutRepository com leitura através do cache por ID e da lista completa."""
+    
+    def __init__(self, cache_leitura: Optional[ReadThroughCache] = None):
+        self.cache = cache_leitura or ReadThroughCache()
+    
+    def get_by_id(self, id: int) -> Optional[Workout]:
+        return self.cache.get(workout_id_key(id), partial(super().get_by_id, id))
+    
+    def get_all(self) -> List[Workout]:
+        return self.cache.get(WORKOUT_ALL_KEY, super().get_all)
+    
+    async def aget_by_id(self, id: int) -> Optional[Workout]:
+        return await self.cache.aget(workout_id_key(id), partial(super().aget_by_id, id))
+    
+    async def aget_all(self) -> List[Workout]:
+        return await self.cache.aget(WORKOUT_ALL_KEY, super().aget_all)
+
+
+def get_user_repository() -> UserRepository:
+    """Retorna o repositório de usuários configurado.
+    
+    Returns:
+        CachedUserRepository se ``RECOMMENDATION_REPOSITORY_CACHE`` estiver
+        habilitado, senão UserRepository.
+    """
+    if getattr(settings, 'RECOMMENDATION_REPOSITORY_CACHE', False):
+        return CachedUserRepository()
+    return UserRepository()
+
+
+def get_workout_repository() -> WorkoutRepository:
+    """Retorna o repositório de treinos configurado.
+    
+    Returns:
+        CachedWorkoutRepository se ``RECOMMENDATION_REPOSITORY_CACHE`` estiver
+        habilitado, senão WorkoutRepository.
+    """
+    if getattr(settings, 'RECOMMENDATION_REPOSITORY_CACHE', False):
+        return CachedWorkoutRepository()
+    return WorkoutRepository()
@@ -0,0 +1,288 @@
+import operator
+from collections import Counter, defaultdict
+from functools import reduce
+from itertools import groupby, islice
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from django.db import transaction
+from django.db.models import Count, F, Q
+from ..models import History, User, WorkoutCooccurrence
+from .base import BaseRepository
+
+
+class CooccurrenceRepository(BaseRepository):
+    """Repositório da matriz de coocorrência entre treinos.
+    
+    Implementa o padrão Repository para isolar a lógica de acesso a dados,
+    fornecendo a atualização incremental da matriz a cada alteração no
+    histórico, a leitura das linhas usadas no cálculo das recomendações
+    e a reconstrução completa a partir do histórico.
+    """
+    
+    def get_by_id(self, id: int) -> Optional[WorkoutCooccurrence]:
+        try:
+            return WorkoutCooccurrence.objects.get(id=id)
+        except WorkoutCooccurrence.DoesNotExist:
+            return None
+    
+    def get_all(self) -> List[WorkoutCooccurrence]:
+        return list(WorkoutCooccurrence.objects.all())
+    
+    def save(self, entity: WorkoutCooccurrence) -> WorkoutCooccurrence:
+        entity.save()
+        return entity
+    
+    def update(self, entity: WorkoutCooccurrence) -> WorkoutCooccurrence:
+        entity.save()
+        return entity
+    
+    def delete(self, id: int) -> bool:
+        try:
+            cooccurrence = WorkoutCooccurrence.objects.get(id=id)
+            cooccurrence.delete()
+            return True
+        except WorkoutCooccurrence.DoesNotExist:
+            return False
+    
+    def add_user_workout(self, user_id: int, workout_id: int) -> None:
+        """Atualiza a matriz após um treino ser adicionado ao histórico.
+        
+        Deve ser chamado depois que o registro foi gravado. Se o usuário já
+        tinha realizado o treino antes, a matriz não muda; caso contrário,
+        a coocorrência do treino com cada treino distinto do histórico do
+        usuário é incrementada.
+        
+        Args:
+            user_id: ID do usuário.
+            workout_id: ID do treino adicionado.
+        """
+        self.replace_user_workout(user_id, None, workout_id)
+    
+    def remove_user_workout(self, user_id: int, workout_id: int) -> None:
+        """Atualiza a matriz após um treino ser removido do histórico.
+        
+        Deve ser chamado depois que o registro foi removido. Se o usuário
+        ainda tem outro registro do mesmo treino, a matriz não muda.
+        
+        Args:
+            user_id: ID do usuário.
+            workout_id: ID do treino removido.
+        """
+        self.replace_user_workout(user_id, workout_id, None)
+    
+    def replace_user_workout(
+        self, 
+        user_id: int, 
+        removido: Optional[int], 
+        adicionado: Optional[int]
+    ) -> None:
+        """Atualiza a matriz após um registro do histórico trocar de treino.
+        
+        Deve ser chamado depois que a alteração foi gravada. A remoção é
+        aplicada sobre o histórico anterior à alteração e a adição sobre o
+        histórico atual. Apenas os registros dos treinos alterados são
+        contados; os treinos distintos do usuário só são lidos quando a
+        matriz muda, isto é, quando o treino removido deixou o histórico ou
+        o adicionado entrou nele pela primeira vez.
+        
+        As alterações de um mesmo usuário são serializadas pela trava da
+        linha do usuário, mantida até o fim da transação: uma gravação
+        concorrente só conta o histórico depois que a anterior foi
+        confirmada, de modo que nenhum par é contado duas vezes ou perdido.
+        
+        Args:
+            user_id: ID do usuário.
+            removido: ID do treino que saiu do histórico, ou None.
+            adicionado: ID do treino que entrou no histórico, ou None.
+        """
+        alterados = [treino for treino in (removido, adicionado) if treino is not None]
+        if not alterados:
+            return
+        
+        with transaction.atomic():
+            # FOR NO KEY UPDATE não conflita com a trava que o INSERT no
+            # histórico já mantém sobre o usuário (chave estrangeira).
+            list(User.objects.select_for_update(no_key=True).filter(pk=user_id).values_list('pk'))
+            
+            contagens = dict(
+                History.objects
+                .filter(usuario_id=user_id, treino_id__in=alterados)
+                .values_list('treino_id')
+                .annotate(Count('id'))
+                .order_by()
+            )
+            remover = removido is not None and not contagens.get(removido)
+            adicionar = adicionado is not None and contagens.get(adicionado) == 1
+            if not (remover or adicionar):
+                return
+            
+            distintos = self._treinos_distintos_do_usuario(user_id)
+            if remover:
+                self._ajustar(removido, distintos - {adicionado} if adicionar else distintos, -1)
+            if adicionar:
+                self._ajustar(adicionado, distintos - {adicionado}, 1)
+    
+    def apply_user_changes(
+        self, 
+        antes: Dict[int, Set[int]], 
+        depois: Dict[int, Set[int]], 
+        batch_size: int = 1000
+    ) -> None:
+        """Atualiza a matriz após uma alteração em lote no histórico.
+        
+        Para cada usuário, desconta os pares que envolvem treinos que saíram
+        do seu histórico e soma os pares que envolvem treinos que entraram.
+        As variações de todos os usuários são acumuladas e aplicadas com
+        poucos comandos, agrupadas pela variação de cada par.
+        
+        Args:
+            antes: Treinos distintos de cada usuário antes da alteração.
+            depois: Treinos distintos de cada usuário depois da alteração.
+            batch_size: Quantidade de linhas por comando INSERT.
+        """
+        deltas = Counter()
+        for user_id in set(antes) | set(depois):
+            anteriores = antes.get(user_id, set())
+            atuais = depois.get(user_id, set())
+            self._acumular_pares(deltas, anteriores, anteriores - atuais, -1)
+            self._acumular_pares(deltas, atuais, atuais - anteriores, 1)
+        
+        por_delta = defaultdict(lambda: defaultdict(list))
+        for (a, b), delta in deltas.items():
+            if delta:
+                por_delta[delta][a].append(b)
+        if not por_delta:
+            return
+        
+        with transaction.atomic():
+            WorkoutCooccurrence.objects.bulk_create(
+                (
+                    WorkoutCooccurrence(treino_a_id=a, treino_b_id=b)
+                    for (a, b), delta in deltas.items() if delta > 0
+                ),
+                batch_size=batch_size,
+                ignore_conflicts=True
+            )
+            
+            for delta, linhas in por_delta.items():
+                linhas = iter(linhas.items())
+                while lote := list(islice(linhas, 100)):
+                    pares = reduce(operator.or_, (
+                        Q(treino_a_id=a, treino_b_id__in=bs) for a, bs in lote
+                    ))
+                    WorkoutCooccurrence.objects.filter(pares).update(
+                        contagem=F('contagem') + delta
+                    )
+                    if delta < 0:
+                        WorkoutCooccurrence.objects.filter(pares, contagem__lte=0).delete()
+    
+    def get_rows(self, workout_ids: Iterable[int]) -> Dict[int, List[Tuple[int, int]]]:
+        """Busca as linhas da matriz de um conjunto de treinos.
+        
+        Args:
+            workout_ids: IDs dos treinos (linhas da matriz).
+            
+        Returns:
+            Dicionário de ID do treino para a lista de pares
+            (ID do treino coocorrente, contagem), incluindo a diagonal.
+        """
+        linhas = defaultdict(list)
+        queryset = WorkoutCooccurrence.objects.filter(
+            treino_a_id__in=list(workout_ids)
+        ).values_list('treino_a_id', 'treino_b_id', 'contagem')
+        for treino_a, treino_b, contagem in queryset:
+            linhas[treino_a].append((treino_b, contagem))
+        return linhas
+    
+    def rebuild(self, chunk_size: int = 5000, batch_size: int = 1000) -> int:
+        """Reconstrói a matriz inteira a partir do histórico.
+        
+        Percorre os pares (usuário, treino) distintos do histórico em
+        ordem de usuário, acumula as contagens em memória e substitui o
+        conteúdo da tabela em uma única transação.
+        
+        Args:
+            chunk_size: Tamanho dos blocos lidos do cursor do banco.
+            batch_size: Quantidade de linhas por comando INSERT.
+            
+        Returns:
+            Quantidade de linhas gravadas na matriz.
+        """
+        contagens = Counter()
+        pares = (
+            History.objects
+            .filter(treino__isnull=False)
+            .values_list('usuario_id', 'treino_id')
+            .order_by('usuario_id', 'treino_id')
+            .distinct()
+            .iterator(chunk_size=chunk_size)
+        )
+        for _, grupo in groupby(pares, key=lambda par: par[0]):
+            treinos = [treino_id for _, treino_id in grupo]
+            for treino_a in treinos:
+                for treino_b in treinos:
+                    contagens[(treino_a, treino_b)] += 1
+        
+        with transaction.atomic():
+            WorkoutCooccurrence.objects.all().delete()
+            WorkoutCooccurrence.objects.bulk_create(
+                (
+                    WorkoutCooccurrence(treino_a_id=a, treino_b_id=b, contagem=contagem)
+                    for (a, b), contagem in contagens.items()
+                ),
+                batch_size=batch_size
+            )
+        
+        return len(contagens)
+    
+    def _acumular_pares(
+        self, 
+        deltas: Counter, 
+        treinos: Set[int], 
+        alterados: Set[int], 
+        delta: int
+    ) -> None:
+        """Soma ``delta`` aos pares de ``treinos`` que envolvem algum treino alterado."""
+        for alterado in alterados:
+            for outro in treinos:
+                deltas[(alterado, outro)] += delta
+                if outro not in alterados:
+                    deltas[(outro, alterado)] += delta
+    
+    def _treinos_distintos_do_usuario(self, user_id: int) -> Set[int]:
+        return set(
+            History.objects
+            .filter(usuario_id=user_id, treino__isnull=False)
+            .values_list('treino_id', flat=True)
+            .distinct()
+        )
+    
+    def _ajustar(self, workout_id: int, outros: set, delta: int) -> None:
+        """Soma ``delta`` à linha, à coluna e à diagonal de um treino.
+        
+        As linhas ausentes são criadas com contagem zero antes do
+        incremento, de modo que atualizações concorrentes do mesmo par não
+        percam incrementos. Linhas que chegam a zero são removidas.
+        
+        Args:
+            workout_id: ID do treino adicionado ou removido.
+            outros: IDs dos demais treinos distintos do histórico do usuário.
+            delta: +1 para adição, -1 para remoção.
+        """
+        linha = outros | {workout_id}
+        pares = Q(treino_a_id=workout_id, treino_b_id__in=linha) | Q(
+            treino_a_id__in=outros,
+            treino_b_id=workout_id
+        )
+        
+        with transaction.atomic():
+            if delta > 0:
+                WorkoutCooccurrence.objects.bulk_create(
+                    [WorkoutCooccurrence(treino_a_id=workout_id, treino_b_id=b) for b in linha]
+                    + [WorkoutCooccurrence(treino_a_id=a, treino_b_id=workout_id) for a in outros],
+                    ignore_conflicts=True
+                )
+            
+            WorkoutCooccurrence.objects.filter(pares).update(contagem=F('contagem') + delta)
+            
+            if delta < 0:
+                WorkoutCooccurrence.objects.filter(pares, contagem__lte=0).delete()
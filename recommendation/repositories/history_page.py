@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class HistoryPage:
+    """Página do histórico de um usuário, em ordem decrescente de (data, id).
+    
+    Attributes:
+        itens: Registros da página.
+        proximo_cursor: Cursor da próxima página, ou None se esta for a última.
+    """
+    itens: List
+    proximo_cursor: Optional[str] = None
+    
+    @property
+    def tem_proxima(self) -> bool:
+        return self.proximo_cursor is not None
+
+
+def encode_cursor(data: date, id: int) -> str:
+    """Codifica a posição de um registro como cursor opaco.
+    
+    Args:
+        data: Data do registro.
+        id: ID do registro.
+        
+    Returns:
+        Cursor no formato ``AAAA-MM-DD_id``.
+    """
+    return f'{data.isoformat()}_{id}'
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """Decodifica um cursor gerado por ``encode_cursor``.
+    
+    Args:
+        cursor: Cursor recebido do cliente.
+        
+    Returns:
+        Tupla (data, id) do último registro da página anterior.
+        
+    Raises:
+        ValueError: Se o cursor for inválido.
+    """
+    data, _, id = cursor.partition('_')
+    return date.fromisoformat(data), int(id)
@@ -1,7 +1,14 @@
-from typing import List, Optional
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
 from datetime import date
+from django.db import transaction
+from django.db.models import Count, F, Q, QuerySet, Sum, Window
+from django.db.models.functions import Coalesce, RowNumber
 from ..models import History, User
 from .base import BaseRepository
+from .history_page import HistoryPage, decode_cursor, encode_cursor
+from .history_stats import HistoryStats
+from .signals import bulk_operation, history_bulk_changed
 
 
 class HistoryRepository(BaseRepository):
@@ -10,7 +17,12 @@ class HistoryRepository(BaseRepository):
     Implementa o padrão Repository para isolar a lógica de acesso a dados,
     fornecendo métodos específicos para busca de histórico por usuário,
     período e registros recentes.
+    
+    As operações em lote enviam um único ``history_bulk_changed`` com os
+    treinos distintos dos usuários afetados antes e depois da operação,
+    no lugar dos signals por registro.
     """
+    model = History
     
     def get_by_id(self, id: int) -> Optional[History]:
         try:
@@ -46,7 +58,7 @@ class HistoryRepository(BaseRepository):
         Returns:
             Lista de históricos ordenada por data (mais recente primeiro).
         """
-        return list(History.objects.filter(usuario=user).order_by('-data'))
+        return list(History.objects.filter(usuario=user).select_related('treino').order_by('-data'))
     
     def find_by_user_and_date_range(
         self, 
@@ -78,7 +90,233 @@ class HistoryRepository(BaseRepository):
             limit: Número máximo de registros a retornar (padrão: 10).
             
         Returns:
-            Lista dos registros mais recentes ordenada por data.
+            Lista dos registros mais recentes ordenada por data e ID.
+        """
+        return self.get_page_by_user(user, limit).itens
+    
+    def get_page_by_user(
+        self, 
+        user: User, 
+        limit: int = 20, 
+        cursor: Optional[str] = None
+    ) -> HistoryPage:
+        """Busca uma página do histórico de um usuário por cursor (keyset).
+        
+        Os registros são ordenados por (data, id) decrescentes, a ordem do
+        índice ``historico_usuario_data_id``. A página seguinte começa logo
+        após o último registro da anterior, sem OFFSET, de modo que qualquer
+        página custa o mesmo que a primeira.
+        
+        Args:
+            user: Usuário para buscar histórico.
+            limit: Número máximo de registros da página.
+            cursor: Cursor retornado pela página anterior, ou None para a primeira.
+            
+        Returns:
+            Página com os registros e o cursor da próxima página.
+            
+        Raises:
+            ValueError: Se o cursor for inválido.
+        """
+        return self._montar_pagina(list(self._queryset_da_pagina(user, limit, cursor)), limit)
+    
+    def stats_for_user(self, user: User, since: Optional[date] = None) -> HistoryStats:
+        """Calcula as estatísticas do histórico de um usuário no banco.
+        
+        Usa uma única consulta de agregação sobre o histórico e os treinos,
+        independentemente da quantidade de registros. Registros sem treino
+        contam como sessão, mas não somam minutos nem calorias.
+        
+        Args:
+            user: Usuário dono do histórico.
+            since: Data inicial opcional; registros anteriores são ignorados.
+            
+        Returns:
+            Quantidade de sessões, minutos e calorias do período.
+        """
+        return HistoryStats(**self._queryset_das_stats(user, since).aggregate(**_totais()))
+    
+    def recent_workout_ids_by_user(
+        self, 
+        user_ids: Iterable[int], 
+        limit: int = 20
+    ) -> Dict[int, List[int]]:
+        """Busca os treinos distintos mais recentes de vários usuários.
+        
+        Usa uma única consulta para todos os usuários, limitada no banco a
+        ``limit`` registros por usuário: com um único usuário por LIMIT e
+        com vários por ROW_NUMBER() particionado por usuário, de modo que o
+        custo não cresce com o tamanho do histórico.
+        
+        Args:
+            user_ids: IDs dos usuários.
+            limit: Número máximo de registros considerados por usuário.
+            
+        Returns:
+            Dicionário de ID do usuário para os IDs dos treinos distintos
+            entre os ``limit`` registros mais recentes, do mais recente
+            para o mais antigo.
+        """
+        recentes = {user_id: [] for user_id in user_ids}
+        if not recentes or limit <= 0:
+            return recentes
+        
+        queryset = History.objects.filter(usuario_id__in=list(recentes), treino__isnull=False)
+        if len(recentes) == 1:
+            queryset = queryset.order_by('-data', '-id')[:limit]
+        else:
+            queryset = queryset.annotate(
+                posicao=Window(
+                    RowNumber(),
+                    partition_by=F('usuario_id'),
+                    order_by=[F('data').desc(), F('id').desc()]
+                )
+            ).filter(posicao__lte=limit).order_by('usuario_id', '-data', '-id')
+        
+        for user_id, treino_id in queryset.values_list('usuario_id', 'treino_id'):
+            if treino_id not in recentes[user_id]:
+                recentes[user_id].append(treino_id)
+        
+        return recentes
+    
+    def distinct_workouts_by_user(self, user_ids: Iterable[int]) -> Dict[int, Set[int]]:
+        """Busca os treinos distintos do histórico de vários usuários.
+        
+        Usa uma única consulta para todos os usuários.
+        
+        Args:
+            user_ids: IDs dos usuários.
+            
+        Returns:
+            Dicionário de ID do usuário para o conjunto de IDs dos treinos
+            do seu histórico; todo usuário informado está presente.
+        """
+        treinos = {user_id: set() for user_id in user_ids}
+        queryset = History.objects.filter(
+            usuario_id__in=list(treinos),
+            treino__isnull=False
+        ).values_list('usuario_id', 'treino_id').distinct()
+        
+        for user_id, treino_id in queryset:
+            treinos[user_id].add(treino_id)
+        
+        return treinos
+    
+    async def aget_by_id(self, id: int) -> Optional[History]:
+        """Versão assíncrona de ``get_by_id``."""
+        try:
+            return await History.objects.aget(id=id)
+        except History.DoesNotExist:
+            return None
+    
+    async def afind_by_user(self, user: User) -> List[History]:
+        """Versão assíncrona de ``find_by_user``."""
+        return [
+            history
+            async for history in History.objects.filter(usuario=user).select_related('treino').order_by('-data')
+        ]
+    
+    async def aget_recent_by_user(self, user: User, limit: int = 10) -> List[History]:
+        """Versão assíncrona de ``get_recent_by_user``."""
+        return (await self.aget_page_by_user(user, limit)).itens
+    
+    async def aget_page_by_user(
+        self, 
+        user: User, 
+        limit: int = 20, 
+        cursor: Optional[str] = None
+    ) -> HistoryPage:
+        """Versão assíncrona de ``get_page_by_user``.
+        
+        Raises:
+            ValueError: Se o cursor for inválido.
         """
-        return list(History.objects.filter(usuario=user).order_by('-data')[:limit])
+        queryset = self._queryset_da_pagina(user, limit, cursor)
+        return self._montar_pagina([history async for history in queryset], limit)
+    
+    async def astats_for_user(self, user: User, since: Optional[date] = None) -> HistoryStats:
+        """Versão assíncrona de ``stats_for_user``."""
+        return HistoryStats(**await self._queryset_das_stats(user, since).aaggregate(**_totais()))
+    
+    def bulk_save(self, entities: Iterable[History], batch_size: Optional[int] = None) -> List[History]:
+        entities = list(entities)
+        salvar = super().bulk_save
+        return self._alterar_em_lote(
+            {entity.usuario_id for entity in entities},
+            lambda: salvar(entities, batch_size)
+        )
+    
+    def bulk_update(
+        self, 
+        entities: Iterable[History], 
+        fields: Iterable[str], 
+        batch_size: Optional[int] = None
+    ) -> int:
+        entities = list(entities)
+        usuarios = {entity.usuario_id for entity in entities}
+        usuarios.update(
+            History.objects
+            .filter(pk__in=[entity.pk for entity in entities])
+            .values_list('usuario_id', flat=True)
+        )
+        atualizar = super().bulk_update
+        return self._alterar_em_lote(
+            usuarios,
+            lambda: atualizar(entities, fields, batch_size)
+        )
+    
+    def bulk_delete(self, ids: Iterable[int]) -> int:
+        ids = list(ids)
+        usuarios = set(
+            History.objects.filter(pk__in=ids).values_list('usuario_id', flat=True)
+        )
+        remover = super().bulk_delete
+        return self._alterar_em_lote(
+            usuarios,
+            lambda: remover(ids)
+        )
+    
+    def _alterar_em_lote(self, user_ids: Set[int], operacao: Callable[[], Any]) -> Any:
+        """Executa uma operação em lote e notifica a mudança no histórico.
+        
+        Args:
+            user_ids: IDs dos usuários cujo histórico pode mudar.
+            operacao: Função que executa a operação.
+            
+        Returns:
+            Retorno da operação.
+        """
+        with transaction.atomic(), bulk_operation():
+            antes = self.distinct_workouts_by_user(user_ids)
+            resultado = operacao()
+            depois = self.distinct_workouts_by_user(user_ids)
+            history_bulk_changed.send(sender=History, antes=antes, depois=depois)
+        return resultado
+    
+    def _queryset_da_pagina(self, user: User, limit: int, cursor: Optional[str]) -> QuerySet:
+        queryset = History.objects.filter(usuario=user)
+        if cursor is not None:
+            data, id = decode_cursor(cursor)
+            queryset = queryset.filter(Q(data__lt=data) | Q(data=data, id__lt=id))
+        return queryset.select_related('treino').order_by('-data', '-id')[:limit + 1]
+    
+    def _montar_pagina(self, itens: List[History], limit: int) -> HistoryPage:
+        if len(itens) <= limit:
+            return HistoryPage(itens)
+        
+        itens = itens[:limit]
+        return HistoryPage(itens, encode_cursor(itens[-1].data, itens[-1].id))
+    
+    def _queryset_das_stats(self, user: User, since: Optional[date]) -> QuerySet:
+        queryset = History.objects.filter(usuario=user)
+        if since is not None:
+            queryset = queryset.filter(data__gte=since)
+        return queryset
+
 
+def _totais() -> Dict[str, Any]:
+    return {
+        'sessoes': Count('id'),
+        'minutos': Coalesce(Sum('treino__duracao_minutos'), 0),
+        'calorias': Coalesce(Sum('treino__calorias_estimadas'), 0),
+    }
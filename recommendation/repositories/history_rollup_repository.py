@@ -0,0 +1,233 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterable, List
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
+from ..models import History, MonthlyHistoryRollup, User, WeeklyHistoryRollup
+from .base import BaseRepository
+
+
+@dataclass(frozen=True)
+class SeriesPoint:
+    """Totais do histórico em um período da série de progresso.
+    
+    Attributes:
+        inicio: Primeiro dia do período.
+        sessoes: Quantidade de registros no período.
+        minutos: Soma da duração dos treinos do período.
+        calorias: Soma das calorias estimadas dos treinos do período.
+    """
+    inicio: date
+    sessoes: int = 0
+    minutos: int = 0
+    calorias: int = 0
+
+
+def week_start(data: date) -> date:
+    """Retorna a segunda-feira da semana ISO da data."""
+    return data - timedelta(days=data.weekday())
+
+
+def month_start(data: date) -> date:
+    """Retorna o primeiro dia do mês da data."""
+    return data.replace(day=1)
+
+
+def _proxima_semana(inicio: date) -> date:
+    return inicio + timedelta(days=7)
+
+
+def _proximo_mes(inicio: date) -> date:
+    return (inicio + timedelta(days=32)).replace(day=1)
+
+
+# Período -> (model, início do período, início do período seguinte, truncamento SQL)
+PERIODOS = {
+    'semana': (WeeklyHistoryRollup, week_start, _proxima_semana, TruncWeek),
+    'mes': (MonthlyHistoryRollup, month_start, _proximo_mes, TruncMonth),
+}
+
+
+class HistoryRollupRepository(BaseRepository):
+    """Repositório dos totais do histórico por período (semana ou mês).
+    
+    Implementa o padrão Repository para isolar a lógica de acesso a dados,
+    fornecendo a atualização incremental dos totais a cada alteração no
+    histórico, a série densa usada nos gráficos de progresso e a
+    reconstrução a partir do histórico. Cada instância opera sobre um
+    período.
+    """
+    
+    def __init__(self, periodo: str = 'semana'):
+        try:
+            self.model, self._inicio_de, self._seguinte, self._truncar = PERIODOS[periodo]
+        except KeyError:
+            raise ValueError(f"Período '{periodo}' inválido; use um de {sorted(PERIODOS)}")
+        self.periodo = periodo
+    
+    def get_by_id(self, id: int):
+        try:
+            return self.model.objects.get(id=id)
+        except self.model.DoesNotExist:
+            return None
+    
+    def get_all(self) -> List:
+        return list(self.model.objects.all())
+    
+    def save(self, entity):
+        entity.save()
+        return entity
+    
+    def update(self, entity):
+        entity.save()
+        return entity
+    
+    def delete(self, id: int) -> bool:
+        try:
+            rollup = self.model.objects.get(id=id)
+            rollup.delete()
+            return True
+        except self.model.DoesNotExist:
+            return False
+    
+    def period_start(self, data: date) -> date:
+        """Retorna o primeiro dia do período que contém a data."""
+        return self._inicio_de(data)
+    
+    def apply_history_change(
+        self,
+        user_id: int,
+        data: date,
+        sessoes: int,
+        minutos: int,
+        calorias: int,
+        criar: bool = False
+    ) -> None:
+        """Aplica a variação de uma alteração no histórico ao período da data.
+        
+        Os totais são somados com expressões F, sem ler o valor anterior, de
+        modo que inserções concorrentes não percam incrementos. Períodos que
+        ficam sem sessões são removidos.
+        
+        Args:
+            user_id: ID do usuário.
+            data: Data do registro alterado.
+            sessoes: Variação da quantidade de sessões.
+            minutos: Variação dos minutos.
+            calorias: Variação das calorias.
+            criar: Cria o período com totais zerados se ele não existir.
+        """
+        filtro = {'usuario_id': user_id, 'inicio': self.period_start(data)}
+        
+        with transaction.atomic():
+            if criar:
+                self.model.objects.bulk_create([self.model(**filtro)], ignore_conflicts=True)
+            
+            self.model.objects.filter(**filtro).update(
+                sessoes=F('sessoes') + sessoes,
+                minutos=F('minutos') + minutos,
+                calorias=F('calorias') + calorias
+            )
+            
+            if sessoes < 0:
+                self.model.objects.filter(**filtro, sessoes__lte=0).delete()
+    
+    def series_for_user(self, user: User, inicio: date, fim: date) -> List[SeriesPoint]:
+        """Busca a série densa de totais de um usuário em um intervalo.
+        
+        Usa uma única consulta pelo índice (usuário, início do período);
+        períodos sem registros aparecem com totais zerados.
+        
+        Args:
+            user: Usuário dono do histórico.
+            inicio: Data inicial; a série começa no período que a contém.
+            fim: Data final; a série termina no período que a contém.
+            
+        Returns:
+            Um ponto por período, em ordem cronológica.
+        """
+        primeiro = self.period_start(inicio)
+        totais = {
+            linha.inicio: linha
+            for linha in self.model.objects.filter(
+                usuario=user,
+                inicio__gte=primeiro,
+                inicio__lte=fim
+            ).order_by('inicio')
+        }
+        
+        serie = []
+        periodo = primeiro
+        while periodo <= fim:
+            linha = totais.get(periodo)
+            if linha is None:
+                serie.append(SeriesPoint(periodo))
+            else:
+                serie.append(SeriesPoint(periodo, linha.sessoes, linha.minutos, linha.calorias))
+            periodo = self._seguinte(periodo)
+        return serie
+    
+    def rebuild_for_users(self, user_ids: Iterable[int]) -> None:
+        """Recalcula os totais de vários usuários a partir do histórico.
+        
+        Substitui os períodos dos usuários pelos agregados do histórico,
+        calculados com uma única consulta. IDs de usuários que não existem
+        mais são ignorados.
+        
+        Args:
+            user_ids: IDs dos usuários.
+        """
+        user_ids = list(User.objects.filter(pk__in=list(user_ids)).values_list('pk', flat=True))
+        if not user_ids:
+            return
+        
+        totais = (
+            History.objects
+            .filter(usuario_id__in=user_ids)
+            .annotate(periodo=self._truncar('data'))
+            .values('usuario_id', 'periodo')
+            .annotate(
+                total_sessoes=Count('id'),
+                total_minutos=Coalesce(Sum('treino__duracao_minutos'), 0),
+                total_calorias=Coalesce(Sum('treino__calorias_estimadas'), 0)
+            )
+            .order_by()
+        )
+        
+        with transaction.atomic():
+            self.model.objects.filter(usuario_id__in=user_ids).delete()
+            self.model.objects.bulk_create(
+                (
+                    self.model(
+                        usuario_id=linha['usuario_id'],
+                        inicio=linha['periodo'],
+                        sessoes=linha['total_sessoes'],
+                        minutos=linha['total_minutos'],
+                        calorias=linha['total_calorias']
+                    )
+                    for linha in totais
+                ),
+                batch_size=self.batch_size
+            )
+    
+    def rebuild(self, batch_size: int = 500) -> int:
+        """Recalcula os totais de todos os usuários, em lotes.
+        
+        Cada lote é gravado em sua própria transação, de modo que o
+        backfill não bloqueia a tabela inteira.
+        
+        Args:
+            batch_size: Quantidade de usuários por lote.
+            
+        Returns:
+            Quantidade de usuários recalculados.
+        """
+        total = 0
+        ids = User.objects.order_by('pk').values_list('pk', flat=True)
+        ultimo_id = 0
+        while lote := list(ids.filter(pk__gt=ultimo_id)[:batch_size]):
+            self.rebuild_for_users(lote)
+            total += len(lote)
+            ultimo_id = lote[-1]
+        return total
@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class HistoryStats:
+    """Estatísticas agregadas do histórico de um usuário.
+    
+    Attributes:
+        sessoes: Quantidade de registros no histórico.
+        minutos: Soma da duração dos treinos realizados.
+        calorias: Soma das calorias estimadas dos treinos realizados.
+    """
+    sessoes: int = 0
+    minutos: int = 0
+    calorias: int = 0
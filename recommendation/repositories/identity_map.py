@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Hashable, Iterator, Optional
+
+
+class IdentityMap:
+    """Mapa de identidade das entidades carregadas em um escopo.
+    
+    Cada entidade é buscada no banco no máximo uma vez por escopo
+    (normalmente uma requisição); buscas repetidas pela mesma chave
+    retornam a mesma instância sem consultas. Buscas sem resultado
+    também são lembradas.
+    """
+    
+    def __init__(self):
+        self._entidades = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, model, chave: Hashable, carregar: Callable[[], Any]) -> Any:
+        """Busca uma entidade no mapa, carregando-a se necessário.
+        
+        Args:
+            model: Classe do model da entidade.
+            chave: Chave da busca, por exemplo ('email', email).
+            carregar: Função que busca a entidade; None indica ausência.
+            
+        Returns:
+            Entidade mapeada ou carregada, ou None se não existir.
+        """
+        key = (model._meta.label, chave)
+        try:
+            entidade = self._entidades[key]
+        except KeyError:
+            self.misses += 1
+            entidade = self._entidades[key] = carregar()
+            return entidade
+        self.hits += 1
+        return entidade
+    
+    async def aget(self, model, chave: Hashable, carregar: Callable[[], Awaitable[Any]]) -> Any:
+        """Versão assíncrona de ``get``, com uma função de carga assíncrona."""
+        key = (model._meta.label, chave)
+        try:
+            entidade = self._entidades[key]
+        except KeyError:
+            self.misses += 1
+            entidade = self._entidades[key] = await carregar()
+            return entidade
+        self.hits += 1
+        return entidade
+    
+    def discard(self, model) -> None:
+        """Esquece todas as entidades de um model, por exemplo após uma escrita.
+        
+        Args:
+            model: Classe do model cujas entidades serão esquecidas.
+        """
+        label = model._meta.label
+        for key in [key for key in self._entidades if key[0] == label]:
+            del self._entidades[key]
+    
+    def __len__(self) -> int:
+        return len(self._entidades)
+
+
+_mapa_atual = ContextVar('identity_map', default=None)
+
+
+@contextmanager
+def identity_map_scope() -> Iterator[IdentityMap]:
+    """Ativa um mapa de identidade novo durante o trecho."""
+    mapa = IdentityMap()
+    token = _mapa_atual.set(mapa)
+    try:
+        yield mapa
+    finally:
+        _mapa_atual.reset(token)
+
+
+def current_identity_map() -> Optional[IdentityMap]:
+    """Retorna o mapa de identidade ativo, ou None fora de um escopo."""
+    return _mapa_atual.get()
@@ -0,0 +1,137 @@
+from typing import Iterable, Iterator, List, Optional
+from django.db.models import F, Q
+from ..models import PrecomputedRecommendation, User
+from .base import BaseRepository
+
+
+class PrecomputedRecommendationRepository(BaseRepository):
+    """Repositório para recomendações pré-calculadas.
+    
+    Implementa o padrão Repository para isolar a lógica de acesso a dados,
+    fornecendo busca por usuário, gravação em lote e seleção dos usuários
+    cujas recomendações precisam ser recalculadas.
+    """
+    
+    def get_by_id(self, id: int) -> Optional[PrecomputedRecommendation]:
+        try:
+            return PrecomputedRecommendation.objects.get(id=id)
+        except PrecomputedRecommendation.DoesNotExist:
+            return None
+    
+    def get_all(self) -> List[PrecomputedRecommendation]:
+        return list(PrecomputedRecommendation.objects.all())
+    
+    def save(self, entity: PrecomputedRecommendation) -> PrecomputedRecommendation:
+        entity.save()
+        return entity
+    
+    def update(self, entity: PrecomputedRecommendation) -> PrecomputedRecommendation:
+        entity.save()
+        return entity
+    
+    def delete(self, id: int) -> bool:
+        try:
+            recommendation = PrecomputedRecommendation.objects.get(id=id)
+            recommendation.delete()
+            return True
+        except PrecomputedRecommendation.DoesNotExist:
+            return False
+    
+    def get_by_user(self, user: User) -> Optional[PrecomputedRecommendation]:
+        """Busca a recomendação pré-calculada de um usuário.
+        
+        Args:
+            user: Usuário dono da recomendação.
+            
+        Returns:
+            Recomendação encontrada ou None se não existir.
+        """
+        try:
+            return PrecomputedRecommendation.objects.get(usuario=user)
+        except PrecomputedRecommendation.DoesNotExist:
+            return None
+    
+    async def aget_by_user(self, user: User) -> Optional[PrecomputedRecommendation]:
+        """Versão assíncrona de ``get_by_user``."""
+        try:
+            return await PrecomputedRecommendation.objects.aget(usuario=user)
+        except PrecomputedRecommendation.DoesNotExist:
+            return None
+    
+    def delete_by_user_id(self, user_id: int) -> None:
+        """Descarta a recomendação pré-calculada de um usuário.
+        
+        Args:
+            user_id: ID do usuário.
+        """
+        PrecomputedRecommendation.objects.filter(usuario_id=user_id).delete()
+    
+    def delete_by_user_ids(self, user_ids: Iterable[int]) -> None:
+        """Descarta as recomendações pré-calculadas de vários usuários.
+        
+        Args:
+            user_ids: IDs dos usuários.
+        """
+        PrecomputedRecommendation.objects.filter(usuario_id__in=list(user_ids)).delete()
+    
+    def upsert_many(
+        self, 
+        entities: List[PrecomputedRecommendation], 
+        batch_size: int = 500
+    ) -> None:
+        """Grava recomendações em lote, substituindo as existentes.
+        
+        Usa um único INSERT ... ON CONFLICT por lote, com o usuário como
+        chave de conflito.
+        
+        Args:
+            entities: Recomendações a gravar.
+            batch_size: Quantidade de linhas por comando INSERT.
+        """
+        PrecomputedRecommendation.objects.bulk_create(
+            entities,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['usuario'],
+            update_fields=[
+                'treinos_ids',
+                'justificativa',
+                'estrategia',
+                'versao_catalogo',
+                'calculado_em',
+            ]
+        )
+    
+    def iter_user_ids_to_refresh(
+        self, 
+        versao_catalogo: str, 
+        incremental: bool = False,
+        chunk_size: int = 2000
+    ) -> Iterator[int]:
+        """Percorre os IDs dos usuários que precisam de nova recomendação.
+        
+        No modo incremental, seleciona apenas usuários sem recomendação,
+        com recomendação calculada sobre outro catálogo, ou cujo perfil ou
+        preferências foram alterados depois do último cálculo. Alterações
+        no histórico descartam a recomendação via signal.
+        
+        Args:
+            versao_catalogo: Fingerprint do catálogo atual.
+            incremental: Se False, retorna todos os usuários.
+            chunk_size: Tamanho dos blocos lidos do cursor do banco.
+            
+        Returns:
+            Iterador de IDs em ordem crescente.
+        """
+        queryset = User.objects.order_by('pk')
+        
+        if incremental:
+            calculado_em = F('recomendacao_precalculada__calculado_em')
+            queryset = queryset.filter(
+                Q(recomendacao_precalculada__isnull=True)
+                | ~Q(recomendacao_precalculada__versao_catalogo=versao_catalogo)
+                | Q(atualizado_em__gt=calculado_em)
+                | Q(preferencias__atualizado_em__gt=calculado_em)
+            )
+        
+        return queryset.values_list('pk', flat=True).iterator(chunk_size=chunk_size)
@@ -0,0 +1,59 @@
+from typing import Dict, List, Optional
+from django.db.models import Avg, Count, Max, Q
+from ..models import ShadowEvaluation
+from .base import BaseRepository
+
+
+class ShadowEvaluationRepository(BaseRepository):
+    """Repositório das avaliações de estratégias em modo sombra.
+    
+    Implementa o padrão Repository para isolar a lógica de acesso a dados,
+    fornecendo a gravação das avaliações e o resumo por estratégia usado
+    na comparação offline.
+    """
+    
+    def get_by_id(self, id: int) -> Optional[ShadowEvaluation]:
+        try:
+            return ShadowEvaluation.objects.get(id=id)
+        except ShadowEvaluation.DoesNotExist:
+            return None
+    
+    def get_all(self) -> List[ShadowEvaluation]:
+        return list(ShadowEvaluation.objects.all())
+    
+    def save(self, entity: ShadowEvaluation) -> ShadowEvaluation:
+        entity.save()
+        return entity
+    
+    def update(self, entity: ShadowEvaluation) -> ShadowEvaluation:
+        entity.save()
+        return entity
+    
+    def delete(self, id: int) -> bool:
+        try:
+            evaluation = ShadowEvaluation.objects.get(id=id)
+            evaluation.delete()
+            return True
+        except ShadowEvaluation.DoesNotExist:
+            return False
+    
+    def summary_by_strategy(self) -> List[Dict]:
+        """Resume as avaliações por estratégia candidata e estratégia primária.
+        
+        Returns:
+            Lista de dicionários com a quantidade de avaliações, a média de
+            treinos coincidentes, as durações média e máxima e a quantidade
+            de erros de cada par de estratégias.
+        """
+        return list(
+            ShadowEvaluation.objects
+            .values('estrategia', 'estrategia_primaria')
+            .annotate(
+                avaliacoes=Count('id'),
+                coincidentes_medio=Avg('coincidentes'),
+                duracao_media_ms=Avg('duracao_ms'),
+                duracao_max_ms=Max('duracao_ms'),
+                erros=Count('id', filter=~Q(erro='')),
+            )
+            .order_by('estrategia', 'estrategia_primaria')
+        )
@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.dispatch import Signal
+
+
+# Enviado após operações em lote sobre treinos (sender: Workout), com
+# ``ids``: conjunto dos IDs dos treinos inseridos, alterados ou removidos, e
+# ``usuarios``: IDs dos usuários que tinham esses treinos no histórico antes
+# da operação.
+workouts_bulk_changed = Signal()
+
+# Enviado após operações em lote sobre usuários (sender: User), com ``ids``
+# e ``emails``: IDs dos usuários afetados e os emails que eles tinham antes
+# ou passaram a ter depois da operação.
+users_bulk_changed = Signal()
+
+# Enviado após operações em lote sobre o histórico (sender: History), com
+# ``antes`` e ``depois``: dicionários de ID do usuário para o conjunto de
+# treinos distintos do seu histórico antes e depois da operação.
+history_bulk_changed = Signal()
+
+_operacao_em_lote = ContextVar('operacao_em_lote', default=False)
+
+
+@contextmanager
+def bulk_operation():
+    """Marca o trecho como operação em lote.
+    
+    Os receivers por instância do histórico e do catálogo ignoram os
+    signals disparados dentro do trecho (por exemplo, pelas remoções em
+    cascata); o repositório envia um único signal de lote ao final.
+    """
+    token = _operacao_em_lote.set(True)
+    try:
+        yield
+    finally:
+        _operacao_em_lote.reset(token)
+
+
+def in_bulk_operation() -> bool:
+    """Indica se o código está executando dentro de uma operação em lote."""
+    return _operacao_em_lote.get()
@@ -1,6 +1,11 @@
-from typing import List, Optional
-from ..models import User
+from functools import partial
+from typing import Iterable, List, Optional, Set
+from django.db import transaction
+from ..models import History, User
 from .base import BaseRepository
+from .history_repository import HistoryRepository
+from .identity_map import current_identity_map
+from .signals import bulk_operation, history_bulk_changed, users_bulk_changed
 
 
 class UserRepository(BaseRepository):
@@ -8,7 +13,9 @@ class UserRepository(BaseRepository):
     
     Implementa o padrão Repository para isolar a lógica de acesso a dados,
     fornecendo métodos específicos para busca de usuários por email, nível e objetivo.
+    As operações em lote enviam um único ``users_bulk_changed``.
     """
+    model = User
     
     def get_by_id(self, id: int) -> Optional[User]:
         try:
@@ -38,16 +45,31 @@ class UserRepository(BaseRepository):
     def get_by_email(self, email: str) -> Optional[User]:
         """Busca usuário por email.
         
+        Dentro de um escopo de mapa de identidade (uma requisição), o
+        usuário é buscado no banco uma única vez, já com as preferências,
+        para que a mesma instância atenda a ``get_by_email_with_preferences``.
+        
         Args:
             email: Email do usuário.
             
         Returns:
             Usuário encontrado ou None se não existir.
         """
-        try:
-            return User.objects.get(email=email)
-        except User.DoesNotExist:
-            return None
+        return self._mapear(email)
+    
+    def get_by_email_with_preferences(self, email: str) -> Optional[User]:
+        """Busca usuário por email junto com suas preferências.
+        
+        Usa uma única consulta, com ``select_related('preferencias')``;
+        acessar ``user.preferencias`` depois não consulta o banco.
+        
+        Args:
+            email: Email do usuário.
+            
+        Returns:
+            Usuário encontrado ou None se não existir.
+        """
+        return self._mapear(email, com_preferencias=True)
     
     def find_by_nivel(self, nivel: str) -> List[User]:
         """Busca usuários por nível de experiência.
@@ -70,4 +92,105 @@ class UserRepository(BaseRepository):
             Lista de usuários com o objetivo especificado.
         """
         return list(User.objects.filter(objetivo=objetivo))
-
+    
+    async def aget_by_id(self, id: int) -> Optional[User]:
+        """Versão assíncrona de ``get_by_id``."""
+        try:
+            return await User.objects.aget(id=id)
+        except User.DoesNotExist:
+            return None
+    
+    async def aget_by_email(self, email: str) -> Optional[User]:
+        """Versão assíncrona de ``get_by_email``."""
+        return await self._amapear(email)
+    
+    async def aget_by_email_with_preferences(self, email: str) -> Optional[User]:
+        """Versão assíncrona de ``get_by_email_with_preferences``."""
+        return await self._amapear(email, com_preferencias=True)
+    
+    async def afind_by_nivel(self, nivel: str) -> List[User]:
+        """Versão assíncrona de ``find_by_nivel``."""
+        return [user async for user in User.objects.filter(nivel=nivel)]
+    
+    async def afind_by_objetivo(self, objetivo: str) -> List[User]:
+        """Versão assíncrona de ``find_by_objetivo``."""
+        return [user async for user in User.objects.filter(objetivo=objetivo)]
+    
+    def bulk_save(self, entities: Iterable[User], batch_size: Optional[int] = None) -> List[User]:
+        with transaction.atomic(), bulk_operation():
+            users = super().bulk_save(entities, batch_size)
+            users_bulk_changed.send(
+                sender=User, 
+                ids={user.pk for user in users if user.pk is not None}, 
+                emails={user.email for user in users}
+            )
+        return users
+    
+    def bulk_update(
+        self, 
+        entities: Iterable[User], 
+        fields: Iterable[str], 
+        batch_size: Optional[int] = None
+    ) -> int:
+        entities = list(entities)
+        ids = {user.pk for user in entities}
+        with transaction.atomic(), bulk_operation():
+            emails = self._emails_por_id(ids)
+            atualizados = super().bulk_update(entities, fields, batch_size)
+            emails.update(user.email for user in entities)
+            users_bulk_changed.send(sender=User, ids=ids, emails=emails)
+        return atualizados
+    
+    def bulk_delete(self, ids: Iterable[int]) -> int:
+        """Remove vários usuários por ID, junto com seus históricos.
+        
+        Os históricos removidos em cascata são notificados com um único
+        ``history_bulk_changed``.
+        """
+        ids = list(ids)
+        with transaction.atomic(), bulk_operation():
+            emails = self._emails_por_id(ids)
+            antes = HistoryRepository().distinct_workouts_by_user(ids)
+            removidos = super().bulk_delete(ids)
+            history_bulk_changed.send(
+                sender=History, 
+                antes=antes, 
+                depois={user_id: set() for user_id in antes}
+            )
+            users_bulk_changed.send(sender=User, ids=set(ids), emails=emails)
+        return removidos
+    
+    def _mapear(self, email: str, com_preferencias: bool = False) -> Optional[User]:
+        # No mapa, as duas buscas por email compartilham a chave; o usuário é
+        # sempre carregado com as preferências, com a mesma única consulta.
+        mapa = current_identity_map()
+        if mapa is None:
+            return self._carregar_por_email(email, com_preferencias)
+        return mapa.get(User, ('email', email), partial(self._carregar_por_email, email, True))
+    
+    def _carregar_por_email(self, email: str, com_preferencias: bool = False) -> Optional[User]:
+        queryset = User.objects.all()
+        if com_preferencias:
+            queryset = queryset.select_related('preferencias')
+        try:
+            return queryset.get(email=email)
+        except User.DoesNotExist:
+            return None
+    
+    async def _amapear(self, email: str, com_preferencias: bool = False) -> Optional[User]:
+        mapa = current_identity_map()
+        if mapa is None:
+            return await self._acarregar_por_email(email, com_preferencias)
+        return await mapa.aget(User, ('email', email), partial(self._acarregar_por_email, email, True))
+    
+    async def _acarregar_por_email(self, email: str, com_preferencias: bool = False) -> Optional[User]:
+        queryset = User.objects.all()
+        if com_preferencias:
+            queryset = queryset.select_related('preferencias')
+        try:
+            return await queryset.aget(email=email)
+        except User.DoesNotExist:
+            return None
+    
+    def _emails_por_id(self, ids: Iterable[int]) -> Set[str]:
+        return set(User.objects.filter(pk__in=list(ids)).values_list('email', flat=True))
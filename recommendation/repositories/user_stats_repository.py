@@ -0,0 +1,267 @@
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Iterable, List, Optional, Tuple
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
+from ..models import History, User, UserStats
+from .base import BaseRepository
+
+
+class UserStatsRepository(BaseRepository):
+    """Repositório das estatísticas consolidadas do histórico dos usuários.
+    
+    Implementa o padrão Repository para isolar a lógica de acesso a dados,
+    fornecendo a atualização incremental das estatísticas a cada alteração
+    no histórico e a reconstrução a partir do histórico.
+    """
+    model = UserStats
+    
+    def get_by_id(self, id: int) -> Optional[UserStats]:
+        try:
+            return UserStats.objects.get(id=id)
+        except UserStats.DoesNotExist:
+            return None
+    
+    def get_all(self) -> List[UserStats]:
+        return list(UserStats.objects.all())
+    
+    def save(self, entity: UserStats) -> UserStats:
+        entity.save()
+        return entity
+    
+    def update(self, entity: UserStats) -> UserStats:
+        entity.save()
+        return entity
+    
+    def delete(self, id: int) -> bool:
+        try:
+            stats = UserStats.objects.get(id=id)
+            stats.delete()
+            return True
+        except UserStats.DoesNotExist:
+            return False
+    
+    def get_by_user(self, user: User) -> Optional[UserStats]:
+        """Busca as estatísticas de um usuário.
+        
+        Args:
+            user: Usuário dono das estatísticas.
+            
+        Returns:
+            Estatísticas encontradas ou None se ainda não foram calculadas.
+        """
+        try:
+            return UserStats.objects.get(usuario=user)
+        except UserStats.DoesNotExist:
+            return None
+    
+    def get_or_build_for_user(self, user: User) -> UserStats:
+        """Busca as estatísticas de um usuário, calculando-as se não existirem.
+        
+        Args:
+            user: Usuário dono das estatísticas.
+            
+        Returns:
+            Estatísticas do usuário.
+        """
+        stats = self.get_by_user(user)
+        if stats is None:
+            self.rebuild_for_users([user.pk])
+            stats = self.get_by_user(user)
+        return stats
+    
+    async def aget_by_user(self, user: User) -> Optional[UserStats]:
+        """Versão assíncrona de ``get_by_user``."""
+        try:
+            return await UserStats.objects.aget(usuario=user)
+        except UserStats.DoesNotExist:
+            return None
+    
+    async def aget_or_build_for_user(self, user: User) -> UserStats:
+        """Versão assíncrona de ``get_or_build_for_user``.
+        
+        O cálculo de estatísticas ausentes grava no banco e roda de forma
+        síncrona, em uma thread.
+        """
+        stats = await self.aget_by_user(user)
+        if stats is None:
+            await sync_to_async(self.rebuild_for_users)([user.pk])
+            stats = await self.aget_by_user(user)
+        return stats
+    
+    def apply_history_change(
+        self,
+        user_id: int,
+        sessoes: int,
+        minutos: int,
+        calorias: int,
+        criar: bool = False
+    ) -> None:
+        """Aplica a variação de uma alteração no histórico às estatísticas.
+        
+        Os totais são somados com expressões F, sem ler o valor anterior,
+        de modo que inserções concorrentes não percam incrementos. O UPDATE
+        também bloqueia a linha até o fim da transação, serializando o
+        recálculo do último treino e da sequência do mesmo usuário.
+        
+        A linha das estatísticas é criada pela restrição única de usuário:
+        só a transação que a insere a calcula a partir do histórico; uma
+        inserção concorrente espera o commit dela e soma sua variação com
+        o UPDATE, sem sobrescrevê-la.
+        
+        Deve ser chamado depois que a alteração foi gravada, na mesma
+        transação.
+        
+        Args:
+            user_id: ID do usuário.
+            sessoes: Variação da quantidade de sessões.
+            minutos: Variação dos minutos.
+            calorias: Variação das calorias.
+            criar: Se o usuário ainda não tem estatísticas, cria-as a partir
+                do histórico (que já inclui a alteração).
+        """
+        with transaction.atomic():
+            if criar:
+                _, criado = UserStats.objects.get_or_create(usuario_id=user_id)
+                if criado:
+                    self.rebuild_for_users([user_id])
+                    return
+            
+            atualizados = UserStats.objects.filter(usuario_id=user_id).update(
+                sessoes=F('sessoes') + sessoes,
+                minutos=F('minutos') + minutos,
+                calorias=F('calorias') + calorias
+            )
+            if atualizados:
+                self._atualizar_datas(user_id)
+    
+    def rebuild_for_users(self, user_ids: Iterable[int]) -> None:
+        """Recalcula as estatísticas de vários usuários a partir do histórico.
+        
+        Usa uma consulta de agregação e uma das datas distintas para todos
+        os usuários, e grava as estatísticas com um único INSERT ... ON
+        CONFLICT. Usuários sem histórico ficam com estatísticas zeradas;
+        IDs de usuários que não existem mais são ignorados.
+        
+        Args:
+            user_ids: IDs dos usuários.
+        """
+        user_ids = list(User.objects.filter(pk__in=list(user_ids)).values_list('pk', flat=True))
+        if not user_ids:
+            return
+        
+        totais = {
+            linha['usuario_id']: linha
+            for linha in History.objects
+            .filter(usuario_id__in=user_ids)
+            .values('usuario_id')
+            .annotate(
+                sessoes=Count('id'),
+                minutos=Coalesce(Sum('treino__duracao_minutos'), 0),
+                calorias=Coalesce(Sum('treino__calorias_estimadas'), 0)
+            )
+            .order_by()
+        }
+        datas = (
+            History.objects
+            .filter(usuario_id__in=user_ids)
+            .values_list('usuario_id', 'data')
+            .order_by('usuario_id', '-data')
+            .distinct()
+        )
+        sequencias = {
+            user_id: _sequencia(data for _, data in grupo)
+            for user_id, grupo in groupby(datas, key=lambda par: par[0])
+        }
+        
+        estatisticas = []
+        for user_id in user_ids:
+            linha = totais.get(user_id, {})
+            ultimo_treino, sequencia = sequencias.get(user_id, (None, 0))
+            estatisticas.append(UserStats(
+                usuario_id=user_id,
+                sessoes=linha.get('sessoes', 0),
+                minutos=linha.get('minutos', 0),
+                calorias=linha.get('calorias', 0),
+                ultimo_treino=ultimo_treino,
+                sequencia_atual=sequencia
+            ))
+        
+        UserStats.objects.bulk_create(
+            estatisticas,
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=['usuario'],
+            update_fields=[
+                'sessoes',
+                'minutos',
+                'calorias',
+                'ultimo_treino',
+                'sequencia_atual',
+                'atualizado_em',
+            ]
+        )
+    
+    def rebuild(self, batch_size: int = 500) -> int:
+        """Recalcula as estatísticas de todos os usuários, em lotes.
+        
+        Cada lote é gravado em sua própria transação, de modo que a
+        reconstrução não bloqueia a tabela inteira.
+        
+        Args:
+            batch_size: Quantidade de usuários por lote.
+            
+        Returns:
+            Quantidade de usuários recalculados.
+        """
+        total = 0
+        ids = User.objects.order_by('pk').values_list('pk', flat=True)
+        ultimo_id = 0
+        while lote := list(ids.filter(pk__gt=ultimo_id)[:batch_size]):
+            with transaction.atomic():
+                self.rebuild_for_users(lote)
+            total += len(lote)
+            ultimo_id = lote[-1]
+        return total
+    
+    def _atualizar_datas(self, user_id: int) -> None:
+        """Recalcula o último treino e a sequência atual de um usuário.
+        
+        Lê as datas distintas do histórico em ordem decrescente apenas até
+        a primeira interrupção da sequência.
+        """
+        datas = (
+            History.objects
+            .filter(usuario_id=user_id)
+            .values_list('data', flat=True)
+            .order_by('-data')
+            .distinct()
+        )
+        ultimo_treino, sequencia = _sequencia(datas.iterator(chunk_size=64))
+        UserStats.objects.filter(usuario_id=user_id).update(
+            ultimo_treino=ultimo_treino,
+            sequencia_atual=sequencia
+        )
+
+
+def _sequencia(datas: Iterable[date]) -> Tuple[Optional[date], int]:
+    """Calcula o último treino e a sequência de dias consecutivos.
+    
+    Args:
+        datas: Datas distintas com treino, em ordem decrescente.
+        
+    Returns:
+        Tupla (data mais recente, dias consecutivos terminando nela).
+    """
+    ultimo_treino = anterior = None
+    sequencia = 0
+    for data in datas:
+        if anterior is None:
+            ultimo_treino = data
+        elif anterior - data != timedelta(days=1):
+            break
+        anterior = data
+        sequencia += 1
+    return ultimo_treino, sequencia
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class WorkoutQuery:
+    """Seleção declarativa de treinos candidatos.
+    
+    Descreve o filtro, a ordenação e o limite de uma consulta sem depender
+    de como ela é executada. O ``WorkoutRepository`` traduz a consulta em
+    um queryset filtrado, ordenado e com ``LIMIT``; empates na ordenação
+    são sempre resolvidos pelo ID, que é a ordem do catálogo.
+    
+    Attributes:
+        filtros: Pares (lookup do Django, valor), combinados com AND.
+        ordenacao: Campos de ordenação, com '-' para ordem decrescente.
+        proximo_de: Par (campo, alvo) para ordenar pela distância ao alvo,
+            antes dos campos de ``ordenacao``.
+        limite: Quantidade máxima de treinos.
+    """
+    filtros: Tuple[Tuple[str, Any], ...] = ()
+    ordenacao: Tuple[str, ...] = ()
+    proximo_de: Optional[Tuple[str, float]] = None
+    limite: Optional[int] = None
@@ -1,6 +1,13 @@
-from typing import List, Optional
-from ..models import Workout
+import operator
+from functools import reduce
+from typing import Iterable, List, Optional, Set
+from django.db import transaction
+from django.db.models import F, FloatField, Q, QuerySet, Value
+from django.db.models.functions import Abs
+from ..models import History, Workout
 from .base import BaseRepository
+from .signals import bulk_operation, workouts_bulk_changed
+from .workout_query import WorkoutQuery
 
 
 class WorkoutRepository(BaseRepository):
@@ -8,8 +15,11 @@ class WorkoutRepository(BaseRepository):
     
     Implementa o padrão Repository para isolar a lógica de acesso a dados,
     fornecendo métodos específicos para busca de treinos por intensidade,
-    duração e faixa de calorias.
+    duração e faixa de calorias. O catálogo completo é retornado em ordem
+    de ID, a mesma usada no desempate das consultas declarativas. As
+    operações em lote enviam um único ``workouts_bulk_changed``.
     """
+    model = Workout
     
     def get_by_id(self, id: int) -> Optional[Workout]:
         try:
@@ -18,7 +28,7 @@ class WorkoutRepository(BaseRepository):
             return None
     
     def get_all(self) -> List[Workout]:
-        return list(Workout.objects.all())
+        return list(Workout.objects.order_by('pk'))
     
     def save(self, entity: Workout) -> Workout:
         entity.save()
@@ -36,6 +46,49 @@ class WorkoutRepository(BaseRepository):
         except Workout.DoesNotExist:
             return False
     
+    async def aget_by_id(self, id: int) -> Optional[Workout]:
+        """Versão assíncrona de ``get_by_id``."""
+        try:
+            return await Workout.objects.aget(id=id)
+        except Workout.DoesNotExist:
+            return None
+    
+    async def aget_all(self) -> List[Workout]:
+        """Versão assíncrona de ``get_all``."""
+        return [workout async for workout in Workout.objects.order_by('pk')]
+    
+    def bulk_save(self, entities: Iterable[Workout], batch_size: Optional[int] = None) -> List[Workout]:
+        with transaction.atomic(), bulk_operation():
+            workouts = super().bulk_save(entities, batch_size)
+            workouts_bulk_changed.send(
+                sender=Workout, 
+                ids={w.pk for w in workouts if w.pk is not None},
+                usuarios=set()
+            )
+        return workouts
+    
+    def bulk_update(
+        self, 
+        entities: Iterable[Workout], 
+        fields: Iterable[str], 
+        batch_size: Optional[int] = None
+    ) -> int:
+        entities = list(entities)
+        ids = {w.pk for w in entities}
+        with transaction.atomic(), bulk_operation():
+            usuarios = self._usuarios_com_treinos(ids)
+            atualizados = super().bulk_update(entities, fields, batch_size)
+            workouts_bulk_changed.send(sender=Workout, ids=ids, usuarios=usuarios)
+        return atualizados
+    
+    def bulk_delete(self, ids: Iterable[int]) -> int:
+        ids = set(ids)
+        with transaction.atomic(), bulk_operation():
+            usuarios = self._usuarios_com_treinos(ids)
+            removidos = super().bulk_delete(ids)
+            workouts_bulk_changed.send(sender=Workout, ids=ids, usuarios=usuarios)
+        return removidos
+    
     def find_by_intensidade(self, intensidade: str) -> List[Workout]:
         """Busca treinos por intensidade.
         
@@ -72,4 +125,74 @@ class WorkoutRepository(BaseRepository):
             calorias_estimadas__gte=min_cal,
             calorias_estimadas__lte=max_cal
         ))
+    
+    async def afind_by_intensidade(self, intensidade: str) -> List[Workout]:
+        """Versão assíncrona de ``find_by_intensidade``."""
+        return [workout async for workout in Workout.objects.filter(intensidade=intensidade)]
+    
+    async def afind_by_duracao_max(self, duracao_max: int) -> List[Workout]:
+        """Versão assíncrona de ``find_by_duracao_max``."""
+        return [workout async for workout in Workout.objects.filter(duracao_minutos__lte=duracao_max)]
+    
+    async def afind_by_calorias_range(self, min_cal: int, max_cal: int) -> List[Workout]:
+        """Versão assíncrona de ``find_by_calorias_range``."""
+        return [
+            workout
+            async for workout in Workout.objects.filter(
+                calorias_estimadas__gte=min_cal,
+                calorias_estimadas__lte=max_cal
+            )
+        ]
+    
+    def find_by_queries(self, consultas: Iterable[WorkoutQuery]) -> List[Workout]:
+        """Executa consultas declarativas no banco em uma única ida.
+        
+        Cada consulta vira um subquery filtrado, ordenado e com ``LIMIT``;
+        os treinos selecionados por qualquer uma delas são retornados em
+        ordem de ID, como no catálogo completo.
+        
+        Args:
+            consultas: Consultas declarativas de treinos candidatos.
+            
+        Returns:
+            União dos treinos selecionados, em ordem de ID.
+        """
+        condicoes = [Q(pk__in=self._queryset(consulta).values('pk')) for consulta in consultas]
+        if not condicoes:
+            return []
+        return list(Workout.objects.filter(reduce(operator.or_, condicoes)).order_by('pk'))
+    
+    def _usuarios_com_treinos(self, ids: Iterable[int]) -> Set[int]:
+        """Busca os usuários que têm algum dos treinos no histórico.
+        
+        Na remoção, o histórico perde o vínculo com o treino (SET_NULL) sem
+        disparar signals, então os usuários são buscados antes.
+        """
+        return set(
+            History.objects.filter(treino_id__in=list(ids)).values_list('usuario_id', flat=True).distinct()
+        )
+    
+    def _queryset(self, consulta: WorkoutQuery) -> QuerySet:
+        """Traduz uma consulta declarativa em queryset.
+        
+        Args:
+            consulta: Consulta declarativa de treinos.
+            
+        Returns:
+            Queryset filtrado, ordenado e limitado.
+        """
+        queryset = Workout.objects.filter(**dict(consulta.filtros))
+        ordenacao = list(consulta.ordenacao)
+        
+        if consulta.proximo_de is not None:
+            campo, alvo = consulta.proximo_de
+            queryset = queryset.annotate(
+                distancia_alvo=Abs(F(campo) - Value(alvo), output_field=FloatField())
+            )
+            ordenacao.insert(0, 'distancia_alvo')
+        
+        queryset = queryset.order_by(*ordenacao, 'pk')
+        if consulta.limite is not None:
+            queryset = queryset[:consulta.limite]
+        return queryset
 
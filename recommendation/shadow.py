@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+from django.conf import settings
+from django.db import close_old_connections
+from .models import ShadowEvaluation
+from .repositories import ShadowEvaluationRepository
+from .strategies.registry import strategy_registry
+
+
+logger = logging.getLogger(__name__)
+
+WORKERS_PADRAO = 2
+PENDENTES_PADRAO = 100
+
+
+class BoundedExecutor:
+    """Pool de threads com quantidade limitada de tarefas pendentes.
+    
+    Aceita no máximo ``max_workers + max_pendentes`` tarefas ao mesmo
+    tempo (em execução ou na fila). Quando o limite é atingido, novas
+    tarefas são descartadas em vez de enfileiradas, de modo que um pico de
+    tráfego nunca acumula trabalho nem memória sem limite.
+    """
+    
+    def __init__(self, max_workers: int, max_pendentes: int, thread_name_prefix: str = ''):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=thread_name_prefix
+        )
+        self._vagas = threading.BoundedSemaphore(max_workers + max_pendentes)
+        self._lock = threading.Lock()
+        self.aceitas = 0
+        self.descartadas = 0
+    
+    def submit(self, fn: Callable, *args, **kwargs) -> bool:
+        """Agenda uma tarefa se houver vaga.
+        
+        Args:
+            fn: Função a executar em segundo plano.
+            *args: Argumentos posicionais da função.
+            **kwargs: Argumentos nomeados da função.
+            
+        Returns:
+            True se a tarefa foi aceita, False se foi descartada.
+        """
+        if not self._vagas.acquire(blocking=False):
+            with self._lock:
+                self.descartadas += 1
+                descartadas = self.descartadas
+            if descartadas % 100 == 1:
+                logger.warning("Executor em segundo plano cheio; %s tarefas descartadas", descartadas)
+            return False
+        
+        with self._lock:
+            self.aceitas += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except RuntimeError:
+            self._vagas.release()
+            raise
+        future.add_done_callback(lambda _: self._vagas.release())
+        return True
+    
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class ShadowEvaluator:
+    """Avalia estratégias candidatas em modo sombra, fora da requisição.
+    
+    A recomendação da estratégia primária é entregue ao usuário sem
+    esperar; cada estratégia configurada em
+    ``RECOMMENDATION_SHADOW_STRATEGIES`` é executada em segundo plano sobre
+    o mesmo usuário e o mesmo snapshot do catálogo, e o resultado é gravado
+    na tabela de avaliações para comparação offline.
+    """
+    
+    def __init__(self, executor, strategies: Optional[List[str]] = None):
+        self.executor = executor
+        self._strategies = strategies
+    
+    @property
+    def strategies(self) -> List[str]:
+        """Nomes das estratégias avaliadas em modo sombra."""
+        if self._strategies is not None:
+            return self._strategies
+        return list(getattr(settings, 'RECOMMENDATION_SHADOW_STRATEGIES', []))
+    
+    def submit(self, user, all_workouts, estrategia_primaria: str, result) -> int:
+        """Agenda a avaliação das estratégias sombra para uma requisição.
+        
+        Args:
+            user: Usuário da requisição.
+            all_workouts: Snapshot do catálogo usado pela estratégia primária.
+            estrategia_primaria: Nome da estratégia que atendeu a requisição.
+            result: Recomendação entregue ao usuário.
+            
+        Returns:
+            Quantidade de avaliações aceitas pelo executor.
+        """
+        nomes = self.strategies
+        if not nomes:
+            return 0
+        
+        hasattr(user, 'preferencias')
+        treinos_primarios_ids = [w.pk for w in result.workouts]
+        versao_catalogo = getattr(all_workouts, 'fingerprint', '')
+        
+        return sum(
+            self.executor.submit(
+                self._avaliar,
+                nome,
+                user,
+                all_workouts,
+                estrategia_primaria,
+                treinos_primarios_ids,
+                versao_catalogo
+            )
+            for nome in nomes
+        )
+    
+    def _avaliar(
+        self,
+        nome: str,
+        user,
+        all_workouts,
+        estrategia_primaria: str,
+        treinos_primarios_ids: List[int],
+        versao_catalogo: str
+    ) -> None:
+        """Executa uma estratégia sombra e grava a avaliação.
+        
+        Roda nas threads do executor; as conexões com o banco são
+        liberadas ao final, como ao fim de uma requisição.
+        """
+        close_old_connections()
+        try:
+            avaliacao = ShadowEvaluation(
+                usuario_id=user.pk,
+                estrategia=nome,
+                estrategia_primaria=estrategia_primaria,
+                treinos_primarios_ids=treinos_primarios_ids,
+                versao_catalogo=versao_catalogo
+            )
+            
+            inicio = time.perf_counter()
+            try:
+                result = strategy_registry.get(nome).recommend(user, all_workouts)
+            except Exception as exc:
+                avaliacao.erro = f'{type(exc).__name__}: {exc}'[:200]
+            else:
+                avaliacao.duracao_ms = (time.perf_counter() - inicio) * 1000
+                avaliacao.treinos_ids = [w.pk for w in result.workouts]
+                avaliacao.coincidentes = len(
+                    set(avaliacao.treinos_ids) & set(treinos_primarios_ids)
+                )
+            
+            ShadowEvaluationRepository().save(avaliacao)
+        except Exception:
+            logger.exception("Falha ao registrar avaliação sombra de %s", nome)
+        finally:
+            close_old_connections()
+
+
+shadow_executor = BoundedExecutor(
+    max_workers=getattr(settings, 'RECOMMENDATION_SHADOW_WORKERS', WORKERS_PADRAO),
+    max_pendentes=getattr(settings, 'RECOMMENDATION_SHADOW_QUEUE_SIZE', PENDENTES_PADRAO),
+    thread_name_prefix='sombra'
+)
+shadow_evaluator = ShadowEvaluator(shadow_executor)
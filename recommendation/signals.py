@@ -0,0 +1,333 @@
+from django.db import transaction
+from django.db.models.signals import pre_delete, pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Workout, History, Preferences, User
+from .catalog import bump_catalog_version
+from .repositories import (
+    CooccurrenceRepository,
+    HistoryRollupRepository,
+    PrecomputedRecommendationRepository,
+    UserStatsRepository
+)
+from .repositories.history_rollup_repository import PERIODOS
+from .repositories.cached_repository import invalidate_users, invalidate_workouts
+from .repositories.identity_map import current_identity_map
+from .repositories.signals import (
+    history_bulk_changed,
+    in_bulk_operation,
+    users_bulk_changed,
+    workouts_bulk_changed
+)
+from .strategies.recommendation_cache import recommendation_cache
+
+
+@receiver(post_save, sender=Workout)
+@receiver(post_delete, sender=Workout)
+def invalidate_workout_catalog(sender, **kwargs):
+    """Invalida dados derivados do catálogo quando um treino muda.
+    
+    Incrementa a versão do catálogo e descarta as recomendações em cache
+    calculadas sobre a versão anterior. A versão é incrementada de novo
+    após o commit, para que processos que reconstruíram o snapshot antes
+    do commit voltem a reconstruí-lo com os dados confirmados.
+    """
+    if in_bulk_operation():
+        return
+    _invalidar_catalogo()
+
+
+@receiver(workouts_bulk_changed)
+def invalidate_workout_catalog_in_bulk(sender, **kwargs):
+    """Invalida dados derivados do catálogo uma vez por operação em lote."""
+    _invalidar_catalogo()
+
+
+def _invalidar_catalogo():
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version)
+    recommendation_cache.clear()
+
+
+@receiver(pre_delete, sender=Workout)
+def remember_workout_users(sender, instance, **kwargs):
+    """Guarda os usuários com o treino no histórico antes da remoção.
+    
+    A remoção desvincula o histórico do treino (SET_NULL) com um UPDATE em
+    massa, sem signals do histórico.
+    """
+    if in_bulk_operation():
+        return
+    instance._usuarios_afetados = _usuarios_com_treino(instance.pk)
+
+
+@receiver(post_save, sender=Workout)
+@receiver(post_delete, sender=Workout)
+def rebuild_stats_of_workout_users(sender, instance, created=False, **kwargs):
+    """Recalcula as estatísticas dos usuários que têm o treino alterado ou removido.
+    
+    A duração e as calorias do treino entram nas estatísticas e nos totais
+    por período do histórico.
+    """
+    if in_bulk_operation() or created:
+        return
+    usuarios = getattr(instance, '_usuarios_afetados', None)
+    if usuarios is None:
+        usuarios = _usuarios_com_treino(instance.pk)
+    _reconstruir_estatisticas(usuarios)
+
+
+@receiver(workouts_bulk_changed)
+def rebuild_stats_of_workout_users_in_bulk(sender, usuarios=(), **kwargs):
+    """Recalcula as estatísticas dos usuários afetados por uma operação em lote nos treinos."""
+    _reconstruir_estatisticas(usuarios)
+
+
+def _usuarios_com_treino(workout_id):
+    return set(
+        History.objects.filter(treino_id=workout_id).values_list('usuario_id', flat=True).distinct()
+    )
+
+
+def _reconstruir_estatisticas(user_ids):
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: _reconstruir_estatisticas_agora(user_ids))
+
+
+def _reconstruir_estatisticas_agora(user_ids):
+    UserStatsRepository().rebuild_for_users(user_ids)
+    for periodo in PERIODOS:
+        HistoryRollupRepository(periodo).rebuild_for_users(user_ids)
+
+
+@receiver(post_save, sender=History)
+@receiver(post_delete, sender=History)
+def invalidate_precomputed_recommendation(sender, instance, **kwargs):
+    """Descarta a recomendação pré-calculada quando o histórico do usuário muda.
+    
+    O usuário volta a ser selecionado pelo próximo pré-cálculo incremental.
+    """
+    if in_bulk_operation():
+        return
+    PrecomputedRecommendationRepository().delete_by_user_id(instance.usuario_id)
+
+
+@receiver(pre_save, sender=History)
+def remember_previous_workout(sender, instance, **kwargs):
+    """Guarda o treino e a data anteriores de um registro de histórico que será alterado."""
+    if in_bulk_operation():
+        return
+    instance._treino_anterior_id = instance._data_anterior = None
+    if instance.pk is None:
+        return
+    anterior = History.objects.filter(pk=instance.pk).values_list('treino_id', 'data').first()
+    if anterior is not None:
+        instance._treino_anterior_id, instance._data_anterior = anterior
+
+
+@receiver(post_save, sender=History)
+def add_history_to_cooccurrence(sender, instance, created, **kwargs):
+    """Atualiza a matriz de coocorrência quando um treino entra no histórico.
+    
+    Se o registro teve o treino trocado, a matriz é ajustada como uma
+    remoção do treino anterior seguida da adição do novo.
+    """
+    if in_bulk_operation():
+        return
+    anterior = getattr(instance, '_treino_anterior_id', None)
+    if not created and anterior == instance.treino_id:
+        return
+    
+    CooccurrenceRepository().replace_user_workout(
+        instance.usuario_id, 
+        anterior, 
+        instance.treino_id
+    )
+
+
+@receiver(post_delete, sender=History)
+def remove_history_from_cooccurrence(sender, instance, **kwargs):
+    """Atualiza a matriz de coocorrência quando um treino sai do histórico."""
+    if in_bulk_operation():
+        return
+    if instance.treino_id is not None:
+        CooccurrenceRepository().remove_user_workout(instance.usuario_id, instance.treino_id)
+
+
+@receiver(history_bulk_changed)
+def apply_history_bulk_change(sender, antes, depois, **kwargs):
+    """Aplica uma operação em lote no histórico aos dados derivados.
+    
+    Descarta as recomendações pré-calculadas dos usuários afetados e
+    atualiza a matriz de coocorrência com a diferença entre os treinos
+    distintos de cada usuário antes e depois da operação. As estatísticas
+    e os totais por período dos usuários são recalculados.
+    """
+    PrecomputedRecommendationRepository().delete_by_user_ids(set(antes) | set(depois))
+    CooccurrenceRepository().apply_user_changes(antes, depois)
+    UserStatsRepository().rebuild_for_users(set(antes) | set(depois))
+    for periodo in PERIODOS:
+        HistoryRollupRepository(periodo).rebuild_for_users(set(antes) | set(depois))
+
+
+@receiver(post_save, sender=History)
+def add_history_to_rollups(sender, instance, created, **kwargs):
+    """Atualiza as estatísticas e os totais por período quando um registro é criado ou alterado.
+    
+    Um registro novo soma uma sessão e os minutos e calorias do treino; um
+    registro alterado soma a diferença entre o treino novo e o anterior.
+    O último treino e a sequência são recalculados em ambos os casos. Nos
+    totais por período, um registro que mudou de período é subtraído do
+    período da data anterior e somado ao da data atual.
+    """
+    if in_bulk_operation():
+        return
+    
+    anterior = None if created else getattr(instance, '_treino_anterior_id', None)
+    data_anterior = None if created else getattr(instance, '_data_anterior', None)
+    data = _data_do_registro(instance)
+    if not created and anterior == instance.treino_id and data_anterior == data:
+        return
+    
+    totais = _duracao_e_calorias(instance.treino_id, anterior)
+    minutos, calorias = totais.get(instance.treino_id, (0, 0))
+    minutos_anteriores, calorias_anteriores = totais.get(anterior, (0, 0))
+    
+    UserStatsRepository().apply_history_change(
+        instance.usuario_id,
+        sessoes=1 if created else 0,
+        minutos=minutos - minutos_anteriores,
+        calorias=calorias - calorias_anteriores,
+        criar=True
+    )
+    for periodo in PERIODOS:
+        rollups = HistoryRollupRepository(periodo)
+        if data_anterior is None or rollups.period_start(data_anterior) == rollups.period_start(data):
+            rollups.apply_history_change(
+                instance.usuario_id,
+                data,
+                sessoes=1 if created else 0,
+                minutos=minutos - minutos_anteriores,
+                calorias=calorias - calorias_anteriores,
+                criar=True
+            )
+            continue
+        rollups.apply_history_change(
+            instance.usuario_id,
+            data_anterior,
+            sessoes=-1,
+            minutos=-minutos_anteriores,
+            calorias=-calorias_anteriores
+        )
+        rollups.apply_history_change(
+            instance.usuario_id,
+            data,
+            sessoes=1,
+            minutos=minutos,
+            calorias=calorias,
+            criar=True
+        )
+
+
+@receiver(post_delete, sender=History)
+def remove_history_from_rollups(sender, instance, **kwargs):
+    """Atualiza as estatísticas e os totais por período quando um registro é removido."""
+    if in_bulk_operation():
+        return
+    
+    minutos, calorias = _duracao_e_calorias(instance.treino_id).get(instance.treino_id, (0, 0))
+    UserStatsRepository().apply_history_change(
+        instance.usuario_id,
+        sessoes=-1,
+        minutos=-minutos,
+        calorias=-calorias
+    )
+    for periodo in PERIODOS:
+        HistoryRollupRepository(periodo).apply_history_change(
+            instance.usuario_id,
+            _data_do_registro(instance),
+            sessoes=-1,
+            minutos=-minutos,
+            calorias=-calorias
+        )
+
+
+def _data_do_registro(instance):
+    # Registros criados com a data em texto só a convertem ao serem relidos.
+    return History._meta.get_field('data').to_python(instance.data)
+
+
+def _duracao_e_calorias(*workout_ids):
+    ids = [workout_id for workout_id in workout_ids if workout_id is not None]
+    if not ids:
+        return {}
+    return {
+        workout_id: (duracao, calorias)
+        for workout_id, duracao, calorias in Workout.objects.filter(pk__in=ids).values_list(
+            'pk', 'duracao_minutos', 'calorias_estimadas'
+        )
+    }
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_email(sender, instance, **kwargs):
+    """Guarda o email anterior de um usuário que será alterado."""
+    if instance.pk is None:
+        instance._email_anterior = None
+        return
+    instance._email_anterior = (
+        User.objects.filter(pk=instance.pk).values_list('email', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Remove o usuário do cache dos repositórios, pelo email atual e o anterior.
+    
+    A remoção é repetida após o commit, descartando entradas que uma
+    leitura concorrente tenha gravado com os dados anteriores. O mapa de
+    identidade da requisição também esquece os usuários carregados.
+    """
+    emails = {instance.email, getattr(instance, '_email_anterior', None)}
+    invalidate_users(emails)
+    transaction.on_commit(lambda: invalidate_users(emails))
+    
+    mapa = current_identity_map()
+    if mapa is not None:
+        mapa.discard(User)
+
+
+@receiver(post_save, sender=Preferences)
+@receiver(post_delete, sender=Preferences)
+def invalidate_cached_user_preferences(sender, instance, **kwargs):
+    """Remove do cache dos repositórios o usuário cujas preferências mudaram.
+    
+    O usuário é cacheado junto com as preferências.
+    """
+    emails = set(User.objects.filter(pk=instance.usuario_id).values_list('email', flat=True))
+    invalidate_users(emails)
+    transaction.on_commit(lambda: invalidate_users(emails))
+
+
+@receiver(users_bulk_changed)
+def invalidate_cached_users_in_bulk(sender, emails, **kwargs):
+    """Remove do cache dos repositórios os usuários de uma operação em lote."""
+    invalidate_users(emails)
+    transaction.on_commit(lambda: invalidate_users(emails))
+
+
+@receiver(post_save, sender=Workout)
+@receiver(post_delete, sender=Workout)
+def invalidate_cached_workout(sender, instance, **kwargs):
+    """Remove o treino e a lista completa de treinos do cache dos repositórios."""
+    ids = [instance.pk]
+    invalidate_workouts(ids)
+    transaction.on_commit(lambda: invalidate_workouts(ids))
+
+
+@receiver(workouts_bulk_changed)
+def invalidate_cached_workouts_in_bulk(sender, ids, **kwargs):
+    """Remove do cache dos repositórios os treinos de uma operação em lote."""
+    invalidate_workouts(ids)
+    transaction.on_commit(lambda: invalidate_workouts(ids))
@@ -1,17 +1,45 @@
+from importlib import import_module
 from .base import RecommendationStrategy, RecommendationResult
-from .calorie_based_strategy import CalorieBasedStrategy
-from .goal_based_strategy import GoalBasedStrategy
-from .beginner_friendly_strategy import BeginnerFriendlyStrategy
-from .hybrid_strategy import HybridStrategy
+from .recommendation_cache import RecommendationCache, CachedRecommendationStrategy
+from .registry import StrategyRegistry
 from .strategy_factory import RecommendationStrategyFactory
 
+# Estratégias concretas são importadas apenas no primeiro acesso, como no
+# registro, para que importar o pacote não carregue todos os módulos (e o NumPy).
+_IMPORTACOES_SOB_DEMANDA = {
+    'CatalogIndex': '.catalog_index',
+    'CalorieBasedStrategy': '.calorie_based_strategy',
+    'GoalBasedStrategy': '.goal_based_strategy',
+    'BeginnerFriendlyStrategy': '.beginner_friendly_strategy',
+    'HybridStrategy': '.hybrid_strategy',
+    'VectorizedHybridStrategy': '.vectorized_hybrid_strategy',
+    'CooccurrenceStrategy': '.cooccurrence_strategy',
+    'EnsembleStrategy': '.ensemble_strategy',
+    'EnsembleResult': '.ensemble_strategy',
+}
+
+
+def __getattr__(name):
+    modulo = _IMPORTACOES_SOB_DEMANDA.get(name)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(modulo, __name__), name)
+
+
 __all__ = [
     'RecommendationStrategy',
     'RecommendationResult',
+    'CatalogIndex',
     'CalorieBasedStrategy',
     'GoalBasedStrategy',
     'BeginnerFriendlyStrategy',
     'HybridStrategy',
+    'VectorizedHybridStrategy',
+    'CooccurrenceStrategy',
+    'RecommendationCache',
+    'CachedRecommendationStrategy',
+    'StrategyRegistry',
+    'EnsembleStrategy',
+    'EnsembleResult',
     'RecommendationStrategyFactory',
 ]
-
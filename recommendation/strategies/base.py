@@ -1,6 +1,60 @@
+import heapq
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Callable, Iterable, List, Optional
 from dataclasses import dataclass
+from ..catalog import get_catalog
+from ..repositories import WorkoutQuery, WorkoutRepository
+
+
+MAX_RECOMENDACOES = 3
+
+
+def top_k(
+    items: Iterable,
+    k: int,
+    key: Optional[Callable] = None,
+    reverse: bool = False
+) -> List:
+    """Seleciona os k melhores itens sem ordenar a coleção inteira.
+    
+    Usa um heap limitado a k elementos, com custo O(n log k) e memória
+    O(k). O resultado é idêntico a ``sorted(items, key=key,
+    reverse=reverse)[:k]``, inclusive no desempate: itens com a mesma
+    chave mantêm a ordem original.
+    
+    Args:
+        items: Coleção ou iterável de itens candidatos.
+        k: Quantidade máxima de itens a retornar.
+        key: Função que extrai a chave de ordenação de cada item.
+        reverse: Se True, seleciona as maiores chaves em vez das menores.
+        
+    Returns:
+        Lista com até k itens ordenados pela chave.
+    """
+    if reverse:
+        return heapq.nlargest(k, items, key=key)
+    return heapq.nsmallest(k, items, key=key)
+
+
+def catalog_structure(all_workouts: Iterable, key: str, builder: Callable[[Any], Any]) -> Any:
+    """Obtém uma estrutura derivada do catálogo, reutilizando-a quando possível.
+    
+    Se ``all_workouts`` for um snapshot versionado do catálogo, a estrutura
+    é construída uma única vez por versão e compartilhada entre requisições;
+    para listas comuns, é construída a cada chamada.
+    
+    Args:
+        all_workouts: Lista de treinos ou snapshot do catálogo.
+        key: Nome da estrutura derivada.
+        builder: Função que recebe os treinos e constrói a estrutura.
+        
+    Returns:
+        Estrutura derivada do catálogo.
+    """
+    derive = getattr(all_workouts, 'derive', None)
+    if derive is None:
+        return builder(all_workouts)
+    return derive(key, builder)
 
 
 @dataclass
@@ -37,4 +91,129 @@ class RecommendationStrategy(ABC):
             Resultado contendo treinos recomendados e justificativa.
         """
         pass
+    
+    def recommend_many(
+        self, 
+        users: List[any], 
+        all_workouts: List[any]
+    ) -> List[RecommendationResult]:
+        """Gera recomendações para vários usuários de uma vez.
+        
+        A implementação padrão chama ``recommend`` para cada usuário.
+        Estratégias concretas sobrescrevem este método para preparar as
+        estruturas derivadas do catálogo uma única vez por lote.
+        
+        Args:
+            users: Usuários para os quais gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Lista de resultados na mesma ordem de ``users``.
+        """
+        return [self.recommend(user, all_workouts) for user in users]
+    
+    def query_spec(self, user: any) -> Optional[List[WorkoutQuery]]:
+        """Descreve os treinos candidatos como consultas declarativas.
+        
+        Estratégias cuja seleção pode ser expressa como filtro, ordenação e
+        limite retornam as consultas cuja união contém o resultado; a
+        estratégia é então executada apenas sobre esses candidatos,
+        produzindo a mesma recomendação que sobre o catálogo inteiro.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            
+        Returns:
+            Lista de consultas, ou None se a seleção não puder ser
+            executada no banco.
+        """
+        return None
+    
+    def recommend_from_repository(
+        self, 
+        user: any, 
+        repository: Optional[WorkoutRepository] = None
+    ) -> RecommendationResult:
+        """Gera recomendações filtrando e limitando os treinos no banco.
+        
+        Estratégias sem ``query_spec`` recorrem ao snapshot do catálogo
+        em memória.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            repository: Repositório de treinos que executa as consultas.
+            
+        Returns:
+            Resultado contendo treinos recomendados e justificativa.
+        """
+        consultas = self.query_spec(user)
+        if consultas is None:
+            return self.recommend(user, get_catalog())
+        
+        repository = repository or WorkoutRepository()
+        return self.recommend(user, repository.find_by_queries(consultas))
+    
+    @property
+    def name(self) -> str:
+        """Nome da estratégia usado em métricas e registros."""
+        return type(self).__name__
+    
+    def warm_up(self, all_workouts: List[any]) -> None:
+        """Prepara as estruturas derivadas do catálogo usadas pela estratégia.
+        
+        Chamado uma vez no início de cada worker, para que índices e
+        tabelas não sejam construídos no caminho da requisição. A
+        implementação padrão não faz nada.
+        
+        Args:
+            all_workouts: Snapshot do catálogo de treinos.
+        """
+    
+    def cohort_signature(self, user: any) -> Optional[tuple]:
+        """Retorna a assinatura de coorte do usuário para esta estratégia.
+        
+        Usuários com a mesma assinatura recebem exatamente a mesma
+        recomendação, o que permite reutilizar o resultado em cache.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            
+        Returns:
+            Tupla com os campos do perfil que influenciam o resultado, ou
+            None se a recomendação depender de dados individuais.
+        """
+        return None
+    
+    def _recomendar_por_coorte(
+        self, 
+        users: List[any], 
+        recomendar: Callable[[any], RecommendationResult]
+    ) -> List[RecommendationResult]:
+        """Calcula uma recomendação por coorte e a replica para o lote.
+        
+        Args:
+            users: Usuários para os quais gerar recomendações.
+            recomendar: Função que gera a recomendação de um usuário.
+            
+        Returns:
+            Lista de resultados na mesma ordem de ``users``.
+        """
+        por_coorte = {}
+        resultados = []
+        
+        for user in users:
+            cohort = self.cohort_signature(user)
+            if cohort is None:
+                resultados.append(recomendar(user))
+                continue
+            
+            if cohort not in por_coorte:
+                por_coorte[cohort] = recomendar(user)
+            result = por_coorte[cohort]
+            resultados.append(RecommendationResult(
+                workouts=list(result.workouts),
+                reasoning=result.reasoning
+            ))
+        
+        return resultados
 
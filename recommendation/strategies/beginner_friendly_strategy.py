@@ -1,5 +1,13 @@
+from itertools import chain, islice
 from typing import List
-from .base import RecommendationStrategy, RecommendationResult
+from .base import (
+    MAX_RECOMENDACOES,
+    RecommendationStrategy,
+    RecommendationResult,
+    catalog_structure
+)
+from .catalog_index import CatalogIndex
+from ..repositories import WorkoutQuery
 
 
 class BeginnerFriendlyStrategy(RecommendationStrategy):
@@ -27,27 +35,73 @@ class BeginnerFriendlyStrategy(RecommendationStrategy):
         )
         
         return RecommendationResult(
-            workouts=workouts_recomendados[:3],
+            workouts=workouts_recomendados,
             reasoning=reasoning
         )
     
-    def _selecionar_treinos_iniciantes(self, workouts: List) -> List:
+    def recommend_many(self, users: List, all_workouts: List) -> List[RecommendationResult]:
+        """Gera recomendações em lote, calculando uma vez por coorte.
+        
+        Args:
+            users: Usuários para os quais gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Lista de resultados na mesma ordem de ``users``.
+        """
+        return self._recomendar_por_coorte(
+            users,
+            lambda user: self.recommend(user, all_workouts)
+        )
+    
+    def warm_up(self, all_workouts: List) -> None:
+        """Constrói o índice do catálogo usado na seleção dos treinos."""
+        catalog_structure(all_workouts, 'catalog_index', CatalogIndex)
+    
+    def cohort_signature(self, user) -> tuple:
+        """A recomendação para iniciantes não depende do perfil individual."""
+        return ()
+    
+    def query_spec(self, user) -> List[WorkoutQuery]:
+        """Descreve a seleção de ``_selecionar_treinos_iniciantes`` como consultas.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            
+        Returns:
+            Consultas cuja união contém os treinos recomendados.
+        """
+        return [
+            WorkoutQuery(
+                filtros=(('intensidade', intensidade), ('duracao_minutos__lte', 45)),
+                ordenacao=('duracao_minutos',),
+                limite=MAX_RECOMENDACOES
+            )
+            for intensidade in ['baixa', 'media']
+        ]
+    
+    def _selecionar_treinos_iniciantes(
+        self, 
+        workouts: List, 
+        limite: int = MAX_RECOMENDACOES
+    ) -> List:
         """Seleciona treinos adequados para iniciantes.
         
         Args:
             workouts: Lista de treinos disponíveis.
+            limite: Quantidade máxima de treinos a retornar.
             
         Returns:
-            Lista de treinos para iniciantes ordenados por adequação.
+            Até ``limite`` treinos para iniciantes ordenados por adequação:
+            primeiro os de baixa intensidade, depois os de média, e dentro
+            de cada grupo os mais curtos primeiro.
         """
-        treinos_filtrados = [
-            w for w in workouts 
-            if w.intensidade in ['baixa', 'media'] and w.duracao_minutos <= 45
-        ]
+        index = catalog_structure(workouts, 'catalog_index', CatalogIndex)
         
-        return sorted(
-            treinos_filtrados,
-            key=lambda w: (w.intensidade == 'baixa', -w.duracao_minutos),
-            reverse=True
+        posicoes = chain(
+            index.faixa('duracao_minutos', ['baixa'], maximo=45),
+            index.faixa('duracao_minutos', ['media'], maximo=45)
         )
+        
+        return index.treinos(islice(posicoes, limite))
 
@@ -1,5 +1,14 @@
+from itertools import islice
 from typing import List
-from .base import RecommendationStrategy, RecommendationResult
+from .base import (
+    MAX_RECOMENDACOES,
+    RecommendationStrategy,
+    RecommendationResult,
+    catalog_structure
+)
+from .catalog_index import CatalogIndex
+from ..repositories import WorkoutQuery
+from ..metabolic_profile import metabolic_profiles
 
 
 class CalorieBasedStrategy(RecommendationStrategy):
@@ -20,76 +29,107 @@ class CalorieBasedStrategy(RecommendationStrategy):
             Resultado contendo até 3 treinos recomendados e justificativa
             com informações calóricas.
         """
-        tmb = self._calcular_tmb(user)
-        meta_calorica = self._calcular_meta_calorica(tmb, user.objetivo)
+        perfil = metabolic_profiles.get_profile(user)
         
         workouts_recomendados = self._selecionar_treinos_por_calorias(
             all_workouts, 
-            meta_calorica
-        )
-        
-        reasoning = (
-            f"Recomendação baseada em meta calórica de {meta_calorica:.0f} kcal/dia. "
-            f"TMB calculada: {tmb:.0f} kcal/dia. Objetivo: {user.objetivo}."
+            perfil.meta_calorica
         )
         
         return RecommendationResult(
-            workouts=workouts_recomendados[:3],
-            reasoning=reasoning
+            workouts=workouts_recomendados,
+            reasoning=self._gerar_justificativa(perfil.tmb, perfil.meta_calorica, user.objetivo)
         )
     
-    def _calcular_tmb(self, user) -> float:
-        """Calcula Taxa Metabólica Basal usando equação de Mifflin-St Jeor.
+    def recommend_many(self, users: List, all_workouts: List) -> List[RecommendationResult]:
+        """Gera recomendações calóricas em lote.
+        
+        Obtém os perfis metabólicos de todos os usuários de uma vez e
+        seleciona os treinos uma única vez para cada meta calórica distinta
+        do lote.
         
         Args:
-            user: Usuário com peso, altura e idade.
+            users: Usuários para os quais gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
             
         Returns:
-            TMB em kcal/dia ajustada por fator de atividade.
+            Lista de resultados na mesma ordem de ``users``.
         """
-        peso = float(user.peso)
-        altura = user.altura
-        idade = user.idade
+        perfis = metabolic_profiles.get_profiles(users)
         
-        tmb = (10 * peso) + (6.25 * altura) - (5 * idade) + 5
+        por_meta = {}
+        resultados = []
+        for user, perfil in zip(users, perfis):
+            meta_calorica = perfil.meta_calorica
+            if meta_calorica not in por_meta:
+                por_meta[meta_calorica] = self._selecionar_treinos_por_calorias(
+                    all_workouts, 
+                    meta_calorica
+                )
+            
+            resultados.append(RecommendationResult(
+                workouts=list(por_meta[meta_calorica]),
+                reasoning=self._gerar_justificativa(perfil.tmb, meta_calorica, user.objetivo)
+            ))
         
-        fator_atividade = 1.55
-        return tmb * fator_atividade
+        return resultados
     
-    def _calcular_meta_calorica(self, tmb: float, objetivo: str) -> float:
-        """Calcula meta calórica baseada no objetivo.
+    def warm_up(self, all_workouts: List) -> None:
+        """Constrói o índice do catálogo usado na seleção dos treinos."""
+        catalog_structure(all_workouts, 'catalog_index', CatalogIndex)
+    
+    def query_spec(self, user) -> List[WorkoutQuery]:
+        """Descreve a seleção pela proximidade à meta calórica como consulta.
         
         Args:
-            tmb: Taxa metabólica basal em kcal/dia.
-            objetivo: Objetivo do usuário (emagrecer, ganhar_massa, manter).
+            user: Usuário para o qual gerar recomendações.
             
         Returns:
-            Meta calórica diária ajustada ao objetivo.
+            Consulta com os treinos mais próximos do alvo calórico.
         """
-        if objetivo == 'emagrecer':
-            return tmb * 0.8
-        elif objetivo == 'ganhar_massa':
-            return tmb * 1.15
-        else:
-            return tmb
+        perfil = metabolic_profiles.get_profile(user)
+        return [WorkoutQuery(
+            proximo_de=('calorias_estimadas', self._alvo_calorico(perfil.meta_calorica)),
+            limite=MAX_RECOMENDACOES
+        )]
     
     def _selecionar_treinos_por_calorias(
         self, 
         workouts: List, 
-        meta_calorica: float
+        meta_calorica: float,
+        limite: int = MAX_RECOMENDACOES
     ) -> List:
         """Seleciona treinos baseados na meta calórica.
         
         Args:
             workouts: Lista de treinos disponíveis.
             meta_calorica: Meta calórica do usuário em kcal/dia.
+            limite: Quantidade máxima de treinos a retornar.
+            
+        Returns:
+            Até ``limite`` treinos ordenados por proximidade à meta calórica.
+        """
+        alvo = self._alvo_calorico(meta_calorica)
+        index = catalog_structure(workouts, 'catalog_index', CatalogIndex)
+        posicoes = index.mais_proximos('calorias_estimadas', alvo)
+        return index.treinos(islice(posicoes, limite))
+    
+    def _alvo_calorico(self, meta_calorica: float) -> float:
+        """Calorias por treino correspondentes a 20% da meta diária."""
+        return meta_calorica * 0.2
+    
+    def _gerar_justificativa(self, tmb: float, meta_calorica: float, objetivo: str) -> str:
+        """Gera justificativa da recomendação calórica.
+        
+        Args:
+            tmb: Taxa metabólica basal em kcal/dia.
+            meta_calorica: Meta calórica do usuário em kcal/dia.
+            objetivo: Objetivo do usuário (emagrecer, ganhar_massa, manter).
             
         Returns:
-            Lista de treinos ordenados por proximidade à meta calórica.
+            Texto explicativo da recomendação.
         """
-        treinos_ordenados = sorted(
-            workouts,
-            key=lambda w: abs(w.calorias_estimadas - (meta_calorica * 0.2))
+        return (
+            f"Recomendação baseada em meta calórica de {meta_calorica:.0f} kcal/dia. "
+            f"TMB calculada: {tmb:.0f} kcal/dia. Objetivo: {objetivo}."
         )
-        return treinos_ordenados
-
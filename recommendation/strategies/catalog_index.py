@@ -0,0 +1,206 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+CAMPOS_INDEXADOS = ('calorias_estimadas', 'duracao_minutos')
+
+
+class _FaixaOrdenada:
+    """Posições de um bucket ordenadas por um campo numérico.
+    
+    Mantém os valores em ordem crescente e as posições correspondentes,
+    com empates resolvidos pela posição no catálogo.
+    """
+    
+    def __init__(self, posicoes: Iterable[int], valores: Sequence[int]):
+        self.posicoes = sorted(posicoes, key=lambda p: (valores[p], p))
+        self.valores = [valores[p] for p in self.posicoes]
+    
+    def intervalo(self, minimo: Optional[int], maximo: Optional[int]) -> tuple:
+        """Localiza por busca binária o trecho com valores em [minimo, maximo].
+        
+        Returns:
+            Tupla (início, fim) do trecho nas listas ordenadas.
+        """
+        inicio = 0 if minimo is None else bisect_left(self.valores, minimo)
+        fim = len(self.valores) if maximo is None else bisect_right(self.valores, maximo)
+        return inicio, max(inicio, fim)
+    
+    def crescente(self, inicio: int, fim: int) -> Iterator[int]:
+        posicoes = self.posicoes
+        for i in range(inicio, fim):
+            yield posicoes[i]
+    
+    def decrescente(self, inicio: int, fim: int) -> Iterator[int]:
+        """Percorre o trecho do maior para o menor valor.
+        
+        Dentro de cada grupo de valores iguais, mantém a ordem do catálogo,
+        como uma ordenação estável decrescente.
+        """
+        i = fim
+        while i > inicio:
+            j = bisect_left(self.valores, self.valores[i - 1], inicio, i)
+            yield from self.posicoes[j:i]
+            i = j
+    
+    def mais_proximos(self, alvo: float) -> Iterator[int]:
+        """Percorre as posições da mais próxima para a mais distante do alvo.
+        
+        Localiza o alvo por busca binária e expande dois ponteiros, um para
+        cada lado, avançando sempre pelo grupo de valores mais próximo. Obter
+        os k primeiros custa O(log n + k). Em empates de distância, inclusive
+        entre valores dos dois lados do alvo, mantém a ordem do catálogo,
+        como ``sorted(..., key=lambda v: abs(v - alvo))``.
+        
+        Args:
+            alvo: Valor de referência.
+            
+        Returns:
+            Iterador de posições ordenadas por ``abs(valor - alvo)``.
+        """
+        valores = self.valores
+        esquerda = bisect_left(valores, alvo)
+        direita = esquerda
+        
+        while esquerda > 0 or direita < len(valores):
+            distancia_esquerda = alvo - valores[esquerda - 1] if esquerda > 0 else None
+            distancia_direita = valores[direita] - alvo if direita < len(valores) else None
+            
+            grupos = []
+            if distancia_esquerda is not None and (
+                distancia_direita is None or distancia_esquerda <= distancia_direita
+            ):
+                inicio = bisect_left(valores, valores[esquerda - 1], 0, esquerda)
+                grupos.append(self.crescente(inicio, esquerda))
+                esquerda = inicio
+            if distancia_direita is not None and (
+                distancia_esquerda is None or distancia_direita <= distancia_esquerda
+            ):
+                fim = bisect_right(valores, valores[direita], direita)
+                grupos.append(self.crescente(direita, fim))
+                direita = fim
+            
+            yield from heapq.merge(*grupos)
+
+
+class CatalogIndex:
+    """Índices de atributos sobre o catálogo de treinos.
+    
+    Agrupa os treinos em buckets por intensidade e, dentro de cada bucket,
+    mantém as posições ordenadas por calorias e por duração. Filtros do
+    tipo "intensidade em X e campo dentro de uma faixa" viram uniões de
+    buckets e buscas binárias, percorrendo apenas os treinos que atendem
+    ao filtro, já na ordem desejada. Consultas por proximidade a um valor
+    usam as mesmas listas ordenadas.
+    
+    Construído uma vez por versão do catálogo via ``catalog_structure``.
+    """
+    
+    def __init__(self, workouts: Sequence):
+        self.workouts = workouts
+        self._colunas = {
+            campo: [getattr(w, campo) for w in workouts]
+            for campo in CAMPOS_INDEXADOS
+        }
+        
+        self._buckets: Dict[str, List[int]] = {}
+        for posicao, workout in enumerate(workouts):
+            self._buckets.setdefault(workout.intensidade, []).append(posicao)
+        
+        self._faixas = {
+            campo: {
+                intensidade: _FaixaOrdenada(posicoes, self._colunas[campo])
+                for intensidade, posicoes in self._buckets.items()
+            }
+            for campo in CAMPOS_INDEXADOS
+        }
+        self._ordenadas = {
+            campo: _FaixaOrdenada(range(len(workouts)), self._colunas[campo])
+            for campo in CAMPOS_INDEXADOS
+        }
+    
+    def por_intensidade(self, intensidades: Iterable[str]) -> Iterator[int]:
+        """Percorre as posições dos treinos das intensidades informadas.
+        
+        Args:
+            intensidades: Intensidades aceitas (baixa, media, alta).
+            
+        Returns:
+            Iterador de posições na ordem do catálogo.
+        """
+        return heapq.merge(*(self._buckets.get(i, []) for i in intensidades))
+    
+    def faixa(
+        self,
+        campo: str,
+        intensidades: Iterable[str],
+        minimo: Optional[int] = None,
+        maximo: Optional[int] = None,
+        decrescente: bool = False
+    ) -> Iterator[int]:
+        """Percorre os treinos com o campo dentro de uma faixa de valores.
+        
+        Args:
+            campo: Campo indexado (calorias_estimadas ou duracao_minutos).
+            intensidades: Intensidades aceitas (baixa, media, alta).
+            minimo: Valor mínimo do campo (inclusivo), ou None.
+            maximo: Valor máximo do campo (inclusivo), ou None.
+            decrescente: Se True, percorre do maior para o menor valor.
+            
+        Returns:
+            Iterador de posições ordenadas pelo campo e, em empates, pela
+            ordem do catálogo.
+        """
+        valores = self._colunas[campo]
+        iteradores = []
+        for intensidade in intensidades:
+            ordenada = self._faixas[campo].get(intensidade)
+            if ordenada is None:
+                continue
+            inicio, fim = ordenada.intervalo(minimo, maximo)
+            if decrescente:
+                iteradores.append(ordenada.decrescente(inicio, fim))
+            else:
+                iteradores.append(ordenada.crescente(inicio, fim))
+        
+        if decrescente:
+            return heapq.merge(*iteradores, key=lambda p: (-valores[p], p))
+        return heapq.merge(*iteradores, key=lambda p: (valores[p], p))
+    
+    def mais_proximos(
+        self,
+        campo: str,
+        alvo: float,
+        intensidades: Optional[Iterable[str]] = None
+    ) -> Iterator[int]:
+        """Percorre os treinos do valor mais próximo para o mais distante do alvo.
+        
+        Consultas do tipo "os k treinos mais próximos de um valor" consomem
+        apenas os k primeiros itens, em O(log n + k) por bucket.
+        
+        Args:
+            campo: Campo indexado (calorias_estimadas ou duracao_minutos).
+            alvo: Valor de referência.
+            intensidades: Intensidades aceitas, ou None para todo o catálogo.
+            
+        Returns:
+            Iterador de posições ordenadas pela distância ao alvo e, em
+            empates, pela ordem do catálogo.
+        """
+        if intensidades is None:
+            return self._ordenadas[campo].mais_proximos(alvo)
+        
+        valores = self._colunas[campo]
+        return heapq.merge(
+            *(
+                self._faixas[campo][intensidade].mais_proximos(alvo)
+                for intensidade in intensidades
+                if intensidade in self._faixas[campo]
+            ),
+            key=lambda p: (abs(valores[p] - alvo), p)
+        )
+    
+    def treinos(self, posicoes: Iterable[int]) -> List:
+        """Converte posições do índice em treinos do catálogo."""
+        return [self.workouts[p] for p in posicoes]
@@ -0,0 +1,161 @@
+from collections import defaultdict
+from typing import Dict, List
+from ..repositories import CooccurrenceRepository, HistoryRepository
+from .base import (
+    MAX_RECOMENDACOES,
+    RecommendationStrategy,
+    RecommendationResult,
+    catalog_structure,
+    top_k
+)
+from .hybrid_strategy import HybridStrategy
+
+
+HISTORICO_RECENTE = 20
+DECAIMENTO_RECENCIA = 0.9
+
+
+def _posicoes_por_id(workouts) -> Dict[int, int]:
+    return {w.pk: posicao for posicao, w in enumerate(workouts)}
+
+
+class CooccurrenceStrategy(RecommendationStrategy):
+    """Estratégia item a item baseada no histórico de treinos dos usuários.
+    
+    Recomenda os treinos mais frequentemente realizados por usuários que
+    também realizaram os treinos recentes do usuário. O histórico recente
+    vira um vetor esparso, com peso decrescente por recência, multiplicado
+    pelas linhas correspondentes da matriz de coocorrência normalizadas
+    pela popularidade de cada treino, isto é, P(B | A). Usuários sem
+    histórico, ou sem coocorrências suficientes, são completados pela
+    HybridStrategy.
+    """
+    
+    def __init__(self, historico_recente: int = HISTORICO_RECENTE):
+        self.historico_recente = historico_recente
+        self.fallback = HybridStrategy()
+    
+    def recommend(self, user, all_workouts: List) -> RecommendationResult:
+        """Gera recomendações a partir do histórico recente do usuário.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Resultado contendo até 3 treinos recomendados e justificativa.
+        """
+        return self.recommend_many([user], all_workouts)[0]
+    
+    def recommend_many(self, users: List, all_workouts: List) -> List[RecommendationResult]:
+        """Gera recomendações em lote com uma consulta ao histórico e uma à matriz.
+        
+        Args:
+            users: Usuários para os quais gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Lista de resultados na mesma ordem de ``users``.
+        """
+        recentes = HistoryRepository().recent_workout_ids_by_user(
+            [user.pk for user in users if user.pk is not None],
+            limit=self.historico_recente
+        )
+        linhas = CooccurrenceRepository().get_rows(
+            {treino_id for treinos in recentes.values() for treino_id in treinos}
+        )
+        posicoes = catalog_structure(all_workouts, 'posicoes_por_id', _posicoes_por_id)
+        
+        return [
+            self._recomendar(user, recentes.get(user.pk, []), linhas, posicoes, all_workouts)
+            for user in users
+        ]
+    
+    def _recomendar(self, user, recentes, linhas, posicoes, all_workouts) -> RecommendationResult:
+        """Calcula a recomendação de um usuário a partir das linhas da matriz.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            recentes: IDs dos treinos recentes, do mais recente ao mais antigo.
+            linhas: Linhas da matriz de coocorrência dos treinos recentes.
+            posicoes: Mapa de ID do treino para a posição no catálogo.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Resultado com até 3 treinos e justificativa.
+        """
+        scores = self._calcular_scores(recentes, linhas)
+        candidatos = [
+            (score, posicoes[treino_id])
+            for treino_id, score in scores.items()
+            if treino_id in posicoes and treino_id not in recentes
+        ]
+        melhores = top_k(candidatos, MAX_RECOMENDACOES, key=lambda c: (-c[0], c[1]))
+        workouts_recomendados = [all_workouts[posicao] for _, posicao in melhores]
+        
+        if len(workouts_recomendados) == MAX_RECOMENDACOES:
+            return RecommendationResult(
+                workouts=workouts_recomendados,
+                reasoning=self._gerar_justificativa(len(recentes))
+            )
+        
+        complemento = self.fallback.recommend(user, all_workouts)
+        for workout in complemento.workouts:
+            if len(workouts_recomendados) == MAX_RECOMENDACOES:
+                break
+            if workout not in workouts_recomendados:
+                workouts_recomendados.append(workout)
+        
+        if not melhores:
+            return RecommendationResult(
+                workouts=workouts_recomendados,
+                reasoning=complemento.reasoning
+            )
+        
+        return RecommendationResult(
+            workouts=workouts_recomendados,
+            reasoning=(
+                f"{self._gerar_justificativa(len(recentes))} "
+                f"Complementada pela recomendação híbrida."
+            )
+        )
+    
+    def _calcular_scores(self, recentes: List[int], linhas) -> Dict[int, float]:
+        """Multiplica o vetor esparso do histórico pela matriz de coocorrência.
+        
+        Args:
+            recentes: IDs dos treinos recentes, do mais recente ao mais antigo.
+            linhas: Linhas da matriz (pares de treino e contagem por treino).
+            
+        Returns:
+            Score de cada treino coocorrente.
+        """
+        scores = defaultdict(float)
+        for ordem, treino_a in enumerate(recentes):
+            linha = linhas.get(treino_a)
+            if not linha:
+                continue
+            
+            popularidade = next((c for b, c in linha if b == treino_a), 0)
+            if popularidade <= 0:
+                continue
+            
+            peso = DECAIMENTO_RECENCIA ** ordem / popularidade
+            for treino_b, contagem in linha:
+                if treino_b != treino_a:
+                    scores[treino_b] += peso * contagem
+        return scores
+    
+    def _gerar_justificativa(self, quantidade_recentes: int) -> str:
+        """Gera justificativa da recomendação por coocorrência.
+        
+        Args:
+            quantidade_recentes: Quantidade de treinos recentes considerados.
+            
+        Returns:
+            Texto explicativo da recomendação.
+        """
+        return (
+            f"Recomendação baseada em treinos realizados por usuários com histórico "
+            f"semelhante ao seu ({quantidade_recentes} treinos recentes considerados)."
+        )
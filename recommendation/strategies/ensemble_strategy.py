@@ -0,0 +1,325 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from django.conf import settings
+from django.db import close_old_connections
+from .base import MAX_RECOMENDACOES, RecommendationStrategy, RecommendationResult, top_k
+from .registry import strategy_registry
+
+
+logger = logging.getLogger(__name__)
+
+ENSEMBLE_MEMBERS = (('calorie', 1.0), ('goal', 1.0), ('hybrid', 1.0))
+PRAZO_PADRAO_MS = 200
+ESPERA_MAXIMA_PADRAO_MS = 1000
+CONSTANTE_FUSAO = 60
+WORKERS_PADRAO = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def ensemble_executor() -> ThreadPoolExecutor:
+    """Retorna o pool de threads compartilhado pelos ensembles do processo.
+    
+    O pool é criado no primeiro uso, com a quantidade de threads definida
+    pelo setting ``RECOMMENDATION_ENSEMBLE_WORKERS``.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(
+                        settings, 'RECOMMENDATION_ENSEMBLE_WORKERS', WORKERS_PADRAO
+                    ),
+                    thread_name_prefix='ensemble'
+                )
+    return _executor
+
+
+@dataclass
+class MemberReport:
+    """Execução de um membro do ensemble em uma chamada.
+    
+    Attributes:
+        nome: Nome da estratégia membro.
+        peso: Peso do membro na fusão dos rankings.
+        status: 'ok', 'atrasado' (fora do prazo) ou 'erro'.
+        duracao_ms: Tempo de execução do membro, ou None se não terminou.
+        contribuicao: Fração do score dos treinos recomendados vinda do membro.
+    """
+    nome: str
+    peso: float
+    status: str
+    duracao_ms: Optional[float] = None
+    contribuicao: float = 0.0
+
+
+@dataclass
+class EnsembleResult(RecommendationResult):
+    """Resultado do ensemble com o relatório de execução dos membros.
+    
+    Attributes:
+        membros: Relatório de cada membro, na ordem de configuração.
+    """
+    membros: List[MemberReport] = field(default_factory=list)
+    
+    @property
+    def contribuintes(self) -> List[str]:
+        """Nomes dos membros que contribuíram para os treinos recomendados."""
+        return [m.nome for m in self.membros if m.contribuicao > 0]
+
+
+class EnsembleStrategy(RecommendationStrategy):
+    """Estratégia que combina os rankings de várias estratégias.
+    
+    Os membros são executados concorrentemente no pool de threads
+    compartilhado e seus rankings são combinados por fusão recíproca de
+    ranks ponderada: cada treino recebe ``peso / (CONSTANTE_FUSAO + rank)``
+    de cada membro que o recomendou. Membros que não terminam dentro do
+    prazo da requisição são ignorados e o resultado usa os rankings já
+    disponíveis; se nenhum membro terminou no prazo, aguarda o primeiro,
+    até a espera máxima. Passada a espera máxima sem nenhum membro, o
+    resultado é vazio e todos os membros aparecem como atrasados.
+    
+    Membros atrasados que ainda estão na fila do pool são cancelados.
+    Threads não podem ser interrompidas: um membro que já começou continua
+    ocupando uma thread até terminar, mas nenhuma chamada o aguarda além da
+    espera máxima, e o atraso de uma chamada não afeta as demais.
+    
+    Membros puramente Python disputam o GIL, então o ganho de latência vem
+    dos membros que liberam o interpretador (NumPy, banco de dados); o
+    prazo limita a latência em qualquer caso.
+    """
+    
+    def __init__(
+        self,
+        membros: Optional[Sequence[Tuple[Union[str, RecommendationStrategy], float]]] = None,
+        prazo_ms: Optional[float] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        espera_maxima_ms: Optional[float] = None
+    ):
+        self._membros = list(membros or ENSEMBLE_MEMBERS)
+        self.prazo_ms = prazo_ms if prazo_ms is not None else getattr(
+            settings, 'RECOMMENDATION_ENSEMBLE_DEADLINE_MS', PRAZO_PADRAO_MS
+        )
+        self.espera_maxima_ms = espera_maxima_ms if espera_maxima_ms is not None else getattr(
+            settings, 'RECOMMENDATION_ENSEMBLE_MAX_WAIT_MS', ESPERA_MAXIMA_PADRAO_MS
+        )
+        self._executor = executor
+    
+    @property
+    def membros(self) -> List[Tuple[str, RecommendationStrategy, float]]:
+        """Membros como (nome, estratégia, peso), resolvendo nomes no registro."""
+        resolvidos = []
+        for membro, peso in self._membros:
+            strategy = strategy_registry.get(membro) if isinstance(membro, str) else membro
+            resolvidos.append((strategy.name, strategy, peso))
+        return resolvidos
+    
+    def recommend(self, user, all_workouts: List) -> EnsembleResult:
+        """Gera recomendações combinando os membros dentro do prazo.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Resultado com até 3 treinos, justificativa e relatório dos membros.
+        """
+        return self.recommend_many([user], all_workouts)[0]
+    
+    def recommend_many(self, users: List, all_workouts: List) -> List[EnsembleResult]:
+        """Gera recomendações em lote, com um ``recommend_many`` por membro.
+        
+        Args:
+            users: Usuários para os quais gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Lista de resultados na mesma ordem de ``users``.
+        """
+        self._carregar_relacionamentos(users)
+        membros = self.membros
+        execucoes = self._executar(
+            membros,
+            lambda strategy: strategy.recommend_many(users, all_workouts)
+        )
+        
+        return [
+            self._combinar(membros, execucoes, i)
+            for i in range(len(users))
+        ]
+    
+    def warm_up(self, all_workouts: List) -> None:
+        for _, strategy, _ in self.membros:
+            strategy.warm_up(all_workouts)
+    
+    def cohort_signature(self, user) -> Optional[tuple]:
+        """Combina as assinaturas de coorte dos membros.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            
+        Returns:
+            Tupla com a assinatura de cada membro, ou None se algum membro
+            depender de dados individuais.
+        """
+        assinaturas = tuple(strategy.cohort_signature(user) for _, strategy, _ in self.membros)
+        if any(assinatura is None for assinatura in assinaturas):
+            return None
+        return assinaturas
+    
+    def _carregar_relacionamentos(self, users: List) -> None:
+        """Carrega as preferências na thread da requisição.
+        
+        Assim os membros não abrem conexões com o banco nas threads do pool
+        apenas para ler o relacionamento.
+        """
+        for user in users:
+            hasattr(user, 'preferencias')
+    
+    def _executar(
+        self,
+        membros: List[Tuple[str, RecommendationStrategy, float]],
+        chamada: Callable[[RecommendationStrategy], List[RecommendationResult]]
+    ) -> Dict[str, Tuple[str, Optional[List[RecommendationResult]], Optional[float]]]:
+        """Executa os membros no pool e aguarda até o prazo.
+        
+        Se nenhum membro terminou com sucesso no prazo, aguarda o primeiro
+        até a espera máxima, contada do início da chamada.
+        
+        Args:
+            membros: Membros como (nome, estratégia, peso).
+            chamada: Função que executa um membro.
+            
+        Returns:
+            Dicionário de nome do membro para (status, resultados, duração em ms).
+        """
+        executor = self._executor or ensemble_executor()
+        inicio = time.monotonic()
+        futures = {
+            executor.submit(self._medir, chamada, strategy): nome
+            for nome, strategy, _ in membros
+        }
+        
+        concluidos, pendentes = wait(futures, timeout=self.prazo_ms / 1000)
+        if not any(f.exception() is None for f in concluidos) and pendentes:
+            logger.warning(
+                "Nenhum membro do ensemble respondeu em %s ms; aguardando o primeiro por até %s ms",
+                self.prazo_ms,
+                self.espera_maxima_ms
+            )
+            limite = inicio + max(self.prazo_ms, self.espera_maxima_ms) / 1000
+            while pendentes and not any(f.exception() is None for f in concluidos):
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                novos, pendentes = wait(pendentes, timeout=restante, return_when=FIRST_COMPLETED)
+                concluidos |= novos
+        
+        execucoes = {}
+        for future, nome in futures.items():
+            if future not in concluidos:
+                future.cancel()
+                execucoes[nome] = ('atrasado', None, None)
+            elif future.exception() is not None:
+                logger.error("Membro %s do ensemble falhou: %s", nome, future.exception())
+                execucoes[nome] = ('erro', None, None)
+            else:
+                resultados, segundos = future.result()
+                execucoes[nome] = ('ok', resultados, segundos * 1000)
+        
+        situacoes = {status for status, _, _ in execucoes.values()}
+        if situacoes == {'erro'}:
+            raise next(iter(concluidos)).exception()
+        if 'ok' not in situacoes:
+            logger.error(
+                "Nenhum membro do ensemble respondeu em %s ms; resultado vazio",
+                self.espera_maxima_ms
+            )
+        
+        return execucoes
+    
+    def _medir(self, chamada, strategy) -> Tuple[List[RecommendationResult], float]:
+        """Executa um membro medindo a duração.
+        
+        Roda nas threads do pool; as conexões com o banco são liberadas ao
+        final, como ao fim de uma requisição.
+        """
+        try:
+            inicio = time.perf_counter()
+            resultados = chamada(strategy)
+            return resultados, time.perf_counter() - inicio
+        finally:
+            close_old_connections()
+    
+    def _combinar(self, membros, execucoes, indice: int) -> EnsembleResult:
+        """Funde os rankings dos membros para um usuário do lote.
+        
+        Args:
+            membros: Membros como (nome, estratégia, peso).
+            execucoes: Execuções dos membros retornadas por ``_executar``.
+            indice: Posição do usuário no lote.
+            
+        Returns:
+            Resultado combinado do usuário.
+        """
+        scores = {}
+        parcelas = {}
+        for nome, _, peso in membros:
+            status, resultados, _ = execucoes[nome]
+            if status != 'ok':
+                continue
+            for rank, workout in enumerate(resultados[indice].workouts, start=1):
+                parcela = peso / (CONSTANTE_FUSAO + rank)
+                scores[workout] = scores.get(workout, 0.0) + parcela
+                parcelas.setdefault(workout, {})[nome] = parcela
+        
+        workouts_recomendados = top_k(scores, MAX_RECOMENDACOES, key=scores.get, reverse=True)
+        total = sum(scores[w] for w in workouts_recomendados)
+        
+        relatorio = []
+        for nome, _, peso in membros:
+            status, _, duracao_ms = execucoes[nome]
+            contribuicao = sum(parcelas[w].get(nome, 0.0) for w in workouts_recomendados)
+            relatorio.append(MemberReport(
+                nome=nome,
+                peso=peso,
+                status=status,
+                duracao_ms=duracao_ms,
+                contribuicao=contribuicao / total if total else 0.0
+            ))
+        
+        return EnsembleResult(
+            workouts=workouts_recomendados,
+            reasoning=self._gerar_justificativa(relatorio),
+            membros=relatorio
+        )
+    
+    def _gerar_justificativa(self, relatorio: List[MemberReport]) -> str:
+        """Gera justificativa citando os membros que contribuíram.
+        
+        Args:
+            relatorio: Relatório de execução dos membros.
+            
+        Returns:
+            Texto explicativo da recomendação.
+        """
+        contribuintes = [m.nome for m in relatorio if m.contribuicao > 0]
+        if contribuintes:
+            justificativa = f"Recomendação combinada das estratégias: {', '.join(contribuintes)}."
+        else:
+            justificativa = "Nenhuma estratégia do ensemble respondeu a tempo."
+        
+        atrasados = [m.nome for m in relatorio if m.status != 'ok']
+        if atrasados:
+            justificativa += (
+                f" Não consideradas por atraso ou falha (prazo de {self.prazo_ms:g} ms): "
+                f"{', '.join(atrasados)}."
+            )
+        return justificativa
@@ -1,5 +1,14 @@
+from itertools import chain, islice
 from typing import List
-from .base import RecommendationStrategy, RecommendationResult
+from .base import (
+    MAX_RECOMENDACOES,
+    RecommendationStrategy,
+    RecommendationResult,
+    catalog_structure,
+    top_k
+)
+from .catalog_index import CatalogIndex
+from ..repositories import WorkoutQuery
 
 
 class GoalBasedStrategy(RecommendationStrategy):
@@ -29,40 +38,96 @@ class GoalBasedStrategy(RecommendationStrategy):
         reasoning = self._gerar_justificativa(objetivo)
         
         return RecommendationResult(
-            workouts=workouts_recomendados[:3],
+            workouts=workouts_recomendados,
             reasoning=reasoning
         )
     
-    def _selecionar_treinos_por_objetivo(self, workouts: List, objetivo: str) -> List:
+    def recommend_many(self, users: List, all_workouts: List) -> List[RecommendationResult]:
+        """Gera recomendações em lote, calculando uma vez por coorte.
+        
+        Args:
+            users: Usuários para os quais gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Lista de resultados na mesma ordem de ``users``.
+        """
+        return self._recomendar_por_coorte(
+            users,
+            lambda user: self.recommend(user, all_workouts)
+        )
+    
+    def warm_up(self, all_workouts: List) -> None:
+        """Constrói o índice do catálogo usado na seleção dos treinos."""
+        catalog_structure(all_workouts, 'catalog_index', CatalogIndex)
+    
+    def cohort_signature(self, user) -> tuple:
+        """Usuários com o mesmo objetivo recebem a mesma recomendação."""
+        return (user.objetivo,)
+    
+    def query_spec(self, user) -> List[WorkoutQuery]:
+        """Descreve a seleção de ``_selecionar_treinos_por_objetivo`` como consultas.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            
+        Returns:
+            Consultas cuja união contém os treinos recomendados.
+        """
+        if user.objetivo == 'emagrecer':
+            return [WorkoutQuery(
+                filtros=(
+                    ('intensidade__in', ('media', 'alta')),
+                    ('calorias_estimadas__gte', 250),
+                ),
+                ordenacao=('-calorias_estimadas',),
+                limite=MAX_RECOMENDACOES
+            )]
+        
+        if user.objetivo == 'ganhar_massa':
+            return [
+                WorkoutQuery(
+                    filtros=(('intensidade', intensidade), ('duracao_minutos__gte', 30)),
+                    limite=MAX_RECOMENDACOES
+                )
+                for intensidade in ['alta', 'media']
+            ]
+        
+        return [WorkoutQuery(filtros=(('intensidade', 'media'),), limite=MAX_RECOMENDACOES)]
+    
+    def _selecionar_treinos_por_objetivo(
+        self, 
+        workouts: List, 
+        objetivo: str,
+        limite: int = MAX_RECOMENDACOES
+    ) -> List:
         """Seleciona treinos adequados ao objetivo.
         
         Args:
             workouts: Lista de treinos disponíveis.
             objetivo: Objetivo do usuário (emagrecer, ganhar_massa, manter).
+            limite: Quantidade máxima de treinos a retornar.
             
         Returns:
-            Lista de treinos recomendados ordenados por relevância.
+            Até ``limite`` treinos recomendados ordenados por relevância.
         """
+        index = catalog_structure(workouts, 'catalog_index', CatalogIndex)
+        
         if objetivo == 'emagrecer':
-            treinos_filtrados = [
-                w for w in workouts 
-                if w.intensidade in ['media', 'alta'] and w.calorias_estimadas >= 250
-            ]
-            return sorted(treinos_filtrados, key=lambda w: -w.calorias_estimadas)
+            posicoes = index.faixa(
+                'calorias_estimadas', ['media', 'alta'], minimo=250, decrescente=True
+            )
         
         elif objetivo == 'ganhar_massa':
-            treinos_filtrados = [
-                w for w in workouts 
-                if w.intensidade in ['media', 'alta'] and w.duracao_minutos >= 30
-            ]
-            return sorted(treinos_filtrados, key=lambda w: -w.intensidade == 'alta')
+            posicoes = chain.from_iterable(
+                top_k(index.faixa('duracao_minutos', [intensidade], minimo=30), limite)
+                for intensidade in ['alta', 'media']
+            )
         
         else:
-            treinos_filtrados = [
-                w for w in workouts 
-                if w.intensidade == 'media'
-            ]
-            return treinos_filtrados
+            posicoes = index.por_intensidade(['media'])
+        
+        return index.treinos(islice(posicoes, limite))
     
     def _gerar_justificativa(self, objetivo: str) -> str:
         """Gera justificativa da recomendação.
@@ -1,14 +1,20 @@
-from typing import List
-from .base import RecommendationStrategy, RecommendationResult
+from typing import Any, Dict, List, Optional
+from .base import MAX_RECOMENDACOES, RecommendationStrategy, RecommendationResult, top_k
+from .scoring_rules import FREQUENCIA_ALTA, FREQUENCIA_BAIXA, ScoringRules
 
 
 class HybridStrategy(RecommendationStrategy):
     """Estratégia híbrida que combina múltiplos critérios.
     
     Considera meta calórica, objetivo, nível do usuário e preferências
-    pessoais através de um sistema de pontuação.
+    pessoais através de um sistema de pontuação. As regras são compiladas
+    em tabelas de consulta uma única vez por instância, com os pesos do
+    setting ``RECOMMENDATION_SCORING_WEIGHTS``.
     """
     
+    def __init__(self, pesos: Optional[Dict[str, Any]] = None):
+        self.regras = ScoringRules(pesos) if pesos is not None else ScoringRules.from_settings()
+    
     def recommend(self, user, all_workouts: List) -> RecommendationResult:
         """Gera recomendações usando sistema híbrido de pontuação.
         
@@ -20,100 +26,89 @@ class HybridStrategy(RecommendationStrategy):
             Resultado contendo até 3 treinos recomendados e justificativa
             explicando os fatores considerados.
         """
-        score_workouts = []
-        for workout in all_workouts:
-            score = self._calcular_score_workout(workout, user)
-            score_workouts.append((workout, score))
-        
-        score_workouts.sort(key=lambda x: -x[1])
-        workouts_recomendados = [w for w, _ in score_workouts[:3]]
-        
-        reasoning = (
-            f"Recomendação híbrida considerando múltiplos fatores: "
-            f"nível ({user.nivel}), objetivo ({user.objetivo}), "
-            f"meta calórica e preferências pessoais."
+        pontuar = self.regras.scorer(user)
+        workouts_recomendados = top_k(
+            all_workouts,
+            MAX_RECOMENDACOES,
+            key=lambda w: -pontuar(w)
         )
         
         return RecommendationResult(
             workouts=workouts_recomendados,
-            reasoning=reasoning
+            reasoning=self._gerar_justificativa(user)
         )
     
-    def _calcular_score_workout(self, workout, user) -> float:
-        """Calcula score de adequação de um treino ao usuário.
+    def recommend_many(self, users: List, all_workouts: List) -> List[RecommendationResult]:
+        """Gera recomendações em lote, calculando uma vez por coorte.
         
-        Considera nível de experiência, objetivo, calorias e preferências
-        de frequência de treino.
+        Args:
+            users: Usuários para os quais gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Lista de resultados na mesma ordem de ``users``.
+        """
+        return self._recomendar_por_coorte(
+            users,
+            lambda user: self.recommend(user, all_workouts)
+        )
+    
+    def cohort_signature(self, user) -> tuple:
+        """Agrupa usuários por nível, objetivo e faixa de frequência semanal.
         
         Args:
-            workout: Treino a ser avaliado.
             user: Usuário com perfil e preferências.
             
         Returns:
-            Score de adequação (maior valor indica melhor adequação).
+            Tupla (nível, objetivo, faixa de frequência).
         """
-        score = 0.0
-        
-        if user.nivel == 'iniciante':
-            if workout.intensidade == 'baixa':
-                score += 3.0
-            elif workout.intensidade == 'media':
-                score += 1.5
-        elif user.nivel == 'intermediario':
-            if workout.intensidade == 'media':
-                score += 3.0
-            elif workout.intensidade in ['baixa', 'alta']:
-                score += 1.5
-        else:
-            if workout.intensidade == 'alta':
-                score += 3.0
-            elif workout.intensidade == 'media':
-                score += 1.5
-        
-        if user.objetivo == 'emagrecer':
-            score += workout.calorias_estimadas / 100
-        elif user.objetivo == 'ganhar_massa':
-            if workout.intensidade == 'alta':
-                score += 2.0
+        return (user.nivel, user.objetivo, self._faixa_frequencia(user))
+    
+    def _faixa_frequencia(self, user) -> str:
+        """Classifica a frequência semanal nas faixas usadas pelo score.
         
-        if hasattr(user, 'preferencias'):
-            if workout.duracao_minutos <= 30 and user.preferencias.frequencia_treino_semana >= 5:
-                score += 1.0
-            elif workout.duracao_minutos >= 45 and user.preferencias.frequencia_treino_semana <= 3:
-                score += 1.0
+        Args:
+            user: Usuário com preferências opcionais.
+            
+        Returns:
+            'alta' (5+ treinos), 'baixa' (até 3), 'media' ou 'sem_preferencias'.
+        """
+        if not hasattr(user, 'preferencias'):
+            return 'sem_preferencias'
         
-        return score
+        frequencia = user.preferencias.frequencia_treino_semana
+        if frequencia >= FREQUENCIA_ALTA:
+            return 'alta'
+        if frequencia <= FREQUENCIA_BAIXA:
+            return 'baixa'
+        return 'media'
     
-    def _calcular_tmb(self, user) -> float:
-        """Calcula Taxa Metabólica Basal.
+    def _gerar_justificativa(self, user) -> str:
+        """Gera justificativa da recomendação híbrida.
         
         Args:
-            user: Usuário com peso, altura e idade.
+            user: Usuário com nível e objetivo.
             
         Returns:
-            TMB em kcal/dia ajustada por fator de atividade.
+            Texto explicativo da recomendação.
         """
-        peso = float(user.peso)
-        altura = user.altura
-        idade = user.idade
-        
-        tmb = (10 * peso) + (6.25 * altura) - (5 * idade) + 5
-        return tmb * 1.55
+        return (
+            f"Recomendação híbrida considerando múltiplos fatores: "
+            f"nível ({user.nivel}), objetivo ({user.objetivo}), "
+            f"meta calórica e preferências pessoais."
+        )
     
-    def _calcular_meta_calorica(self, tmb: float, objetivo: str) -> float:
-        """Calcula meta calórica baseada no objetivo.
+    def _calcular_score_workout(self, workout, user) -> float:
+        """Calcula score de adequação de um treino ao usuário.
+        
+        Considera nível de experiência, objetivo, calorias e preferências
+        de frequência de treino, pelas regras compiladas.
         
         Args:
-            tmb: Taxa metabólica basal em kcal/dia.
-            objetivo: Objetivo do usuário (emagrecer, ganhar_massa, manter).
+            workout: Treino a ser avaliado.
+            user: Usuário com perfil e preferências.
             
         Returns:
-            Meta calórica diária ajustada ao objetivo.
+            Score de adequação (maior valor indica melhor adequação).
         """
-        if objetivo == 'emagrecer':
-            return tmb * 0.8
-        elif objetivo == 'ganhar_massa':
-            return tmb * 1.15
-        else:
-            return tmb
-
+        return self.regras.scorer(user)(workout)
@@ -0,0 +1,82 @@
+import time
+from typing import List, Optional
+from ..metrics import StrategyMetrics, strategy_metrics
+from ..repositories import WorkoutQuery
+from .base import RecommendationStrategy, RecommendationResult
+
+
+class InstrumentedStrategy(RecommendationStrategy):
+    """Decorator de estratégia que registra latência e volume das chamadas.
+    
+    Mede o tempo de parede de ``recommend`` e ``recommend_many`` e registra
+    nas métricas em processo, sob ``label``, junto com o tamanho do
+    catálogo e a quantidade de treinos retornados. Só é aplicado pelo
+    registro de estratégias quando a instrumentação está habilitada, de
+    modo que não há custo algum quando desabilitada.
+    """
+    
+    def __init__(
+        self,
+        strategy: RecommendationStrategy,
+        label: Optional[str] = None,
+        metrics: Optional[StrategyMetrics] = None
+    ):
+        self.strategy = strategy
+        self.label = label or strategy.name
+        self.metrics = metrics if metrics is not None else strategy_metrics
+    
+    @property
+    def name(self) -> str:
+        return self.strategy.name
+    
+    def recommend(self, user, all_workouts: List) -> RecommendationResult:
+        """Executa a estratégia decorada registrando a chamada.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Resultado da estratégia decorada.
+        """
+        inicio = time.perf_counter()
+        result = self.strategy.recommend(user, all_workouts)
+        self.metrics.record(
+            self.label,
+            'recommend',
+            time.perf_counter() - inicio,
+            len(all_workouts),
+            len(result.workouts)
+        )
+        return result
+    
+    def recommend_many(self, users: List, all_workouts: List) -> List[RecommendationResult]:
+        """Executa o lote da estratégia decorada registrando a chamada.
+        
+        Args:
+            users: Usuários para os quais gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Lista de resultados na mesma ordem de ``users``.
+        """
+        inicio = time.perf_counter()
+        resultados = self.strategy.recommend_many(users, all_workouts)
+        self.metrics.record(
+            self.label,
+            'recommend_many',
+            time.perf_counter() - inicio,
+            len(all_workouts),
+            sum(len(r.workouts) for r in resultados) / len(resultados) if resultados else 0,
+            usuarios=len(users)
+        )
+        return resultados
+    
+    def cohort_signature(self, user) -> Optional[tuple]:
+        return self.strategy.cohort_signature(user)
+    
+    def query_spec(self, user) -> Optional[List[WorkoutQuery]]:
+        return self.strategy.query_spec(user)
+    
+    def warm_up(self, all_workouts: List) -> None:
+        self.strategy.warm_up(all_workouts)
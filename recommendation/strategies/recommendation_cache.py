@@ -0,0 +1,133 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, Optional
+from django.conf import settings
+from ..catalog import WorkoutCatalog
+from ..metrics import strategy_metrics
+from ..repositories import WorkoutQuery
+from .base import RecommendationStrategy, RecommendationResult
+
+
+class RecommendationCache:
+    """Cache LRU de recomendações compartilhado por coortes de usuários.
+    
+    Armazena resultados indexados por (instância da estratégia, assinatura
+    de coorte, versão do catálogo), permitindo que um único cálculo atenda todos os
+    usuários com o mesmo perfil relevante para a estratégia.
+    """
+    
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[RecommendationResult]:
+        """Busca um resultado em cache, marcando-o como usado recentemente.
+        
+        Args:
+            key: Chave da recomendação.
+            
+        Returns:
+            Resultado armazenado ou None se não existir.
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+    
+    def set(self, key: Hashable, result: RecommendationResult) -> None:
+        """Armazena um resultado, descartando o menos usado se necessário.
+        
+        Args:
+            key: Chave da recomendação.
+            result: Resultado a ser armazenado.
+        """
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+recommendation_cache = RecommendationCache(
+    max_size=getattr(settings, 'RECOMMENDATION_CACHE_SIZE', 1024)
+)
+strategy_metrics.register_cache('recomendacoes_por_coorte', recommendation_cache)
+
+
+class CachedRecommendationStrategy(RecommendationStrategy):
+    """Decorator de estratégia que reutiliza recomendações por coorte.
+    
+    Estratégias cujo resultado depende apenas de campos grosseiros do
+    perfil expõem uma assinatura de coorte; usuários com a mesma
+    assinatura recebem o resultado calculado uma única vez por versão
+    do catálogo. Estratégias sem assinatura são sempre executadas.
+    
+    A chave usa a instância decorada, e não apenas o nome da estratégia,
+    de modo que instâncias com configurações diferentes (por exemplo,
+    pesos distintos da HybridStrategy) não compartilham resultados. Só o
+    snapshot do catálogo é cacheado: listas passadas diretamente (parciais
+    ou vindas das consultas no banco) são sempre calculadas, já que
+    identificá-las exigiria percorrê-las a cada busca.
+    """
+    
+    def __init__(
+        self, 
+        strategy: RecommendationStrategy, 
+        cache: Optional[RecommendationCache] = None
+    ):
+        self.strategy = strategy
+        self.cache = cache if cache is not None else recommendation_cache
+    
+    def recommend(self, user, all_workouts: List) -> RecommendationResult:
+        """Retorna a recomendação da coorte do usuário, calculando se necessário.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Resultado da estratégia decorada.
+        """
+        cohort = self.strategy.cohort_signature(user)
+        if cohort is None or not isinstance(all_workouts, WorkoutCatalog):
+            return self.strategy.recommend(user, all_workouts)
+        
+        key = (self.strategy, cohort, all_workouts.version, all_workouts.fingerprint)
+        
+        result = self.cache.get(key)
+        if result is None:
+            result = self.strategy.recommend(user, all_workouts)
+            self.cache.set(key, result)
+        
+        return RecommendationResult(
+            workouts=list(result.workouts),
+            reasoning=result.reasoning
+        )
+    
+    @property
+    def name(self) -> str:
+        return self.strategy.name
+    
+    def cohort_signature(self, user) -> Optional[tuple]:
+        return self.strategy.cohort_signature(user)
+    
+    def query_spec(self, user) -> Optional[List[WorkoutQuery]]:
+        return self.strategy.query_spec(user)
+    
+    def warm_up(self, all_workouts: List) -> None:
+        self.strategy.warm_up(all_workouts)
@@ -0,0 +1,209 @@
+import logging
+import threading
+from importlib.metadata import EntryPoint, entry_points
+from typing import Dict, Iterable, List, Optional, Union
+from django.conf import settings
+from django.db.utils import OperationalError, ProgrammingError
+from django.utils.module_loading import import_string
+from ..catalog import get_catalog
+from ..metrics import metrics_enabled
+from .base import RecommendationStrategy
+from .instrumentation import InstrumentedStrategy
+from .recommendation_cache import CachedRecommendationStrategy
+
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'fitrecommend.strategies'
+
+BUILTIN_STRATEGIES = {
+    'calorie': 'recommendation.strategies.calorie_based_strategy.CalorieBasedStrategy',
+    'goal': 'recommendation.strategies.goal_based_strategy.GoalBasedStrategy',
+    'beginner': 'recommendation.strategies.beginner_friendly_strategy.BeginnerFriendlyStrategy',
+    'hybrid': 'recommendation.strategies.hybrid_strategy.HybridStrategy',
+    'hybrid_vectorized': (
+        'recommendation.strategies.vectorized_hybrid_strategy.VectorizedHybridStrategy'
+    ),
+    'cooccurrence': 'recommendation.strategies.cooccurrence_strategy.CooccurrenceStrategy',
+    'ensemble': 'recommendation.strategies.ensemble_strategy.EnsembleStrategy',
+}
+
+
+class StrategyRegistry:
+    """Registro de estratégias de recomendação como singletons.
+    
+    As estratégias não guardam estado por usuário, então uma única
+    instância de cada uma é compartilhada por todas as requisições do
+    processo. Cada estratégia é registrada pelo caminho da classe e só é
+    importada e instanciada no primeiro uso.
+    
+    Além das estratégias embutidas, o registro carrega extensões do
+    setting ``RECOMMENDATION_STRATEGIES`` (nome → caminho da classe) e do
+    grupo de entry points ``fitrecommend.strategies``.
+    """
+    
+    def __init__(
+        self,
+        strategies: Optional[Dict[str, str]] = None,
+        entry_point_group: Optional[str] = ENTRY_POINT_GROUP
+    ):
+        self._definicoes: Dict[str, Union[str, type, RecommendationStrategy]] = dict(
+            strategies or {}
+        )
+        self._instancias: Dict[str, RecommendationStrategy] = {}
+        self._cacheadas: Dict[str, CachedRecommendationStrategy] = {}
+        self._instrumentadas: Dict[tuple, InstrumentedStrategy] = {}
+        self._entry_point_group = entry_point_group
+        self._extensoes_carregadas = False
+        self._lock = threading.RLock()
+    
+    def register(self, name: str, strategy: Union[str, type, RecommendationStrategy]) -> None:
+        """Registra ou substitui uma estratégia.
+        
+        Args:
+            name: Nome usado para buscar a estratégia.
+            strategy: Caminho da classe, classe ou instância da estratégia.
+        """
+        with self._lock:
+            self._definicoes[name] = strategy
+            self._instancias.pop(name, None)
+            self._cacheadas.pop(name, None)
+            self._instrumentadas.pop((name, False), None)
+            self._instrumentadas.pop((name, True), None)
+    
+    def get(self, name: str) -> RecommendationStrategy:
+        """Retorna a instância única de uma estratégia.
+        
+        Com a instrumentação habilitada, a instância é envolvida em um
+        ``InstrumentedStrategy``.
+        
+        Args:
+            name: Nome da estratégia.
+            
+        Returns:
+            Instância compartilhada da estratégia.
+            
+        Raises:
+            KeyError: Se a estratégia não estiver registrada.
+        """
+        strategy = self._instancia(name)
+        if metrics_enabled():
+            return self._instrumentar(name, strategy, cached=False)
+        return strategy
+    
+    def get_cached(self, name: str) -> RecommendationStrategy:
+        """Retorna a estratégia envolvida no cache de recomendações por coorte.
+        
+        Args:
+            name: Nome da estratégia.
+            
+        Returns:
+            Instância compartilhada da estratégia com cache.
+        """
+        try:
+            strategy = self._cacheadas[name]
+        except KeyError:
+            instancia = self._instancia(name)
+            with self._lock:
+                strategy = self._cacheadas.setdefault(
+                    name, CachedRecommendationStrategy(instancia)
+                )
+        
+        if metrics_enabled():
+            return self._instrumentar(name, strategy, cached=True)
+        return strategy
+    
+    def names(self) -> List[str]:
+        """Retorna os nomes das estratégias registradas."""
+        with self._lock:
+            self._carregar_extensoes()
+            return list(self._definicoes)
+    
+    def warm_up(self, all_workouts, names: Optional[Iterable[str]] = None) -> List[str]:
+        """Executa o warm-up das estratégias sobre o catálogo.
+        
+        Args:
+            all_workouts: Snapshot do catálogo de treinos.
+            names: Estratégias a aquecer, ou None para todas as registradas.
+            
+        Returns:
+            Nomes das estratégias aquecidas.
+        """
+        names = list(names) if names is not None else self.names()
+        for name in names:
+            self._instancia(name).warm_up(all_workouts)
+        return names
+    
+    def _instancia(self, name: str) -> RecommendationStrategy:
+        try:
+            return self._instancias[name]
+        except KeyError:
+            pass
+        
+        with self._lock:
+            self._carregar_extensoes()
+            if name not in self._instancias:
+                self._instancias[name] = self._instanciar(self._definicoes[name])
+            return self._instancias[name]
+    
+    def _instrumentar(
+        self,
+        name: str,
+        strategy: RecommendationStrategy,
+        cached: bool
+    ) -> InstrumentedStrategy:
+        try:
+            return self._instrumentadas[(name, cached)]
+        except KeyError:
+            pass
+        
+        label = f'{strategy.name} (cache)' if cached else strategy.name
+        with self._lock:
+            return self._instrumentadas.setdefault(
+                (name, cached), InstrumentedStrategy(strategy, label=label)
+            )
+    
+    def _instanciar(self, definicao) -> RecommendationStrategy:
+        if isinstance(definicao, str):
+            definicao = import_string(definicao)
+        elif isinstance(definicao, EntryPoint):
+            definicao = definicao.load()
+        if isinstance(definicao, type):
+            definicao = definicao()
+        return definicao
+    
+    def _carregar_extensoes(self) -> None:
+        """Carrega as estratégias do setting e dos entry points uma única vez."""
+        if self._extensoes_carregadas:
+            return
+        self._extensoes_carregadas = True
+        
+        if self._entry_point_group:
+            for entry_point in entry_points(group=self._entry_point_group):
+                self._definicoes.setdefault(entry_point.name, entry_point)
+        
+        for name, path in getattr(settings, 'RECOMMENDATION_STRATEGIES', {}).items():
+            self._definicoes[name] = path
+
+
+strategy_registry = StrategyRegistry(BUILTIN_STRATEGIES)
+
+
+def warm_up_strategies() -> List[str]:
+    """Aquece todas as estratégias registradas com o catálogo atual.
+    
+    Chamado no início de cada worker (WSGI/ASGI e pool de pré-cálculo).
+    Se o banco ainda não estiver disponível (por exemplo, antes das
+    migrações), o warm-up é ignorado e as estruturas são construídas na
+    primeira requisição.
+    
+    Returns:
+        Nomes das estratégias aquecidas.
+    """
+    try:
+        catalog = get_catalog()
+    except (OperationalError, ProgrammingError):
+        logger.warning("Banco indisponível; warm-up das estratégias ignorado")
+        return []
+    
+    return strategy_registry.warm_up(catalog)
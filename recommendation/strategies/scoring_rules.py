@@ -0,0 +1,170 @@
+from copy import deepcopy
+from typing import Any, Callable, Dict, Optional, Tuple
+from django.conf import settings
+
+
+INTENSIDADES = ('baixa', 'media', 'alta')
+NIVEIS = ('iniciante', 'intermediario', 'avancado')
+OBJETIVOS = ('emagrecer', 'ganhar_massa', 'manter')
+
+INTENSIDADE_CODES = {intensidade: i for i, intensidade in enumerate(INTENSIDADES)}
+NIVEL_CODES = {nivel: i for i, nivel in enumerate(NIVEIS)}
+OBJETIVO_CODES = {objetivo: i for i, objetivo in enumerate(OBJETIVOS)}
+
+INTENSIDADE_DESCONHECIDA = len(INTENSIDADES)
+NIVEL_PADRAO = 'avancado'
+
+DURACAO_CURTA = 30
+DURACAO_LONGA = 45
+FREQUENCIA_ALTA = 5
+FREQUENCIA_BAIXA = 3
+
+PESOS_PADRAO = {
+    'nivel_intensidade': {
+        'iniciante': {'baixa': 3.0, 'media': 1.5},
+        'intermediario': {'baixa': 1.5, 'media': 3.0, 'alta': 1.5},
+        'avancado': {'media': 1.5, 'alta': 3.0},
+    },
+    'objetivo_intensidade': {
+        'ganhar_massa': {'alta': 2.0},
+    },
+    'divisor_calorias': {
+        'emagrecer': 100,
+    },
+    'bonus_duracao': 1.0,
+}
+
+
+class ScoringRules:
+    """Regras de pontuação da HybridStrategy compiladas em tabelas.
+    
+    Os bônus de nível × intensidade e de objetivo × intensidade são somados
+    uma única vez em uma tabela indexada pelos códigos inteiros de nível,
+    objetivo e intensidade. Pontuar um treino passa a ser uma consulta à
+    linha do usuário, mais o termo calórico e o bônus de duração. A soma é
+    feita na mesma ordem da regra original, preservando os mesmos valores
+    em ponto flutuante.
+    
+    Nível desconhecido é tratado como avançado e intensidade desconhecida
+    não recebe bônus.
+    """
+    
+    def __init__(self, pesos: Optional[Dict[str, Any]] = None):
+        self.pesos = self._mesclar(PESOS_PADRAO, pesos or {})
+        self.tabela = self._compilar_tabela()
+        self.divisores = tuple(
+            self.pesos['divisor_calorias'].get(objetivo) for objetivo in OBJETIVOS
+        )
+        self.bonus_duracao = self.pesos['bonus_duracao']
+    
+    @classmethod
+    def from_settings(cls) -> 'ScoringRules':
+        """Compila as regras com os pesos do setting ``RECOMMENDATION_SCORING_WEIGHTS``."""
+        return cls(getattr(settings, 'RECOMMENDATION_SCORING_WEIGHTS', None))
+    
+    def intensity_row(self, nivel: str, objetivo: str) -> Tuple[float, ...]:
+        """Retorna a linha da tabela para um nível e um objetivo.
+        
+        Args:
+            nivel: Nível do usuário.
+            objetivo: Objetivo do usuário.
+            
+        Returns:
+            Bônus por código de intensidade; a última posição corresponde a
+            intensidades desconhecidas.
+        """
+        codigo_nivel = NIVEL_CODES.get(nivel, NIVEL_CODES[NIVEL_PADRAO])
+        codigo_objetivo = OBJETIVO_CODES.get(objetivo)
+        if codigo_objetivo is None:
+            return self.tabela[codigo_nivel][len(OBJETIVOS)]
+        return self.tabela[codigo_nivel][codigo_objetivo]
+    
+    def calorie_divisor(self, objetivo: str) -> Optional[float]:
+        """Retorna o divisor do termo calórico do objetivo, ou None se não houver."""
+        codigo = OBJETIVO_CODES.get(objetivo)
+        return None if codigo is None else self.divisores[codigo]
+    
+    def duration_rule(self, user) -> Tuple[Optional[int], Optional[int]]:
+        """Retorna os limites de duração que recebem bônus para o usuário.
+        
+        Args:
+            user: Usuário com preferências opcionais.
+            
+        Returns:
+            Tupla (duração máxima, duração mínima); no máximo um dos
+            limites é definido, conforme a frequência semanal.
+        """
+        if not hasattr(user, 'preferencias'):
+            return None, None
+        
+        frequencia = user.preferencias.frequencia_treino_semana
+        if frequencia >= FREQUENCIA_ALTA:
+            return DURACAO_CURTA, None
+        if frequencia <= FREQUENCIA_BAIXA:
+            return None, DURACAO_LONGA
+        return None, None
+    
+    def scorer(self, user) -> Callable[[Any], float]:
+        """Cria a função de pontuação de treinos para um usuário.
+        
+        Args:
+            user: Usuário com perfil e preferências.
+            
+        Returns:
+            Função que recebe um treino e retorna seu score.
+        """
+        linha = self.intensity_row(user.nivel, user.objetivo)
+        divisor = self.calorie_divisor(user.objetivo)
+        duracao_maxima, duracao_minima = self.duration_rule(user)
+        bonus_duracao = self.bonus_duracao
+        codigos = INTENSIDADE_CODES
+        desconhecida = INTENSIDADE_DESCONHECIDA
+        
+        def pontuar(workout) -> float:
+            score = linha[codigos.get(workout.intensidade, desconhecida)]
+            if divisor:
+                score += workout.calorias_estimadas / divisor
+            if duracao_maxima is not None and workout.duracao_minutos <= duracao_maxima:
+                score += bonus_duracao
+            elif duracao_minima is not None and workout.duracao_minutos >= duracao_minima:
+                score += bonus_duracao
+            return score
+        
+        return pontuar
+    
+    def _compilar_tabela(self) -> Tuple[Tuple[Tuple[float, ...], ...], ...]:
+        """Soma os bônus de nível e de objetivo por intensidade.
+        
+        Returns:
+            Tabela [nível][objetivo][intensidade], com uma coluna extra de
+            objetivo (sem bônus) e uma de intensidade (desconhecida).
+        """
+        nivel_intensidade = self.pesos['nivel_intensidade']
+        objetivo_intensidade = self.pesos['objetivo_intensidade']
+        
+        tabela = []
+        for nivel in NIVEIS:
+            bonus_nivel = nivel_intensidade.get(nivel, {})
+            linhas = []
+            for objetivo in OBJETIVOS + (None,):
+                bonus_objetivo = objetivo_intensidade.get(objetivo, {})
+                linha = []
+                for intensidade in INTENSIDADES:
+                    score = 0.0
+                    score += bonus_nivel.get(intensidade, 0.0)
+                    score += bonus_objetivo.get(intensidade, 0.0)
+                    linha.append(score)
+                linha.append(0.0)
+                linhas.append(tuple(linha))
+            tabela.append(tuple(linhas))
+        return tuple(tabela)
+    
+    def _mesclar(self, base: Dict[str, Any], extra: Dict[str, Any]) -> Dict[str, Any]:
+        """Mescla recursivamente os pesos configurados sobre os padrões."""
+        pesos = deepcopy(base)
+        for chave, valor in extra.items():
+            if isinstance(valor, dict) and isinstance(pesos.get(chave), dict):
+                pesos[chave] = self._mesclar(pesos[chave], valor)
+            else:
+                pesos[chave] = valor
+        return pesos
@@ -1,8 +1,5 @@
 from .base import RecommendationStrategy
-from .calorie_based_strategy import CalorieBasedStrategy
-from .goal_based_strategy import GoalBasedStrategy
-from .beginner_friendly_strategy import BeginnerFriendlyStrategy
-from .hybrid_strategy import HybridStrategy
+from .registry import strategy_registry
 
 
 class RecommendationStrategyFactory:
@@ -10,54 +7,60 @@ class RecommendationStrategyFactory:
     
     Implementa lógica de decisão baseada nas características do usuário,
     selecionando automaticamente a melhor estratégia para cada perfil.
+    As estratégias são obtidas do registro como instâncias únicas.
     """
     
     @staticmethod
-    def get_strategy_for_user(user) -> RecommendationStrategy:
+    def get_strategy_for_user(
+        user, 
+        vectorized: bool = False, 
+        cached: bool = False
+    ) -> RecommendationStrategy:
         """Seleciona estratégia apropriada baseada no perfil do usuário.
         
         Regras de seleção:
         - Usuário iniciante → BeginnerFriendlyStrategy
         - Objetivo emagrecimento → GoalBasedStrategy
-        - Caso geral → HybridStrategy
+        - Caso geral → HybridStrategy (ou VectorizedHybridStrategy)
         
         Args:
             user: Usuário com perfil e características.
+            vectorized: Usa a pontuação vetorizada no caso geral.
+            cached: Envolve a estratégia no cache de recomendações por coorte.
             
         Returns:
-            Instância da estratégia selecionada.
+            Instância compartilhada da estratégia selecionada.
         """
         if user.nivel == 'iniciante':
-            return BeginnerFriendlyStrategy()
+            name = 'beginner'
+        elif user.objetivo == 'emagrecer':
+            name = 'goal'
+        elif vectorized:
+            name = 'hybrid_vectorized'
+        else:
+            name = 'hybrid'
         
-        if user.objetivo == 'emagrecer':
-            return GoalBasedStrategy()
+        if cached:
+            return strategy_registry.get_cached(name)
         
-        return HybridStrategy()
+        return strategy_registry.get(name)
     
     @staticmethod
     def get_strategy_by_name(strategy_name: str) -> RecommendationStrategy:
         """Retorna uma estratégia específica pelo nome.
         
         Args:
-            strategy_name: Nome da estratégia (calorie, goal, beginner, hybrid).
+            strategy_name: Nome da estratégia (calorie, goal, beginner, hybrid,
+                hybrid_vectorized, cooccurrence, ensemble ou extensões
+                registradas).
             
         Returns:
-            Instância da estratégia solicitada.
+            Instância compartilhada da estratégia solicitada.
             
         Raises:
             ValueError: Se o nome da estratégia for inválido.
         """
-        strategies = {
-            'calorie': CalorieBasedStrategy(),
-            'goal': GoalBasedStrategy(),
-            'beginner': BeginnerFriendlyStrategy(),
-            'hybrid': HybridStrategy(),
-        }
-        
-        strategy = strategies.get(strategy_name.lower())
-        if not strategy:
+        try:
+            return strategy_registry.get(strategy_name.lower())
+        except KeyError:
             raise ValueError(f"Estratégia '{strategy_name}' não encontrada")
-        
-        return strategy
-
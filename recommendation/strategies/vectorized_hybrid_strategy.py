@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from typing import List
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .base import MAX_RECOMENDACOES, RecommendationResult, catalog_structure
+from .hybrid_strategy import HybridStrategy
+from .scoring_rules import INTENSIDADE_CODES
+
+
+@dataclass
+class WorkoutColumns:
+    """Representação colunar do catálogo de treinos.
+    
+    Attributes:
+        workouts: Treinos na ordem original do catálogo.
+        intensidade: Código inteiro da intensidade (0 baixa, 1 média, 2 alta).
+        duracao: Duração de cada treino em minutos.
+        calorias: Calorias estimadas de cada treino.
+    """
+    workouts: List[any]
+    intensidade: any
+    duracao: any
+    calorias: any
+    
+    @classmethod
+    def from_workouts(cls, workouts: List) -> 'WorkoutColumns':
+        """Converte uma lista de treinos em arrays NumPy.
+        
+        Args:
+            workouts: Lista de treinos disponíveis.
+            
+        Returns:
+            Colunas do catálogo prontas para pontuação vetorizada.
+        """
+        return cls(
+            workouts=workouts,
+            intensidade=np.fromiter(
+                (INTENSIDADE_CODES.get(w.intensidade, -1) for w in workouts),
+                dtype=np.int8,
+                count=len(workouts)
+            ),
+            duracao=np.fromiter(
+                (w.duracao_minutos for w in workouts),
+                dtype=np.int64,
+                count=len(workouts)
+            ),
+            calorias=np.fromiter(
+                (w.calorias_estimadas for w in workouts),
+                dtype=np.int64,
+                count=len(workouts)
+            ),
+        )
+
+
+def top_k_indices(scores, k: int):
+    """Retorna os índices dos k maiores scores sem ordenar o array inteiro.
+    
+    Usa ``argpartition`` para isolar os candidatos em O(n) e ordena apenas
+    esses k elementos. Empates são resolvidos pela posição no catálogo,
+    como em uma ordenação estável decrescente.
+    
+    Args:
+        scores: Array de scores na ordem do catálogo.
+        k: Quantidade máxima de índices a retornar.
+        
+    Returns:
+        Array com até k índices, do maior para o menor score.
+    """
+    n = len(scores)
+    if k >= n:
+        return np.argsort(-scores, kind='stable')
+    
+    limiar = scores[np.argpartition(scores, n - k)[n - k]]
+    acima = np.flatnonzero(scores > limiar)
+    empates = np.flatnonzero(scores == limiar)[:k - len(acima)]
+    candidatos = np.sort(np.concatenate([acima, empates]))
+    
+    return candidatos[np.argsort(-scores[candidatos], kind='stable')]
+
+
+class VectorizedHybridStrategy(HybridStrategy):
+    """Versão vetorizada da HybridStrategy.
+    
+    Converte o catálogo em colunas NumPy e calcula o score de todos os
+    treinos com poucas operações de array, produzindo o mesmo ranking
+    do cálculo treino a treino. Sem NumPy instalado, recorre à
+    implementação original.
+    """
+    
+    def recommend(self, user, all_workouts: List) -> RecommendationResult:
+        """Gera recomendações usando pontuação vetorizada.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Resultado contendo até 3 treinos recomendados e justificativa
+            explicando os fatores considerados.
+        """
+        if np is None or not all_workouts:
+            return super().recommend(user, all_workouts)
+        
+        colunas = catalog_structure(all_workouts, 'workout_columns', WorkoutColumns.from_workouts)
+        return self._recomendar_com_colunas(user, colunas)
+    
+    def recommend_many(self, users: List, all_workouts: List) -> List[RecommendationResult]:
+        """Gera recomendações em lote convertendo o catálogo uma única vez.
+        
+        Args:
+            users: Usuários para os quais gerar recomendações.
+            all_workouts: Lista de todos os treinos disponíveis.
+            
+        Returns:
+            Lista de resultados na mesma ordem de ``users``.
+        """
+        if np is None or not all_workouts:
+            return super().recommend_many(users, all_workouts)
+        
+        colunas = catalog_structure(all_workouts, 'workout_columns', WorkoutColumns.from_workouts)
+        return self._recomendar_por_coorte(
+            users,
+            lambda user: self._recomendar_com_colunas(user, colunas)
+        )
+    
+    def warm_up(self, all_workouts: List) -> None:
+        """Converte o catálogo para o formato colunar."""
+        if np is not None and all_workouts:
+            catalog_structure(all_workouts, 'workout_columns', WorkoutColumns.from_workouts)
+    
+    def _recomendar_com_colunas(self, user, colunas: WorkoutColumns) -> RecommendationResult:
+        """Gera a recomendação de um usuário a partir do catálogo colunar.
+        
+        Args:
+            user: Usuário para o qual gerar recomendações.
+            colunas: Catálogo em formato colunar.
+            
+        Returns:
+            Resultado contendo até 3 treinos recomendados e justificativa.
+        """
+        scores = self._calcular_scores(colunas, user)
+        
+        indices = top_k_indices(scores, MAX_RECOMENDACOES)
+        workouts_recomendados = [colunas.workouts[i] for i in indices]
+        
+        return RecommendationResult(
+            workouts=workouts_recomendados,
+            reasoning=self._gerar_justificativa(user)
+        )
+    
+    def _calcular_scores(self, colunas: WorkoutColumns, user):
+        """Calcula o score de todos os treinos do catálogo de uma vez.
+        
+        Os termos são somados na mesma ordem do cálculo escalar, garantindo
+        resultados idênticos em ponto flutuante.
+        
+        Args:
+            colunas: Catálogo em formato colunar.
+            user: Usuário com perfil e preferências.
+            
+        Returns:
+            Array com o score de cada treino, na ordem do catálogo.
+        """
+        linha = np.array(self.regras.intensity_row(user.nivel, user.objetivo), dtype=np.float64)
+        scores = linha[colunas.intensidade]
+        
+        divisor = self.regras.calorie_divisor(user.objetivo)
+        if divisor:
+            scores = scores + colunas.calorias / divisor
+        
+        duracao_maxima, duracao_minima = self.regras.duration_rule(user)
+        bonus = self.regras.bonus_duracao
+        if duracao_maxima is not None:
+            scores = scores + np.where(colunas.duracao <= duracao_maxima, bonus, 0.0)
+        elif duracao_minima is not None:
+            scores = scores + np.where(colunas.duracao >= duracao_minima, bonus, 0.0)
+        
+        return scores
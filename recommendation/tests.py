@@ -1,13 +1,84 @@
-from django.test import TestCase
+import os
+import random
+import subprocess
+import sys
+import time
+from io import StringIO
+import threading
+from unittest import mock, skipIf
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User as AuthUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from datetime import date
 from decimal import Decimal
-from .models import User, Workout
-from .repositories import UserRepository
+from .models import (
+    User,
+    Workout,
+    Preferences,
+    History,
+    MonthlyHistoryRollup,
+    PrecomputedRecommendation,
+    ShadowEvaluation,
+    UserStats,
+    WeeklyHistoryRollup,
+    WorkoutCooccurrence
+)
+from .catalog import CATALOG_VERSION_CACHE_KEY, get_catalog, bump_catalog_version
+from .repositories.identity_map import identity_map_scope
+from .metrics import (
+    METRICS_FIRST_PROCESS_CACHE_KEY,
+    Histogram,
+    StrategyMetrics,
+    strategy_metrics,
+    summarize
+)
+from .shadow import BoundedExecutor, ShadowEvaluator, shadow_evaluator
+from .metabolic_profile import (
+    MetabolicProfileService,
+    calcular_meta_calorica,
+    calcular_tmb,
+    metabolic_profiles
+)
+from .repositories import (
+    CachedUserRepository,
+    CachedWorkoutRepository,
+    CooccurrenceRepository,
+    HistoryRepository,
+    HistoryRollupRepository,
+    HistoryStats,
+    PrecomputedRecommendationRepository,
+    SeriesPoint,
+    UserRepository,
+    UserStatsRepository,
+    WorkoutRepository,
+    get_user_repository,
+    get_workout_repository
+)
 from .strategies import (
     GoalBasedStrategy,
     BeginnerFriendlyStrategy,
     CalorieBasedStrategy,
-    HybridStrategy
+    HybridStrategy,
+    VectorizedHybridStrategy,
+    RecommendationCache,
+    CachedRecommendationStrategy,
+    CooccurrenceStrategy,
+    EnsembleStrategy,
+    RecommendationStrategyFactory,
+    StrategyRegistry
 )
+from .strategies.base import RecommendationResult, RecommendationStrategy, top_k
+from .strategies.catalog_index import CatalogIndex
+from .strategies.scoring_rules import ScoringRules
+from .strategies.registry import BUILTIN_STRATEGIES
+from .strategies.vectorized_hybrid_strategy import WorkoutColumns, np, top_k_indices
 from .adapters import WgerWorkoutAdapter
 
 
@@ -258,7 +329,7 @@ class CalorieBasedStrategyTest(TestCase):
         
         Verifica se TMB é calculada corretamente e está em faixa razoável.
         """
-        tmb = self.strategy._calcular_tmb(self.user)
+        tmb = metabolic_profiles.get_profile(self.user).tmb
         
         assert tmb > 0
         assert tmb > 1500
@@ -272,9 +343,9 @@ class CalorieBasedStrategyTest(TestCase):
         """
         tmb = 2000
         
-        meta_emagrecer = self.strategy._calcular_meta_calorica(tmb, 'emagrecer')
-        meta_ganhar = self.strategy._calcular_meta_calorica(tmb, 'ganhar_massa')
-        meta_manter = self.strategy._calcular_meta_calorica(tmb, 'manter')
+        meta_emagrecer = calcular_meta_calorica(tmb, 'emagrecer')
+        meta_ganhar = calcular_meta_calorica(tmb, 'ganhar_massa')
+        meta_manter = calcular_meta_calorica(tmb, 'manter')
         
         assert meta_emagrecer < tmb
         assert meta_ganhar > tmb
@@ -342,3 +413,2231 @@ class HybridStrategyTest(TestCase):
         
         assert 'híbrida' in result.reasoning.lower() or 'hybrid' in result.reasoning.lower()
         assert len(result.workouts) > 0
+    
+    def test_vectorized_strategy_falls_back_without_numpy(self):
+        """Testa se a estratégia vetorizada recorre ao cálculo original sem NumPy.
+        
+        Verifica se recomendações individuais e em lote são as mesmas da
+        HybridStrategy quando o NumPy não está disponível.
+        """
+        outro = Workout.objects.create(
+            nome='Caminhada',
+            descricao='Leve',
+            intensidade='baixa',
+            duracao_minutos=30,
+            calorias_estimadas=150
+        )
+        workouts = [self.workout, outro]
+        esperado = self.strategy.recommend(self.user, workouts)
+        
+        with mock.patch('recommendation.strategies.vectorized_hybrid_strategy.np', None):
+            resultado = VectorizedHybridStrategy().recommend(self.user, workouts)
+            em_lote = VectorizedHybridStrategy().recommend_many([self.user], workouts)
+        
+        assert [w.id for w in resultado.workouts] == [w.id for w in esperado.workouts]
+        assert resultado.reasoning == esperado.reasoning
+        assert [w.id for w in em_lote[0].workouts] == [w.id for w in esperado.workouts]
+
+
+@skipIf(np is None, 'NumPy não instalado')
+class VectorizedHybridStrategyTest(TestCase):
+    """Testes para VectorizedHybridStrategy.
+    
+    Valida paridade de scores e ranking com a HybridStrategy original.
+    """
+    
+    def setUp(self):
+        self.scalar = HybridStrategy()
+        self.vectorized = VectorizedHybridStrategy()
+        
+        intensidades = ['baixa', 'media', 'alta']
+        self.workouts = [
+            Workout(
+                id=i + 1,
+                nome=f'Treino {i}',
+                descricao='Sintético',
+                intensidade=intensidades[i % 3],
+                duracao_minutos=15 + (i * 7) % 50,
+                calorias_estimadas=100 + (i * 37) % 450
+            )
+            for i in range(120)
+        ]
+        
+        self.users = []
+        combinacoes = [
+            (nivel, objetivo, frequencia)
+            for nivel in ['iniciante', 'intermediario', 'avancado']
+            for objetivo in ['emagrecer', 'ganhar_massa', 'manter']
+            for frequencia in [None, 2, 4, 6]
+        ]
+        for i, (nivel, objetivo, frequencia) in enumerate(combinacoes):
+            user = User.objects.create(
+                nome=f'User {i}',
+                email=f'vector{i}@test.com',
+                idade=30,
+                peso=Decimal('70.0'),
+                altura=175,
+                objetivo=objetivo,
+                nivel=nivel
+            )
+            if frequencia is not None:
+                Preferences.objects.create(
+                    usuario=user,
+                    frequencia_treino_semana=frequencia,
+                    tipo_treino_preferido='cardio'
+                )
+            self.users.append(User.objects.get(id=user.id))
+    
+    def test_scores_match_scalar_implementation(self):
+        """Testa paridade exata dos scores vetorizados.
+        
+        Verifica se cada score é idêntico ao calculado treino a treino.
+        """
+        from .strategies.vectorized_hybrid_strategy import WorkoutColumns
+        colunas = WorkoutColumns.from_workouts(self.workouts)
+        
+        for user in self.users:
+            scores = self.vectorized._calcular_scores(colunas, user)
+            esperado = [self.scalar._calcular_score_workout(w, user) for w in self.workouts]
+            assert scores.tolist() == esperado
+    
+    def test_rankings_match_scalar_implementation(self):
+        """Testa paridade do ranking final.
+        
+        Verifica se os treinos recomendados e a justificativa são os mesmos
+        da implementação original, incluindo desempates.
+        """
+        for user in self.users:
+            esperado = self.scalar.recommend(user, self.workouts)
+            resultado = self.vectorized.recommend(user, self.workouts)
+            
+            assert [w.id for w in resultado.workouts] == [w.id for w in esperado.workouts]
+            assert resultado.reasoning == esperado.reasoning
+    
+    def test_factory_selects_vectorized_strategy(self):
+        """Testa seleção da estratégia vetorizada pela factory."""
+        user = self.users[-1]
+        
+        strategy = RecommendationStrategyFactory.get_strategy_for_user(user, vectorized=True)
+        
+        assert isinstance(strategy, VectorizedHybridStrategy)
+        assert isinstance(
+            RecommendationStrategyFactory.get_strategy_by_name('hybrid_vectorized'),
+            VectorizedHybridStrategy
+        )
+
+
+class TopKSelectionTest(TestCase):
+    """Testes para a seleção parcial top-k compartilhada pelas estratégias.
+    
+    Valida equivalência com ordenação completa, inclusive em empates.
+    """
+    
+    def setUp(self):
+        self.valores = [(i, (i * 7) % 5) for i in range(40)]
+    
+    def test_top_k_matches_sorted_slice(self):
+        """Testa se top_k equivale a sorted()[:k] com desempate estável."""
+        for k in [0, 1, 3, 10, 50]:
+            for reverse in [False, True]:
+                esperado = sorted(self.valores, key=lambda v: v[1], reverse=reverse)[:k]
+                resultado = top_k(iter(self.valores), k, key=lambda v: v[1], reverse=reverse)
+                assert resultado == esperado
+    
+    @skipIf(np is None, 'NumPy não instalado')
+    def test_top_k_indices_matches_stable_argsort(self):
+        """Testa se top_k_indices equivale a um argsort estável decrescente."""
+        scores = np.array([v for _, v in self.valores], dtype=np.float64)
+        
+        for k in [1, 3, 10, 50]:
+            esperado = np.argsort(-scores, kind='stable')[:k].tolist()
+            assert top_k_indices(scores, k).tolist() == esperado
+    
+    def test_goal_strategy_muscle_gain_prioritizes_high_intensity(self):
+        """Testa se o ramo ganhar_massa prioriza treinos de alta intensidade."""
+        user = User(nome='Massa', objetivo='ganhar_massa', nivel='avancado')
+        workouts = [
+            Workout(id=1, nome='A', intensidade='media', duracao_minutos=40, calorias_estimadas=300),
+            Workout(id=2, nome='B', intensidade='alta', duracao_minutos=50, calorias_estimadas=400),
+            Workout(id=3, nome='C', intensidade='media', duracao_minutos=35, calorias_estimadas=280),
+            Workout(id=4, nome='D', intensidade='alta', duracao_minutos=20, calorias_estimadas=250),
+            Workout(id=5, nome='E', intensidade='alta', duracao_minutos=60, calorias_estimadas=500),
+        ]
+        
+        result = GoalBasedStrategy().recommend(user, workouts)
+        
+        assert [w.id for w in result.workouts] == [2, 5, 1]
+
+
+class CachedRecommendationStrategyTest(TestCase):
+    """Testes para o cache de recomendações por coorte.
+    
+    Valida reutilização entre usuários da mesma coorte, eviction LRU e
+    invalidação automática quando o catálogo muda.
+    """
+    
+    def setUp(self):
+        self.cache = RecommendationCache(max_size=2)
+        self.strategy = CachedRecommendationStrategy(GoalBasedStrategy(), self.cache)
+        
+        self.workouts = [
+            Workout.objects.create(
+                nome='HIIT',
+                descricao='Alta intensidade',
+                intensidade='alta',
+                duracao_minutos=30,
+                calorias_estimadas=400
+            ),
+            Workout.objects.create(
+                nome='Corrida',
+                descricao='Média intensidade',
+                intensidade='media',
+                duracao_minutos=40,
+                calorias_estimadas=350
+            ),
+        ]
+        
+        self.users = [
+            User(nome=f'User {i}', objetivo='emagrecer', nivel='intermediario', peso=Decimal(60 + i))
+            for i in range(3)
+        ]
+    
+    def test_same_cohort_reuses_result(self):
+        """Testa se usuários da mesma coorte compartilham um único cálculo."""
+        catalog = get_catalog()
+        resultados = [self.strategy.recommend(u, catalog) for u in self.users]
+        
+        assert self.cache.misses == 1
+        assert self.cache.hits == 2
+        assert all(
+            [w.id for w in r.workouts] == [w.id for w in resultados[0].workouts]
+            for r in resultados
+        )
+    
+    def test_lru_eviction(self):
+        """Testa se a entrada menos usada é descartada ao exceder o limite."""
+        catalog = get_catalog()
+        for objetivo in ['emagrecer', 'ganhar_massa', 'manter']:
+            user = User(nome=objetivo, objetivo=objetivo, nivel='avancado')
+            self.strategy.recommend(user, catalog)
+        
+        assert len(self.cache) == 2
+        self.strategy.recommend(User(objetivo='emagrecer'), catalog)
+        assert self.cache.misses == 4
+    
+    def test_workout_change_invalidates_cache(self):
+        """Testa se alterar um treino força novo cálculo da coorte."""
+        self.strategy.recommend(self.users[0], get_catalog())
+        
+        self.workouts[1].calorias_estimadas = 600
+        self.workouts[1].save()
+        result = self.strategy.recommend(self.users[1], get_catalog())
+        
+        assert self.cache.misses == 2
+        assert result.workouts[0].id == self.workouts[1].id
+    
+    def test_strategies_with_different_weights_do_not_share_results(self):
+        """Testa se instâncias da mesma estratégia com pesos diferentes não compartilham resultado."""
+        catalog = get_catalog()
+        padrao = CachedRecommendationStrategy(HybridStrategy(), self.cache)
+        calorica = CachedRecommendationStrategy(
+            HybridStrategy(pesos={'divisor_calorias': {'emagrecer': 10}}),
+            self.cache
+        )
+        
+        primeiro = padrao.recommend(self.users[0], catalog)
+        segundo = calorica.recommend(self.users[0], catalog)
+        
+        assert self.cache.misses == 2
+        assert primeiro.workouts[0].id == self.workouts[1].id
+        assert segundo.workouts[0].id == self.workouts[0].id
+    
+    def test_plain_lists_bypass_cache(self):
+        """Testa se listas que não são o snapshot do catálogo são sempre calculadas."""
+        result = self.strategy.recommend(self.users[0], self.workouts)
+        esperado = GoalBasedStrategy().recommend(self.users[0], self.workouts)
+        
+        assert len(self.cache) == 0
+        assert [w.id for w in result.workouts] == [w.id for w in esperado.workouts]
+    
+    def test_individual_strategy_bypasses_cache(self):
+        """Testa se estratégias sem assinatura de coorte não usam o cache."""
+        strategy = CachedRecommendationStrategy(CalorieBasedStrategy(), self.cache)
+        user = User(nome='Cal', objetivo='manter', nivel='avancado', idade=30, peso=Decimal('80'), altura=180)
+        
+        strategy.recommend(user, get_catalog())
+        
+        assert len(self.cache) == 0
+
+
+class RecommendManyTest(TestCase):
+    """Testes para a API em lote recommend_many.
+    
+    Valida que cada estratégia produz, em lote, os mesmos resultados do
+    loop sobre recommend, preservando a ordem de entrada.
+    """
+    
+    def setUp(self):
+        intensidades = ['baixa', 'media', 'alta']
+        self.workouts = [
+            Workout(
+                id=i + 1,
+                nome=f'Treino {i}',
+                intensidade=intensidades[(i * 5) % 3],
+                duracao_minutos=15 + (i * 11) % 60,
+                calorias_estimadas=80 + (i * 53) % 500
+            )
+            for i in range(90)
+        ]
+        
+        self.users = []
+        for i in range(36):
+            user = User(
+                id=i + 1,
+                nome=f'Lote {i}',
+                idade=20 + i % 40,
+                peso=Decimal(55 + (i * 3) % 50),
+                altura=155 + (i * 7) % 45,
+                objetivo=['emagrecer', 'ganhar_massa', 'manter'][i % 3],
+                nivel=['iniciante', 'intermediario', 'avancado'][(i // 3) % 3]
+            )
+            if i % 4:
+                user.preferencias = Preferences(
+                    frequencia_treino_semana=1 + i % 7,
+                    tipo_treino_preferido='cardio'
+                )
+            else:
+                User.preferencias.related.set_cached_value(user, None)
+            self.users.append(user)
+    
+    def test_batch_matches_individual_recommendations(self):
+        """Testa paridade entre recommend_many e chamadas individuais."""
+        for strategy in [
+            CalorieBasedStrategy(),
+            GoalBasedStrategy(),
+            BeginnerFriendlyStrategy(),
+            HybridStrategy(),
+            VectorizedHybridStrategy(),
+        ]:
+            resultados = strategy.recommend_many(self.users, self.workouts)
+            
+            assert len(resultados) == len(self.users)
+            for user, resultado in zip(self.users, resultados):
+                esperado = strategy.recommend(user, self.workouts)
+                assert [w.id for w in resultado.workouts] == [w.id for w in esperado.workouts]
+                assert resultado.reasoning == esperado.reasoning
+    
+    def test_batch_results_are_independent(self):
+        """Testa se resultados da mesma coorte não compartilham a lista."""
+        resultados = GoalBasedStrategy().recommend_many(
+            [self.users[0], self.users[3]],
+            self.workouts
+        )
+        
+        resultados[0].workouts.clear()
+        
+        assert resultados[1].workouts
+
+
+class PrecomputeRecommendationsCommandTest(TestCase):
+    """Testes para o comando precompute_recommendations.
+    
+    Valida gravação das recomendações, modo incremental e uso do
+    pré-cálculo pelo dashboard.
+    """
+    
+    def setUp(self):
+        for i, intensidade in enumerate(['baixa', 'media', 'alta', 'media']):
+            Workout.objects.create(
+                nome=f'Treino {i}',
+                descricao='Teste',
+                intensidade=intensidade,
+                duracao_minutos=25 + i * 10,
+                calorias_estimadas=200 + i * 80
+            )
+        
+        self.users = [
+            User.objects.create(
+                nome=f'Pre {i}',
+                email=f'pre{i}@test.com',
+                idade=30,
+                peso=Decimal('70.0'),
+                altura=175,
+                objetivo=objetivo,
+                nivel=nivel
+            )
+            for i, (nivel, objetivo) in enumerate([
+                ('iniciante', 'manter'),
+                ('intermediario', 'emagrecer'),
+                ('avancado', 'ganhar_massa'),
+            ])
+        ]
+    
+    def _run(self, *args):
+        out = StringIO()
+        call_command('precompute_recommendations', *args, stdout=out)
+        return out.getvalue()
+    
+    def test_precomputes_all_users(self):
+        """Testa se o comando grava a recomendação de cada usuário."""
+        self._run('--chunk-size', '2')
+        
+        assert PrecomputedRecommendation.objects.count() == len(self.users)
+        for user in self.users:
+            precomputed = PrecomputedRecommendation.objects.get(usuario=user)
+            strategy = RecommendationStrategyFactory.get_strategy_for_user(user)
+            esperado = strategy.recommend(user, list(Workout.objects.all()))
+            
+            assert precomputed.treinos_ids == [w.id for w in esperado.workouts]
+            assert precomputed.estrategia == type(strategy).__name__
+    
+    def test_incremental_only_refreshes_changed_users(self):
+        """Testa se o modo incremental recalcula apenas usuários alterados."""
+        self._run()
+        
+        self.users[0].nivel = 'avancado'
+        self.users[0].save()
+        History.objects.create(usuario=self.users[1], data='2024-01-10')
+        
+        output = self._run('--incremental')
+        
+        assert '2 recomendações' in output
+        assert PrecomputedRecommendation.objects.get(
+            usuario=self.users[0]
+        ).estrategia == 'HybridStrategy'
+    
+    def test_dashboard_serves_precomputed_recommendation(self):
+        """Testa se o dashboard usa a recomendação pré-calculada."""
+        self._run()
+        user = self.users[2]
+        precomputed = PrecomputedRecommendation.objects.get(usuario=user)
+        precomputed.justificativa = 'Justificativa pré-calculada'
+        precomputed.save()
+        
+        auth_user = AuthUser.objects.create_user('pre2', user.email, 'senha-segura')
+        self.client.force_login(auth_user)
+        response = self.client.get(reverse('recommendation:home'))
+        
+        assert response.context['reasoning'] == 'Justificativa pré-calculada'
+        assert [w.id for w in response.context['workouts']] == precomputed.treinos_ids
+
+
+class WorkoutCatalogTest(TestCase):
+    """Testes para o snapshot versionado do catálogo de treinos.
+    
+    Valida reutilização entre chamadas, reconstrução após alterações e
+    convergência pela versão compartilhada no cache do Django.
+    """
+    
+    def setUp(self):
+        self.workout = Workout.objects.create(
+            nome='Remo',
+            descricao='Média intensidade',
+            intensidade='media',
+            duracao_minutos=40,
+            calorias_estimadas=320
+        )
+    
+    def test_snapshot_is_reused_without_queries(self):
+        """Testa se o snapshot é reaproveitado enquanto a versão não muda."""
+        catalog = get_catalog()
+        
+        with self.assertNumQueries(0):
+            assert get_catalog() is catalog
+        assert [w.id for w in catalog] == [self.workout.id]
+    
+    def test_workout_change_rebuilds_snapshot(self):
+        """Testa se alterar um treino gera novo snapshot com versão maior."""
+        catalog = get_catalog()
+        
+        Workout.objects.create(
+            nome='Pilates',
+            descricao='Baixa intensidade',
+            intensidade='baixa',
+            duracao_minutos=30,
+            calorias_estimadas=150
+        )
+        novo = get_catalog()
+        
+        assert novo is not catalog
+        assert novo.version > catalog.version
+        assert len(novo) == 2
+    
+    def test_shared_version_bump_invalidates_other_processes(self):
+        """Testa se um incremento feito por outro processo é observado."""
+        catalog = get_catalog()
+        
+        cache.incr(CATALOG_VERSION_CACHE_KEY)
+        
+        assert get_catalog() is not catalog
+    
+    def test_derived_structures_are_memoized_per_version(self):
+        """Testa se estruturas derivadas são construídas uma vez por versão."""
+        chamadas = []
+        
+        def builder(workouts):
+            chamadas.append(len(workouts))
+            return len(workouts)
+        
+        catalog = get_catalog()
+        catalog.derive('contagem', builder)
+        catalog.derive('contagem', builder)
+        bump_catalog_version()
+        get_catalog().derive('contagem', builder)
+        
+        assert chamadas == [1, 1]
+
+
+class CatalogIndexTest(TestCase):
+    """Testes para os índices de atributos sobre o catálogo.
+    
+    Valida que as consultas pelo índice e as estratégias que o usam
+    produzem os mesmos resultados que a varredura linear ordenada.
+    """
+    
+    def setUp(self):
+        self.workouts = [
+            Workout(
+                id=i + 1,
+                nome=f'Treino {i + 1}',
+                intensidade=['baixa', 'media', 'alta'][(i * 7) % 3],
+                duracao_minutos=15 + (i * 11) % 60,
+                calorias_estimadas=100 + (i * 37) % 400
+            )
+            for i in range(120)
+        ]
+        self.index = CatalogIndex(self.workouts)
+    
+    def test_range_queries_match_linear_scan(self):
+        """Testa se as faixas equivalem a filtrar e ordenar de forma estável."""
+        for campo in ['calorias_estimadas', 'duracao_minutos']:
+            for minimo, maximo in [(None, None), (250, None), (None, 45), (30, 300)]:
+                for decrescente in [False, True]:
+                    esperado = sorted(
+                        (
+                            w for w in self.workouts
+                            if w.intensidade in ['media', 'alta']
+                            and (minimo is None or getattr(w, campo) >= minimo)
+                            and (maximo is None or getattr(w, campo) <= maximo)
+                        ),
+                        key=lambda w: getattr(w, campo),
+                        reverse=decrescente
+                    )
+                    posicoes = self.index.faixa(
+                        campo, ['media', 'alta'], minimo, maximo, decrescente
+                    )
+                    assert self.index.treinos(posicoes) == esperado
+    
+    def test_strategies_match_linear_scan(self):
+        """Testa se as estratégias indexadas mantêm a seleção original."""
+        media_alta = [w for w in self.workouts if w.intensidade in ['media', 'alta']]
+        esperado = {
+            'emagrecer': sorted(
+                (w for w in media_alta if w.calorias_estimadas >= 250),
+                key=lambda w: -w.calorias_estimadas
+            )[:3],
+            'ganhar_massa': sorted(
+                (w for w in media_alta if w.duracao_minutos >= 30),
+                key=lambda w: w.intensidade != 'alta'
+            )[:3],
+            'manter': [w for w in self.workouts if w.intensidade == 'media'][:3],
+        }
+        
+        for objetivo, treinos in esperado.items():
+            user = User(nome='Indice', objetivo=objetivo, nivel='intermediario')
+            result = GoalBasedStrategy().recommend(user, self.workouts)
+            assert result.workouts == treinos
+        
+        iniciante = sorted(
+            (
+                w for w in self.workouts
+                if w.intensidade in ['baixa', 'media'] and w.duracao_minutos <= 45
+            ),
+            key=lambda w: (w.intensidade == 'baixa', -w.duracao_minutos),
+            reverse=True
+        )[:3]
+        user = User(nome='Indice', objetivo='manter', nivel='iniciante')
+        assert BeginnerFriendlyStrategy().recommend(user, self.workouts).workouts == iniciante
+    
+    def test_nearest_values_match_sorted_distance(self):
+        """Testa se a busca por proximidade equivale a ordenar pela distância."""
+        for alvo in [-10, 100, 251, 250.5, 317.4, 1000]:
+            esperado = sorted(self.workouts, key=lambda w: abs(w.calorias_estimadas - alvo))
+            
+            posicoes = self.index.mais_proximos('calorias_estimadas', alvo)
+            assert self.index.treinos(posicoes) == esperado
+            
+            posicoes = self.index.mais_proximos('calorias_estimadas', alvo, ['baixa', 'alta'])
+            assert self.index.treinos(posicoes) == [
+                w for w in esperado if w.intensidade in ['baixa', 'alta']
+            ]
+    
+    def test_calorie_strategy_matches_linear_scan(self):
+        """Testa se a estratégia calórica mantém a seleção e o desempate originais."""
+        strategy = CalorieBasedStrategy()
+        
+        for meta in [500.0, 1255.0, 1500.0, 2600.0]:
+            esperado = sorted(
+                self.workouts,
+                key=lambda w: abs(w.calorias_estimadas - meta * 0.2)
+            )[:3]
+            assert strategy._selecionar_treinos_por_calorias(self.workouts, meta) == esperado
+
+
+class MetabolicProfileServiceTest(TestCase):
+    """Testes para o serviço de perfis metabólicos.
+    
+    Valida o memo por versão do perfil, o limite de entradas e a
+    equivalência do cálculo em lote com o individual.
+    """
+    
+    def setUp(self):
+        self.service = MetabolicProfileService(max_size=2)
+        self.users = [
+            User.objects.create(
+                nome=f'Perfil {i}',
+                email=f'perfil{i}@test.com',
+                idade=20 + i * 7,
+                peso=Decimal('60.5') + i * 9,
+                altura=160 + i * 6,
+                objetivo=['emagrecer', 'ganhar_massa', 'manter'][i],
+                nivel='intermediario'
+            )
+            for i in range(3)
+        ]
+    
+    def test_profile_is_memoized_until_user_is_updated(self):
+        """Testa se o perfil é reaproveitado até o usuário ser alterado."""
+        user = self.users[0]
+        perfil = self.service.get_profile(user)
+        
+        assert self.service.get_profile(user) is perfil
+        
+        user.peso = Decimal('90.0')
+        user.save()
+        novo = self.service.get_profile(user)
+        
+        assert novo is not perfil
+        assert novo.tmb > perfil.tmb
+    
+    def test_bulk_profiles_match_individual_calculation(self):
+        """Testa se o cálculo em lote equivale ao cálculo individual."""
+        perfis = self.service.get_profiles(self.users)
+        
+        for user, perfil in zip(self.users, perfis):
+            tmb = calcular_tmb(float(user.peso), user.altura, user.idade)
+            assert perfil.tmb == tmb
+            assert perfil.meta_calorica == calcular_meta_calorica(tmb, user.objetivo)
+        assert len(self.service) == 2
+    
+    def test_bulk_profiles_without_numpy(self):
+        """Testa se o cálculo em lote funciona sem NumPy instalado."""
+        service = MetabolicProfileService()
+        
+        with mock.patch('recommendation.metabolic_profile.np', None):
+            perfis = service.get_profiles(self.users)
+        
+        for user, perfil in zip(self.users, perfis):
+            tmb = calcular_tmb(float(user.peso), user.altura, user.idade)
+            assert perfil.tmb == tmb
+            assert perfil.meta_calorica == calcular_meta_calorica(tmb, user.objetivo)
+    
+    def test_dashboard_exposes_metabolic_profile(self):
+        """Testa se o dashboard exibe a TMB e a meta calórica do usuário."""
+        user = self.users[0]
+        auth_user = AuthUser.objects.create_user('perfil0', user.email, 'senha-123')
+        self.client.force_login(auth_user)
+        
+        response = self.client.get(reverse('recommendation:home'))
+        perfil = response.context['perfil_metabolico']
+        
+        assert perfil == metabolic_profiles.get_profile(user)
+        assert f'{perfil.meta_calorica:.0f} kcal/dia' in response.content.decode()
+
+
+class StrategyRegistryTest(TestCase):
+    """Testes para o registro de estratégias.
+    
+    Valida instâncias únicas, extensão via settings e warm-up das
+    estruturas derivadas do catálogo.
+    """
+    
+    def setUp(self):
+        self.registry = StrategyRegistry(BUILTIN_STRATEGIES, entry_point_group=None)
+    
+    def test_strategies_are_singletons(self):
+        """Testa se a mesma instância é retornada a cada busca."""
+        assert self.registry.get('goal') is self.registry.get('goal')
+        assert self.registry.get_cached('goal') is self.registry.get_cached('goal')
+        assert self.registry.get_cached('goal').strategy is self.registry.get('goal')
+        
+        user = User(nome='Singleton', objetivo='emagrecer', nivel='intermediario')
+        assert (
+            RecommendationStrategyFactory.get_strategy_for_user(user)
+            is RecommendationStrategyFactory.get_strategy_by_name('goal')
+        )
+    
+    def test_package_import_does_not_load_strategies(self):
+        """Testa se importar o pacote não carrega os módulos das estratégias."""
+        codigo = (
+            "import sys, django; django.setup(); "
+            "import recommendation.strategies as pacote; "
+            "print('recommendation.strategies.vectorized_hybrid_strategy' in sys.modules, "
+            "pacote.HybridStrategy.__name__)"
+        )
+        saida = subprocess.run(
+            [sys.executable, '-W', 'ignore', '-c', codigo],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=dict(os.environ, DJANGO_SETTINGS_MODULE='workout_project.settings')
+        ).stdout
+        
+        assert saida.split() == ['False', 'HybridStrategy']
+    
+    def test_unknown_strategy_raises(self):
+        """Testa se nomes desconhecidos geram erro."""
+        with self.assertRaises(KeyError):
+            self.registry.get('inexistente')
+        with self.assertRaises(ValueError):
+            RecommendationStrategyFactory.get_strategy_by_name('inexistente')
+    
+    @override_settings(RECOMMENDATION_STRATEGIES={
+        'calorie_v2': 'recommendation.strategies.calorie_based_strategy.CalorieBasedStrategy'
+    })
+    def test_settings_extend_registry(self):
+        """Testa se estratégias declaradas em settings são registradas."""
+        assert 'calorie_v2' in self.registry.names()
+        assert isinstance(self.registry.get('calorie_v2'), CalorieBasedStrategy)
+    
+    def test_warm_up_builds_catalog_structures(self):
+        """Testa se o warm-up constrói as estruturas antes da requisição."""
+        Workout.objects.create(
+            nome='Remo',
+            descricao='Média intensidade',
+            intensidade='media',
+            duracao_minutos=40,
+            calorias_estimadas=320
+        )
+        catalog = get_catalog()
+        
+        self.registry.warm_up(catalog, ['goal', 'beginner', 'calorie'])
+        
+        def falhar(workouts):
+            raise AssertionError('estrutura reconstruída na requisição')
+        
+        assert isinstance(catalog.derive('catalog_index', falhar), CatalogIndex)
+
+
+class StrategyMetricsTest(TestCase):
+    """Testes para a instrumentação das estratégias.
+    
+    Valida o registro de latência e volume quando habilitada, a ausência
+    de decorators quando desabilitada, o endpoint e o comando de resumo.
+    """
+    
+    def setUp(self):
+        strategy_metrics.reset()
+        self.registry = StrategyRegistry(BUILTIN_STRATEGIES, entry_point_group=None)
+        self.user = User(nome='Metricas', objetivo='emagrecer', nivel='intermediario')
+        self.workouts = [
+            Workout(id=i, nome=f'T{i}', intensidade='alta', duracao_minutos=40,
+                    calorias_estimadas=300 + i)
+            for i in range(1, 6)
+        ]
+    
+    def tearDown(self):
+        strategy_metrics.reset()
+    
+    def test_disabled_metrics_return_plain_strategies(self):
+        """Testa se, desabilitada, a instrumentação não envolve as estratégias."""
+        assert isinstance(self.registry.get('goal'), GoalBasedStrategy)
+    
+    @override_settings(RECOMMENDATION_METRICS_ENABLED=True)
+    def test_enabled_metrics_record_calls(self):
+        """Testa se chamadas instrumentadas geram histogramas por estratégia."""
+        strategy = self.registry.get('goal')
+        strategy.recommend(self.user, self.workouts)
+        strategy.recommend_many([self.user, self.user], self.workouts)
+        
+        resumo = summarize(strategy_metrics.collect())['estrategias']['GoalBasedStrategy']
+        
+        assert strategy.name == 'GoalBasedStrategy'
+        assert resumo['recommend']['chamadas'] == 1
+        assert resumo['recommend']['resultados_medio'] == 3
+        assert resumo['recommend']['catalogo_medio'] == 5
+        assert resumo['recommend_many']['usuarios'] == 2
+    
+    def test_histogram_percentiles_and_merge(self):
+        """Testa percentis estimados e a combinação de histogramas."""
+        histograma = Histogram((1, 10, 100))
+        for valor in [0.5, 5, 5, 50]:
+            histograma.observe(valor)
+        outro = Histogram((1, 10, 100))
+        outro.observe(500)
+        histograma.merge(outro)
+        
+        assert histograma.total == 5
+        assert histograma.percentil(50) == 10
+        assert histograma.percentil(100) == 500
+        assert histograma.minimo == 0.5
+    
+    @override_settings(RECOMMENDATION_METRICS_ENABLED=True)
+    def test_endpoint_and_command_report_metrics(self):
+        """Testa se o endpoint e o comando expõem as métricas e os caches."""
+        self.registry.get_cached('goal').recommend(self.user, self.workouts)
+        
+        staff = AuthUser.objects.create_user('staff', 'staff@test.com', 'senha-123', is_staff=True)
+        self.client.force_login(staff)
+        dados = self.client.get(reverse('recommendation:metrics')).json()
+        
+        assert dados['estrategias']['GoalBasedStrategy (cache)']['recommend']['chamadas'] == 1
+        assert 'recomendacoes_por_coorte' in dados['caches']
+        
+        out = StringIO()
+        call_command('strategy_metrics', stdout=out)
+        assert 'GoalBasedStrategy (cache)' in out.getvalue()
+    
+    def test_processes_publish_to_separate_keys(self):
+        """Testa se snapshots de processos distintos são agregados sem se sobrescrever."""
+        processos = [StrategyMetrics(intervalo_publicacao=60) for _ in range(2)]
+        for metricas in processos:
+            metricas.record('GoalBasedStrategy', 'recommend', 0.001, 5, 3)
+            metricas.publish()
+            metricas.stop()
+        
+        agregado = summarize(processos[0].collect())
+        
+        assert len(agregado['processos']) == 2
+        assert agregado['estrategias']['GoalBasedStrategy']['recommend']['chamadas'] == 2
+    
+    def test_expired_processes_leave_the_aggregate(self):
+        """Testa se snapshots expirados não são somados nem consultados de novo."""
+        antigo = StrategyMetrics(intervalo_publicacao=60)
+        atual = StrategyMetrics(intervalo_publicacao=60)
+        for metricas in (antigo, atual):
+            metricas.record('GoalBasedStrategy', 'recommend', 0.001, 5, 3)
+            metricas.publish()
+            metricas.stop()
+        
+        cache.delete(antigo._chave_do_processo())
+        agregado = summarize(atual.collect())
+        
+        assert len(agregado['processos']) == 1
+        assert agregado['estrategias']['GoalBasedStrategy']['recommend']['chamadas'] == 1
+        assert cache.get(METRICS_FIRST_PROCESS_CACHE_KEY) == atual._indice
+        
+        antigo.publish()
+        assert antigo._indice > atual._indice
+        assert len(atual.collect()['processos']) == 2
+    
+    def test_publication_runs_outside_the_request(self):
+        """Testa se o snapshot é publicado em segundo plano, e não na chamada registrada."""
+        metricas = StrategyMetrics(intervalo_publicacao=0.01)
+        publicado = threading.Event()
+        threads = []
+        
+        def publicar():
+            threads.append(threading.current_thread())
+            publicado.set()
+        
+        with mock.patch.object(metricas, 'publish', side_effect=publicar):
+            metricas.record('GoalBasedStrategy', 'recommend', 0.001, 5, 3)
+            assert publicado.wait(5)
+            metricas.stop()
+        
+        assert threading.current_thread() not in threads
+
+
+class CooccurrenceStrategyTest(TestCase):
+    """Testes para a matriz de coocorrência e a CooccurrenceStrategy.
+    
+    Valida a manutenção incremental da matriz pelos signals do histórico,
+    a equivalência com a reconstrução completa e as recomendações.
+    """
+    
+    def setUp(self):
+        self.workouts = [
+            Workout.objects.create(
+                nome=f'Treino {i}',
+                descricao='Teste',
+                intensidade=['baixa', 'media', 'alta'][i % 3],
+                duracao_minutos=30 + i,
+                calorias_estimadas=200 + i * 10
+            )
+            for i in range(6)
+        ]
+        self.users = [
+            User.objects.create(
+                nome=f'Coocorrencia {i}',
+                email=f'cooc{i}@test.com',
+                idade=30,
+                peso=Decimal('70.0'),
+                altura=175,
+                objetivo='manter',
+                nivel='intermediario'
+            )
+            for i in range(4)
+        ]
+    
+    def _registrar(self, user, workout, dia=1):
+        return History.objects.create(usuario=user, treino=workout, data=f'2024-01-{dia:02d}')
+    
+    def _matriz(self):
+        return {
+            (c.treino_a_id, c.treino_b_id): c.contagem
+            for c in WorkoutCooccurrence.objects.all()
+        }
+    
+    def test_repeated_workout_skips_distinct_scan(self):
+        """Testa se repetir um treino já realizado conta apenas esse treino."""
+        for workout in self.workouts[:3]:
+            self._registrar(self.users[0], workout)
+        matriz = self._matriz()
+        History.objects.bulk_create([
+            History(usuario=self.users[0], treino=self.workouts[0], data=date(2024, 1, 2))
+        ])
+        
+        with CaptureQueriesContext(connection) as consultas:
+            CooccurrenceRepository().add_user_workout(self.users[0].id, self.workouts[0].id)
+        
+        historico = [q['sql'] for q in consultas if History._meta.db_table in q['sql']]
+        assert len(historico) == 1
+        assert 'COUNT' in historico[0]
+        assert self._matriz() == matriz
+    
+    def test_user_changes_are_serialized_by_user_lock(self):
+        """Testa se a atualização incremental trava a linha do usuário antes de contar."""
+        travas = []
+        original = QuerySet.select_for_update
+        
+        def registrar(queryset, **kwargs):
+            travas.append((queryset.model, kwargs))
+            return original(queryset, **kwargs)
+        
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=registrar):
+            self._registrar(self.users[0], self.workouts[0])
+        
+        assert travas == [(User, {'no_key': True})]
+    
+    def test_recent_workouts_limited_in_database(self):
+        """Testa se os treinos recentes são limitados por usuário na própria consulta."""
+        w = self.workouts
+        for dia, workout in enumerate([w[0], w[1], w[1], w[2], w[3]], start=1):
+            self._registrar(self.users[0], workout, dia)
+        for dia, workout in enumerate([w[4], w[5]], start=1):
+            self._registrar(self.users[1], workout, dia)
+        repository = HistoryRepository()
+        
+        with CaptureQueriesContext(connection) as consultas:
+            recentes = repository.recent_workout_ids_by_user(
+                [self.users[0].id, self.users[1].id, self.users[2].id], limit=3
+            )
+        
+        assert recentes == {
+            self.users[0].id: [w[3].id, w[2].id, w[1].id],
+            self.users[1].id: [w[5].id, w[4].id],
+            self.users[2].id: [],
+        }
+        assert len(consultas) == 1
+        assert 'ROW_NUMBER()' in consultas[0]['sql']
+        
+        with CaptureQueriesContext(connection) as consultas:
+            unico = repository.recent_workout_ids_by_user([self.users[0].id], limit=4)
+        assert unico == {self.users[0].id: [w[3].id, w[2].id, w[1].id]}
+        assert 'LIMIT 4' in consultas[0]['sql']
+    
+    def test_incremental_updates_match_rebuild(self):
+        """Testa se inserções, trocas e remoções equivalem à reconstrução."""
+        w = self.workouts
+        self._registrar(self.users[0], w[0])
+        self._registrar(self.users[0], w[1])
+        repetido = self._registrar(self.users[0], w[1], dia=2)
+        self._registrar(self.users[1], w[0])
+        trocado = self._registrar(self.users[1], w[2])
+        self._registrar(self.users[2], w[1])
+        
+        repetido.delete()
+        trocado.treino = w[3]
+        trocado.save()
+        self._registrar(self.users[2], w[3]).delete()
+        
+        incremental = self._matriz()
+        CooccurrenceRepository().rebuild()
+        
+        assert incremental == self._matriz()
+        assert incremental[(w[0].id, w[1].id)] == 1
+        assert incremental[(w[0].id, w[0].id)] == 2
+        assert (w[0].id, w[2].id) not in incremental
+    
+    def test_recommends_workouts_done_by_similar_users(self):
+        """Testa se treinos de usuários com histórico semelhante são priorizados."""
+        w = self.workouts
+        for user in self.users[1:]:
+            self._registrar(user, w[0])
+            self._registrar(user, w[4])
+        self._registrar(self.users[1], w[5])
+        self._registrar(self.users[0], w[0])
+        
+        result = CooccurrenceStrategy().recommend(self.users[0], self.workouts)
+        
+        assert [x.id for x in result.workouts[:2]] == [w[4].id, w[5].id]
+        assert w[0] not in result.workouts
+        assert len(result.workouts) == 3
+        assert 'histórico' in result.reasoning
+    
+    def test_batch_uses_constant_number_of_queries(self):
+        """Testa se o lote consulta histórico e matriz uma única vez."""
+        for user in self.users[2:]:
+            for workout in self.workouts[:5]:
+                self._registrar(user, workout)
+        for user in self.users[:2]:
+            self._registrar(user, self.workouts[0])
+        
+        with self.assertNumQueries(2):
+            results = CooccurrenceStrategy().recommend_many(self.users[:2], self.workouts)
+        
+        assert [len(r.workouts) for r in results] == [3, 3]
+
+
+class _EstrategiaFixa(RecommendationStrategy):
+    """Estratégia de teste que retorna um ranking fixo após um atraso."""
+    
+    def __init__(self, nome, ranking, atraso=0.0):
+        self._nome = nome
+        self.ranking = ranking
+        self.atraso = atraso
+        self.chamadas = 0
+    
+    @property
+    def name(self):
+        return self._nome
+    
+    def recommend(self, user, all_workouts):
+        self.chamadas += 1
+        time.sleep(self.atraso)
+        return RecommendationResult(workouts=list(self.ranking), reasoning=self._nome)
+
+
+class EnsembleStrategyTest(TestCase):
+    """Testes para a EnsembleStrategy.
+    
+    Valida a fusão ponderada dos rankings, o prazo por requisição e o
+    relatório de execução dos membros.
+    """
+    
+    def setUp(self):
+        self.user = User.objects.create(
+            nome='Ensemble',
+            email='ensemble@test.com',
+            idade=30,
+            peso=Decimal('70.0'),
+            altura=175,
+            objetivo='manter',
+            nivel='intermediario'
+        )
+        self.workouts = [
+            Workout.objects.create(
+                nome=f'Treino {i}',
+                descricao='Teste',
+                intensidade=['baixa', 'media', 'alta'][i % 3],
+                duracao_minutos=30 + i,
+                calorias_estimadas=200 + i * 50
+            )
+            for i in range(5)
+        ]
+    
+    def test_weighted_rank_fusion(self):
+        """Testa se a fusão favorece treinos bem ranqueados pelos membros de maior peso."""
+        a, b, c, d, _ = self.workouts
+        ensemble = EnsembleStrategy(membros=[
+            (_EstrategiaFixa('A', [a, b, c]), 1.0),
+            (_EstrategiaFixa('B', [d, b, a]), 3.0),
+        ])
+        
+        result = ensemble.recommend(self.user, self.workouts)
+        
+        assert result.workouts == [b, a, d]
+        assert [m.status for m in result.membros] == ['ok', 'ok']
+        assert all(m.duracao_ms is not None for m in result.membros)
+        assert result.contribuintes == ['A', 'B']
+        self.assertAlmostEqual(sum(m.contribuicao for m in result.membros), 1.0)
+        assert result.membros[1].contribuicao > result.membros[0].contribuicao
+    
+    def test_late_member_is_skipped(self):
+        """Testa se membros fora do prazo são ignorados sem atrasar a resposta."""
+        a, b, c, d, e = self.workouts
+        ensemble = EnsembleStrategy(
+            membros=[
+                (_EstrategiaFixa('Rapida', [a, b, c]), 1.0),
+                (_EstrategiaFixa('Lenta', [d, e, a], atraso=0.5), 10.0),
+            ],
+            prazo_ms=50
+        )
+        
+        inicio = time.perf_counter()
+        result = ensemble.recommend(self.user, self.workouts)
+        
+        assert time.perf_counter() - inicio < 0.4
+        assert result.workouts == [a, b, c]
+        assert [m.status for m in result.membros] == ['ok', 'atrasado']
+        assert result.membros[1].duracao_ms is None
+        assert result.contribuintes == ['Rapida']
+        assert 'Lenta' in result.reasoning
+    
+    def test_waits_for_first_member_when_all_are_late(self):
+        """Testa se, sem nenhum membro no prazo, o primeiro a terminar é usado."""
+        a, b, c, d, e = self.workouts
+        ensemble = EnsembleStrategy(
+            membros=[
+                (_EstrategiaFixa('Media', [a, b, c], atraso=0.05), 1.0),
+                (_EstrategiaFixa('Lenta', [d, e, a], atraso=0.5), 1.0),
+            ],
+            prazo_ms=1,
+            espera_maxima_ms=300
+        )
+        
+        result = ensemble.recommend(self.user, self.workouts)
+        
+        assert result.workouts == [a, b, c]
+        assert [m.status for m in result.membros] == ['ok', 'atrasado']
+    
+    def test_wait_for_first_member_is_bounded(self):
+        """Testa se, sem nenhum membro até a espera máxima, o resultado é vazio."""
+        a, b, c, d, e = self.workouts
+        ensemble = EnsembleStrategy(
+            membros=[
+                (_EstrategiaFixa('Lenta', [a, b, c], atraso=0.5), 1.0),
+                (_EstrategiaFixa('Travada', [d, e, a], atraso=0.5), 1.0),
+            ],
+            prazo_ms=1,
+            espera_maxima_ms=50
+        )
+        
+        inicio = time.perf_counter()
+        result = ensemble.recommend(self.user, self.workouts)
+        
+        assert time.perf_counter() - inicio < 0.4
+        assert result.workouts == []
+        assert [m.status for m in result.membros] == ['atrasado', 'atrasado']
+        assert 'Nenhuma estratégia' in result.reasoning
+    
+    def test_late_member_does_not_block_other_calls(self):
+        """Testa se o atraso de um membro em uma chamada não afeta as seguintes."""
+        a, b, c, d, e = self.workouts
+        lenta = _EstrategiaFixa('Lenta', [d, e, a], atraso=0.3)
+        ensemble = EnsembleStrategy(
+            membros=[(_EstrategiaFixa('Rapida', [a, b, c]), 1.0), (lenta, 1.0)],
+            prazo_ms=20
+        )
+        
+        inicio = time.perf_counter()
+        resultados = [ensemble.recommend(self.user, self.workouts) for _ in range(2)]
+        
+        assert time.perf_counter() - inicio < 0.25
+        assert lenta.chamadas == 2
+        assert all(r.workouts == [a, b, c] for r in resultados)
+        assert all([m.status for m in r.membros] == ['ok', 'atrasado'] for r in resultados)
+    
+    def test_members_release_database_connections(self):
+        """Testa se cada membro libera as conexões da thread ao terminar, mesmo com falha."""
+        a, b, c, _, _ = self.workouts
+        ensemble = EnsembleStrategy(membros=[
+            (_EstrategiaFixa('Ok', [a, b, c]), 1.0),
+            (_EstrategiaFixa('Falha', None), 1.0),
+        ])
+        
+        with mock.patch(
+            'recommendation.strategies.ensemble_strategy.close_old_connections'
+        ) as fechar:
+            result = ensemble.recommend(self.user, self.workouts)
+        
+        assert [m.status for m in result.membros] == ['ok', 'erro']
+        assert fechar.call_count == 2
+    
+    def test_default_members_from_registry(self):
+        """Testa o ensemble padrão (calórica, objetivo e híbrida) pelo registro."""
+        strategy = RecommendationStrategyFactory.get_strategy_by_name('ensemble')
+        
+        results = strategy.recommend_many([self.user, self.user], self.workouts)
+        
+        assert [m.nome for m in results[0].membros] == [
+            'CalorieBasedStrategy', 'GoalBasedStrategy', 'HybridStrategy'
+        ]
+        assert len(results[0].workouts) == 3
+        assert results[0].workouts == results[1].workouts
+
+
+def _score_encadeado(workout, user):
+    """Regra de pontuação híbrida original, por comparações encadeadas."""
+    score = 0.0
+    
+    if user.nivel == 'iniciante':
+        if workout.intensidade == 'baixa':
+            score += 3.0
+        elif workout.intensidade == 'media':
+            score += 1.5
+    elif user.nivel == 'intermediario':
+        if workout.intensidade == 'media':
+            score += 3.0
+        elif workout.intensidade in ['baixa', 'alta']:
+            score += 1.5
+    else:
+        if workout.intensidade == 'alta':
+            score += 3.0
+        elif workout.intensidade == 'media':
+            score += 1.5
+    
+    if user.objetivo == 'emagrecer':
+        score += workout.calorias_estimadas / 100
+    elif user.objetivo == 'ganhar_massa':
+        if workout.intensidade == 'alta':
+            score += 2.0
+    
+    if hasattr(user, 'preferencias'):
+        if workout.duracao_minutos <= 30 and user.preferencias.frequencia_treino_semana >= 5:
+            score += 1.0
+        elif workout.duracao_minutos >= 45 and user.preferencias.frequencia_treino_semana <= 3:
+            score += 1.0
+    
+    return score
+
+
+class ScoringRulesTest(TestCase):
+    """Testes para as regras de pontuação compiladas em tabelas.
+    
+    Valida a paridade com a regra original e a configuração dos pesos.
+    """
+    
+    def setUp(self):
+        self.workouts = [
+            Workout(
+                id=i + 1,
+                nome=f'Treino {i}',
+                descricao='Teste',
+                intensidade=intensidade,
+                duracao_minutos=duracao,
+                calorias_estimadas=150 + i * 37
+            )
+            for i, (intensidade, duracao) in enumerate(
+                (intensidade, duracao)
+                for intensidade in ['baixa', 'media', 'alta', 'extrema']
+                for duracao in [20, 30, 40, 45, 60]
+            )
+        ]
+    
+    def _usuarios(self):
+        for nivel in ['iniciante', 'intermediario', 'avancado', 'elite']:
+            for objetivo in ['emagrecer', 'ganhar_massa', 'manter', 'outro']:
+                yield User(nivel=nivel, objetivo=objetivo)
+                for frequencia in [2, 3, 4, 5, 7]:
+                    user = User(nivel=nivel, objetivo=objetivo)
+                    user.preferencias = Preferences(frequencia_treino_semana=frequencia)
+                    yield user
+    
+    def test_compiled_scores_match_chained_rules(self):
+        """Testa se as tabelas reproduzem exatamente a regra original."""
+        regras = ScoringRules()
+        
+        for user in self._usuarios():
+            pontuar = regras.scorer(user)
+            for workout in self.workouts:
+                assert pontuar(workout) == _score_encadeado(workout, user)
+    
+    @skipIf(np is None, "NumPy não instalado")
+    def test_vectorized_scores_match_compiled_rules(self):
+        """Testa se a pontuação vetorizada usa as mesmas tabelas."""
+        strategy = VectorizedHybridStrategy()
+        colunas = WorkoutColumns.from_workouts(self.workouts)
+        
+        for user in self._usuarios():
+            pontuar = strategy.regras.scorer(user)
+            assert list(strategy._calcular_scores(colunas, user)) == [
+                pontuar(w) for w in self.workouts
+            ]
+    
+    @override_settings(RECOMMENDATION_SCORING_WEIGHTS={
+        'nivel_intensidade': {'iniciante': {'alta': 5.0}},
+        'objetivo_intensidade': {'ganhar_massa': {'alta': 0.0, 'media': 4.0}},
+        'bonus_duracao': 0.5,
+    })
+    def test_weights_are_loaded_from_settings(self):
+        """Testa se os pesos configurados substituem apenas as chaves informadas."""
+        strategy = HybridStrategy()
+        user = User(nivel='iniciante', objetivo='ganhar_massa')
+        user.preferencias = Preferences(frequencia_treino_semana=5)
+        
+        assert strategy.regras.intensity_row('iniciante', 'ganhar_massa') == (
+            3.0, 5.5, 5.0, 0.0
+        )
+        
+        workout = self.workouts[5]
+        assert (workout.intensidade, workout.duracao_minutos) == ('media', 20)
+        assert strategy._calcular_score_workout(workout, user) == 6.0
+
+
+class QueryPushdownTest(TestCase):
+    """Testes para a execução das estratégias no banco.
+    
+    Valida que as consultas declarativas produzem as mesmas recomendações
+    que o catálogo em memória, com uma única consulta limitada.
+    """
+    
+    def setUp(self):
+        rng = random.Random(3)
+        for i in range(60):
+            duracao = rng.choice([20, 30, 40, 45, 60])
+            Workout.objects.create(
+                nome=f'Treino {i}',
+                descricao='Teste',
+                intensidade=rng.choice(['baixa', 'media', 'alta']),
+                duracao_minutos=duracao,
+                calorias_estimadas=rng.choice([150, 250, 300, 400, 520, 600])
+            )
+        self.users = [
+            User.objects.create(
+                nome=f'Pushdown {i}',
+                email=f'pushdown{i}@test.com',
+                idade=25 + i,
+                peso=Decimal('60.0') + i * 5,
+                altura=160 + i * 3,
+                objetivo=objetivo,
+                nivel='intermediario'
+            )
+            for i, objetivo in enumerate(['emagrecer', 'ganhar_massa', 'manter'])
+        ]
+    
+    def test_pushdown_matches_in_memory_recommendations(self):
+        """Testa a paridade das estratégias com e sem execução no banco."""
+        catalog = get_catalog()
+        for strategy in [CalorieBasedStrategy(), GoalBasedStrategy(), BeginnerFriendlyStrategy()]:
+            for user in self.users:
+                esperado = strategy.recommend(user, catalog)
+                
+                with self.assertNumQueries(1):
+                    result = strategy.recommend_from_repository(user, WorkoutRepository())
+                
+                assert result.workouts == esperado.workouts
+                assert result.reasoning == esperado.reasoning
+    
+    def test_queries_are_filtered_ordered_and_limited(self):
+        """Testa a tradução da consulta de emagrecimento em SQL."""
+        consultas = GoalBasedStrategy().query_spec(self.users[0])
+        sql = str(WorkoutRepository()._queryset(consultas[0]).query).upper()
+        
+        assert 'WHERE' in sql and 'IN (' in sql
+        assert '"CALORIAS_ESTIMADAS" >= 250' in sql
+        assert 'ORDER BY "TREINOS"."CALORIAS_ESTIMADAS" DESC' in sql
+        assert 'LIMIT 3' in sql
+    
+    def test_strategies_without_spec_fall_back_to_catalog(self):
+        """Testa se a HybridStrategy continua usando o catálogo em memória."""
+        strategy = HybridStrategy()
+        user = self.users[2]
+        
+        assert strategy.query_spec(user) is None
+        assert strategy.recommend_from_repository(user).workouts == strategy.recommend(
+            user, get_catalog()
+        ).workouts
+    
+    @override_settings(RECOMMENDATION_QUERY_PUSHDOWN=True)
+    def test_dashboard_uses_pushdown(self):
+        """Testa se o dashboard recomenda pelo banco quando habilitado."""
+        auth_user = AuthUser.objects.create_user('pushdown', self.users[0].email, 'senha-123')
+        self.client.force_login(auth_user)
+        
+        response = self.client.get(reverse('recommendation:home'))
+        
+        assert response.status_code == 200
+        assert response.context['workouts'] == GoalBasedStrategy().recommend(
+            self.users[0], get_catalog()
+        ).workouts
+
+
+class _ExecutorImediato:
+    """Executor de teste que roda as tarefas na própria thread."""
+    
+    def submit(self, fn, *args, **kwargs):
+        fn(*args, **kwargs)
+        return True
+
+
+class ShadowEvaluationTest(TestCase):
+    """Testes para a avaliação de estratégias em modo sombra.
+    
+    Valida o descarte de tarefas sob pressão, a gravação das avaliações
+    e a integração com o dashboard.
+    """
+    
+    def setUp(self):
+        self.user = User.objects.create(
+            nome='Sombra',
+            email='sombra@test.com',
+            idade=30,
+            peso=Decimal('70.0'),
+            altura=175,
+            objetivo='emagrecer',
+            nivel='intermediario'
+        )
+        for i in range(6):
+            Workout.objects.create(
+                nome=f'Treino {i}',
+                descricao='Teste',
+                intensidade=['baixa', 'media', 'alta'][i % 3],
+                duracao_minutos=20 + i * 10,
+                calorias_estimadas=200 + i * 60
+            )
+    
+    def test_bounded_executor_drops_work_when_full(self):
+        """Testa se o executor descarta tarefas além do limite em vez de enfileirá-las."""
+        executor = BoundedExecutor(max_workers=1, max_pendentes=1)
+        liberar = threading.Event()
+        executadas = []
+        
+        aceitas = [
+            executor.submit(lambda i=i: (liberar.wait(5), executadas.append(i)))
+            for i in range(4)
+        ]
+        liberar.set()
+        executor.shutdown(wait=True)
+        
+        assert aceitas == [True, True, False, False]
+        assert sorted(executadas) == [0, 1]
+        assert (executor.aceitas, executor.descartadas) == (2, 2)
+    
+    def test_evaluations_are_recorded(self):
+        """Testa se cada estratégia sombra grava resultado, tempo e coincidências."""
+        catalog = get_catalog()
+        primaria = GoalBasedStrategy().recommend(self.user, catalog)
+        evaluator = ShadowEvaluator(_ExecutorImediato(), strategies=['goal', 'hybrid', 'inexistente'])
+        
+        assert evaluator.submit(self.user, catalog, 'GoalBasedStrategy', primaria) == 3
+        
+        avaliacoes = {a.estrategia: a for a in ShadowEvaluation.objects.all()}
+        assert avaliacoes['goal'].coincidentes == 3
+        assert avaliacoes['goal'].treinos_ids == [w.id for w in primaria.workouts]
+        assert avaliacoes['goal'].versao_catalogo == catalog.fingerprint
+        assert avaliacoes['hybrid'].duracao_ms is not None
+        assert avaliacoes['inexistente'].erro.startswith('KeyError')
+        assert avaliacoes['inexistente'].duracao_ms is None
+        
+        out = StringIO()
+        call_command('shadow_report', stdout=out)
+        assert 'hybrid' in out.getvalue()
+    
+    @override_settings(RECOMMENDATION_SHADOW_STRATEGIES=['hybrid'])
+    def test_dashboard_schedules_shadow_strategies(self):
+        """Testa se o dashboard agenda as estratégias sombra após a recomendação primária."""
+        auth_user = AuthUser.objects.create_user('sombra', self.user.email, 'senha-123')
+        self.client.force_login(auth_user)
+        
+        with mock.patch.object(shadow_evaluator, 'executor', _ExecutorImediato()):
+            response = self.client.get(reverse('recommendation:home'))
+        
+        avaliacao = ShadowEvaluation.objects.get()
+        assert avaliacao.estrategia == 'hybrid'
+        assert avaliacao.estrategia_primaria == 'GoalBasedStrategy'
+        assert avaliacao.treinos_primarios_ids == [w.id for w in response.context['workouts']]
+    
+    def test_no_shadow_strategies_by_default(self):
+        """Testa se nada é agendado sem estratégias configuradas."""
+        executor = mock.Mock()
+        
+        assert ShadowEvaluator(executor).submit(self.user, get_catalog(), 'X', mock.Mock()) == 0
+        executor.submit.assert_not_called()
+
+
+class BulkRepositoryTest(TestCase):
+    """Testes para as operações em lote dos repositórios.
+    
+    Valida a quantidade de consultas das operações em lote e a
+    manutenção dos dados derivados (catálogo, matriz de coocorrência e
+    recomendações pré-calculadas) sem os signals por registro.
+    """
+    
+    def setUp(self):
+        self.workouts = WorkoutRepository().bulk_save(
+            Workout(
+                nome=f'Treino {i}',
+                descricao='Teste',
+                intensidade=['baixa', 'media', 'alta'][i % 3],
+                duracao_minutos=30 + i,
+                calorias_estimadas=200 + i * 10
+            )
+            for i in range(5)
+        )
+        self.users = UserRepository().bulk_save(
+            User(
+                nome=f'Lote {i}',
+                email=f'lote{i}@test.com',
+                idade=30,
+                peso=Decimal('70.0'),
+                altura=175,
+                objetivo='manter',
+                nivel='intermediario'
+            )
+            for i in range(3)
+        )
+    
+    def _matriz(self):
+        return {
+            (c.treino_a_id, c.treino_b_id): c.contagem
+            for c in WorkoutCooccurrence.objects.all()
+        }
+    
+    def test_get_many_and_iter_all(self):
+        """Testa a busca por vários IDs e a leitura em blocos."""
+        repository = WorkoutRepository()
+        ids = [self.workouts[0].id, self.workouts[3].id, 0]
+        
+        with self.assertNumQueries(1):
+            encontrados = repository.get_many(ids)
+        assert set(encontrados) == {self.workouts[0].id, self.workouts[3].id}
+        
+        with self.assertNumQueries(1):
+            todos = list(repository.iter_all(batch_size=2))
+        assert [w.id for w in todos] == sorted(w.id for w in self.workouts)
+    
+    def test_bulk_update_sets_auto_now_fields(self):
+        """Testa se bulk_update atualiza os campos auto_now em uma consulta."""
+        users = list(User.objects.order_by('pk'))
+        antes = {user.pk: user.atualizado_em for user in users}
+        for user in users:
+            user.nivel = 'avancado'
+        
+        with CaptureQueriesContext(connection) as consultas:
+            atualizados = UserRepository().bulk_update(users, ['nivel'])
+        
+        assert sum(q['sql'].startswith('UPDATE') for q in consultas) == 1
+        
+        assert atualizados == len(users)
+        for user in User.objects.all():
+            assert user.nivel == 'avancado'
+            assert user.atualizado_em > antes[user.pk]
+    
+    @override_settings(RECOMMENDATION_BULK_BATCH_SIZE=2)
+    def test_batch_size_follows_settings(self):
+        """Testa se o tamanho dos lotes é lido do setting a cada operação."""
+        users = list(User.objects.order_by('pk'))
+        for user in users:
+            user.nivel = 'iniciante'
+        
+        with CaptureQueriesContext(connection) as consultas:
+            UserRepository().bulk_update(users, ['nivel'])
+        
+        assert UserRepository().batch_size == 2
+        assert sum(q['sql'].startswith('UPDATE') for q in consultas) == 2
+    
+    def test_history_bulk_operations_maintain_derived_data(self):
+        """Testa se as operações em lote no histórico equivalem à reconstrução."""
+        w, u = self.workouts, self.users
+        repository = HistoryRepository()
+        PrecomputedRecommendationRepository().upsert_many([
+            PrecomputedRecommendation(
+                usuario=user,
+                treinos_ids=[],
+                justificativa='Teste',
+                estrategia='hybrid',
+                versao_catalogo='v',
+                calculado_em=timezone.now()
+            )
+            for user in u
+        ])
+        
+        registros = repository.bulk_save([
+            History(usuario=u[0], treino=w[0], data='2024-01-01'),
+            History(usuario=u[0], treino=w[1], data='2024-01-02'),
+            History(usuario=u[0], treino=w[1], data='2024-01-03'),
+            History(usuario=u[1], treino=w[0], data='2024-01-01'),
+            History(usuario=u[1], treino=w[2], data='2024-01-02'),
+            History(usuario=u[2], treino=w[3], data='2024-01-01'),
+        ])
+        assert PrecomputedRecommendation.objects.count() == 0
+        
+        registros[4].treino = w[1]
+        registros[5].usuario = u[0]
+        repository.bulk_update(registros[4:], ['treino', 'usuario'])
+        repository.bulk_delete([registros[1].id, registros[3].id])
+        
+        incremental = self._matriz()
+        CooccurrenceRepository().rebuild()
+        assert incremental == self._matriz()
+        assert incremental[(w[1].id, w[3].id)] == 1
+        
+        UserRepository().bulk_delete([u[0].id])
+        incremental = self._matriz()
+        CooccurrenceRepository().rebuild()
+        assert incremental == self._matriz()
+        assert incremental == {(w[1].id, w[1].id): 1}
+    
+    def test_workout_bulk_operations_bump_catalog_once(self):
+        """Testa se as operações em lote em treinos invalidam o catálogo."""
+        versao = get_catalog().version
+        repository = WorkoutRepository()
+        
+        for workout in self.workouts:
+            workout.calorias_estimadas += 50
+        repository.bulk_update(self.workouts, ['calorias_estimadas'])
+        atualizada = get_catalog().version
+        assert atualizada != versao
+        
+        repository.bulk_delete([self.workouts[0].id])
+        assert get_catalog().version != atualizada
+        assert len(get_catalog()) == len(self.workouts) - 1
+
+
+class CachedRepositoryTest(TestCase):
+    """Testes para os repositórios com leitura através do cache.
+    
+    Valida a leitura sem consultas ao banco após a primeira busca, o
+    cache negativo e a invalidação pelos signals dos models.
+    """
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(
+            nome='Cache',
+            email='cache@test.com',
+            idade=30,
+            peso=Decimal('70.0'),
+            altura=175,
+            objetivo='manter',
+            nivel='intermediario'
+        )
+        self.workout = Workout.objects.create(
+            nome='Treino Cache',
+            descricao='Teste',
+            intensidade='media',
+            duracao_minutos=40,
+            calorias_estimadas=300
+        )
+    
+    def test_user_read_through_and_invalidation(self):
+        """Testa a busca por email em cache e a invalidação ao trocar o email."""
+        repository = CachedUserRepository()
+        
+        with self.assertNumQueries(1):
+            repository.get_by_email('cache@test.com')
+        with self.assertNumQueries(0):
+            assert repository.get_by_email('cache@test.com').pk == self.user.pk
+        
+        self.user.email = 'novo@test.com'
+        self.user.save()
+        
+        assert repository.get_by_email('cache@test.com') is None
+        assert repository.get_by_email('novo@test.com').pk == self.user.pk
+    
+    def test_negative_caching(self):
+        """Testa se buscas sem resultado são cacheadas até o model ser criado."""
+        repository = CachedUserRepository()
+        
+        assert repository.get_by_email('ausente@test.com') is None
+        with self.assertNumQueries(0):
+            assert repository.get_by_email('ausente@test.com') is None
+        
+        User.objects.create(
+            nome='Ausente',
+            email='ausente@test.com',
+            idade=25,
+            peso=Decimal('60.0'),
+            altura=165,
+            objetivo='emagrecer',
+            nivel='iniciante'
+        )
+        assert repository.get_by_email('ausente@test.com') is not None
+    
+    def test_workout_invalidation(self):
+        """Testa a invalidação dos treinos por save, delete e operações em lote."""
+        repository = CachedWorkoutRepository()
+        repository.get_by_id(self.workout.id)
+        repository.get_all()
+        
+        with self.assertNumQueries(0):
+            assert repository.get_by_id(self.workout.id).calorias_estimadas == 300
+            assert len(repository.get_all()) == 1
+        
+        self.workout.calorias_estimadas = 350
+        WorkoutRepository().bulk_update([self.workout], ['calorias_estimadas'])
+        assert repository.get_by_id(self.workout.id).calorias_estimadas == 350
+        
+        self.workout.delete()
+        assert repository.get_by_id(self.workout.id) is None
+        assert repository.get_all() == []
+    
+    def test_setting_selects_repository(self):
+        """Testa se o setting alterna entre os repositórios simples e em cache."""
+        assert type(get_user_repository()) is UserRepository
+        assert type(get_workout_repository()) is WorkoutRepository
+        
+        with override_settings(RECOMMENDATION_REPOSITORY_CACHE=True):
+            assert isinstance(get_user_repository(), CachedUserRepository)
+            assert isinstance(get_workout_repository(), CachedWorkoutRepository)
+
+
+class AppUserMiddlewareTest(TestCase):
+    """Testes para o usuário da aplicação resolvido por requisição.
+    
+    Valida a quantidade de consultas de cada view: sessão, usuário
+    autenticado e usuário da aplicação com as preferências, mais as
+    consultas próprias da view.
+    """
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(
+            nome='Middleware',
+            email='middleware@test.com',
+            idade=30,
+            peso=Decimal('70.0'),
+            altura=175,
+            objetivo='manter',
+            nivel='intermediario'
+        )
+        Preferences.objects.create(
+            usuario=self.user,
+            tipo_treino_preferido='cardio',
+            frequencia_treino_semana=3
+        )
+        self.workout = Workout.objects.create(
+            nome='Treino Middleware',
+            descricao='Teste',
+            intensidade='media',
+            duracao_minutos=40,
+            calorias_estimadas=300
+        )
+        self.history = History.objects.create(
+            usuario=self.user, treino=self.workout, data='2024-01-01'
+        )
+        History.objects.create(usuario=self.user, treino=self.workout, data='2024-01-02')
+        
+        auth_user = AuthUser.objects.create_user('middleware', self.user.email, 'senha-123')
+        self.client.force_login(auth_user)
+    
+    def test_views_query_counts(self):
+        """Testa se cada view busca o usuário e as preferências uma única vez."""
+        for url, esperadas in [
+            (reverse('recommendation:profile'), 3),
+            (reverse('recommendation:preferences_edit'), 3),
+            (reverse('recommendation:history'), 5),
+            (reverse('recommendation:history_create'), 4),
+            (reverse('recommendation:history_delete', args=[self.history.id]), 5),
+            (reverse('recommendation:home'), 6),
+        ]:
+            with self.subTest(url=url), self.assertNumQueries(esperadas):
+                assert self.client.get(url).status_code == 200
+    
+    @override_settings(RECOMMENDATION_REPOSITORY_CACHE=True)
+    def test_cached_app_user_skips_database(self):
+        """Testa se o usuário em cache dispensa a consulta ao banco."""
+        self.client.get(reverse('recommendation:profile'))
+        
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('recommendation:profile'))
+        assert response.context['has_preferences']
+    
+    def test_identity_map_reuses_user_within_scope(self):
+        """Testa se buscas repetidas no mesmo escopo consultam o banco uma vez."""
+        repository = UserRepository()
+        
+        with identity_map_scope() as mapa, self.assertNumQueries(1):
+            user = repository.get_by_email_with_preferences(self.user.email)
+            assert repository.get_by_email(self.user.email) is user
+            assert user.preferencias.frequencia_treino_semana == 3
+        assert mapa.hits == 1
+        
+        with self.assertNumQueries(2):
+            repository.get_by_email(self.user.email)
+            repository.get_by_email(self.user.email)
+    
+    def test_plain_lookup_first_still_loads_preferences(self):
+        """Testa se a busca simples antes da busca com preferências não custa uma consulta extra."""
+        repository = UserRepository()
+        
+        with identity_map_scope(), self.assertNumQueries(1):
+            user = repository.get_by_email(self.user.email)
+            assert repository.get_by_email_with_preferences(self.user.email) is user
+            assert user.preferencias.frequencia_treino_semana == 3
+
+
+class HistoryStatsTest(TestCase):
+    """Testes para as estatísticas do histórico calculadas no banco."""
+    
+    def setUp(self):
+        self.user = User.objects.create(
+            nome='Estatisticas',
+            email='stats@test.com',
+            idade=30,
+            peso=Decimal('70.0'),
+            altura=175,
+            objetivo='manter',
+            nivel='intermediario'
+        )
+        self.workouts = [
+            Workout.objects.create(
+                nome=f'Treino {i}',
+                descricao='Teste',
+                intensidade='media',
+                duracao_minutos=30 + i * 10,
+                calorias_estimadas=200 + i * 100
+            )
+            for i in range(2)
+        ]
+        History.objects.create(usuario=self.user, treino=self.workouts[0], data='2024-01-01')
+        History.objects.create(usuario=self.user, treino=self.workouts[1], data='2024-02-01')
+        History.objects.create(usuario=self.user, treino=self.workouts[1], data='2024-03-01')
+        History.objects.create(usuario=self.user, treino=None, data='2024-03-02')
+    
+    def test_stats_for_user_in_single_query(self):
+        """Testa se sessões, minutos e calorias vêm de uma única consulta."""
+        repository = HistoryRepository()
+        
+        with self.assertNumQueries(1):
+            stats = repository.stats_for_user(self.user)
+        
+        assert stats == HistoryStats(sessoes=4, minutos=110, calorias=800)
+        assert repository.stats_for_user(self.user, since=date(2024, 2, 15)) == HistoryStats(
+            sessoes=2, minutos=40, calorias=300
+        )
+    
+    def test_stats_for_user_without_history(self):
+        """Testa se um histórico vazio resulta em zeros."""
+        History.objects.filter(usuario=self.user).delete()
+        
+        assert HistoryRepository().stats_for_user(self.user) == HistoryStats()
+    
+    def test_dashboard_shows_stats(self):
+        """Testa se o dashboard exibe os totais do histórico."""
+        auth_user = AuthUser.objects.create_user('stats', self.user.email, 'senha-123')
+        self.client.force_login(auth_user)
+        
+        response = self.client.get(reverse('recommendation:home'))
+        
+        assert response.context['total_sessions'] == 4
+        assert response.context['total_minutes'] == 110
+        assert response.context['total_calories'] == 800
+
+
+class HistoryPaginationTest(TestCase):
+    """Testes para a paginação do histórico por cursor."""
+    
+    def setUp(self):
+        self.user = User.objects.create(
+            nome='Paginacao',
+            email='paginacao@test.com',
+            idade=30,
+            peso=Decimal('70.0'),
+            altura=175,
+            objetivo='manter',
+            nivel='intermediario'
+        )
+        self.registros = HistoryRepository().bulk_save(
+            History(usuario=self.user, data=date(2024, 1, 1 + i // 3))
+            for i in range(25)
+        )
+    
+    def _percorrer(self, limit):
+        repository = HistoryRepository()
+        paginas, cursor = [], None
+        while True:
+            pagina = repository.get_page_by_user(self.user, limit, cursor)
+            paginas.append(pagina.itens)
+            if not pagina.tem_proxima:
+                return paginas
+            cursor = pagina.proximo_cursor
+    
+    def test_pages_cover_history_in_order(self):
+        """Testa se as páginas percorrem todo o histórico sem repetições."""
+        paginas = self._percorrer(limit=4)
+        
+        ids = [registro.id for pagina in paginas for registro in pagina]
+        esperados = [
+            registro.id
+            for registro in sorted(self.registros, key=lambda r: (r.data, r.id), reverse=True)
+        ]
+        assert ids == esperados
+        assert [len(pagina) for pagina in paginas] == [4] * 6 + [1]
+    
+    def test_later_page_costs_same_as_first(self):
+        """Testa se uma página avançada usa uma única consulta, sem OFFSET."""
+        repository = HistoryRepository()
+        cursor = None
+        for _ in range(4):
+            cursor = repository.get_page_by_user(self.user, 5, cursor).proximo_cursor
+        
+        for pagina_cursor in (None, cursor):
+            with CaptureQueriesContext(connection) as consultas:
+                pagina = repository.get_page_by_user(self.user, 5, pagina_cursor)
+            assert len(consultas) == 1
+            assert 'OFFSET' not in consultas[0]['sql']
+            assert len(pagina.itens) == 5
+    
+    def test_view_caps_limit_and_ignores_invalid_cursor(self):
+        """Testa o limite máximo da página e um cursor inválido na view."""
+        auth_user = AuthUser.objects.create_user('paginacao', self.user.email, 'senha-123')
+        self.client.force_login(auth_user)
+        
+        with override_settings(HISTORY_PAGE_MAX_SIZE=10):
+            response = self.client.get(reverse('recommendation:history'), {'limit': 1000})
+        assert len(response.context['history']) == 10
+        assert response.context['next_cursor']
+        
+        response = self.client.get(
+            reverse('recommendation:history'), 
+            {'limit': 'abc', 'cursor': 'invalido'}
+        )
+        assert len(response.context['history']) == 20
+
+
+class UserStatsTest(TestCase):
+    """Testes para as estatísticas consolidadas do histórico.
+    
+    Valida a manutenção incremental pelos signals do histórico, a
+    sequência de dias consecutivos e a reconstrução pelo comando.
+    """
+    
+    def setUp(self):
+        self.user = User.objects.create(
+            nome='Rollup',
+            email='rollup@test.com',
+            idade=30,
+            peso=Decimal('70.0'),
+            altura=175,
+            objetivo='manter',
+            nivel='intermediario'
+        )
+        self.workouts = [
+            Workout.objects.create(
+                nome=f'Treino {i}',
+                descricao='Teste',
+                intensidade='media',
+                duracao_minutos=30 + i * 10,
+                calorias_estimadas=200 + i * 100
+            )
+            for i in range(2)
+        ]
+    
+    def _registrar(self, dia, workout=None):
+        return History.objects.create(
+            usuario=self.user, 
+            treino=workout or self.workouts[0], 
+            data=date(2024, 1, dia)
+        )
+    
+    def _valores(self):
+        stats = UserStats.objects.get(usuario=self.user)
+        return (
+            stats.sessoes, stats.minutos, stats.calorias, stats.ultimo_treino, stats.sequencia_atual
+        )
+    
+    def test_incremental_updates_match_rebuild(self):
+        """Testa se criações, trocas de treino e remoções equivalem à reconstrução."""
+        for dia in (1, 2, 3, 5):
+            self._registrar(dia)
+        assert self._valores() == (4, 120, 800, date(2024, 1, 5), 1)
+        
+        quarto = self._registrar(4, self.workouts[1])
+        assert self._valores() == (5, 160, 1100, date(2024, 1, 5), 5)
+        
+        quarto.treino = self.workouts[0]
+        quarto.save()
+        History.objects.get(data=date(2024, 1, 5)).delete()
+        
+        incremental = self._valores()
+        assert incremental == (4, 120, 800, date(2024, 1, 4), 4)
+        UserStatsRepository().rebuild_for_users([self.user.id])
+        assert self._valores() == incremental
+    
+    def test_counters_use_atomic_increments(self):
+        """Testa se os totais são somados no banco, sem ler o valor anterior."""
+        self._registrar(1)
+        
+        with CaptureQueriesContext(connection) as consultas:
+            UserStatsRepository().apply_history_change(self.user.id, 1, 30, 200)
+        
+        update = next(q['sql'] for q in consultas if q['sql'].startswith('UPDATE'))
+        assert '"sessoes" = ("estatisticas_usuarios"."sessoes" + 1)' in update
+        assert not any(
+            q['sql'].startswith('SELECT "estatisticas_usuarios"') for q in consultas
+        )
+        assert self._valores()[:3] == (2, 60, 400)
+    
+    def test_first_change_creates_row_once(self):
+        """Testa se apenas quem cria a linha a calcula; os demais somam com UPDATE."""
+        self._registrar(1)
+        UserStats.objects.filter(usuario=self.user).delete()
+        
+        with mock.patch.object(
+            UserStatsRepository, 'rebuild_for_users', autospec=True,
+            side_effect=UserStatsRepository.rebuild_for_users
+        ) as rebuild:
+            self._registrar(2)
+            self._registrar(3)
+        
+        assert rebuild.call_count == 1
+        assert self._valores() == (3, 90, 600, date(2024, 1, 3), 3)
+    
+    def test_bulk_operations_and_rebuild_command(self):
+        """Testa as operações em lote e a correção de divergências pelo comando."""
+        HistoryRepository().bulk_save(
+            History(usuario=self.user, treino=self.workouts[1], data=date(2024, 1, dia))
+            for dia in (1, 2)
+        )
+        assert self._valores() == (2, 80, 600, date(2024, 1, 2), 2)
+        
+        UserStats.objects.filter(usuario=self.user).update(sessoes=99, minutos=0)
+        out = StringIO()
+        call_command('rebuild_user_stats', '--batch-size', '1', stdout=out)
+        
+        assert self._valores() == (2, 80, 600, date(2024, 1, 2), 2)
+        assert 'Estatísticas de 1 usuários' in out.getvalue()
+    
+    def test_workout_changes_rebuild_stats(self):
+        """Testa se editar e remover treinos recalcula as estatísticas dos usuários."""
+        self._registrar(1, self.workouts[0])
+        self._registrar(2, self.workouts[1])
+        
+        def agregado():
+            stats = HistoryRepository().stats_for_user(self.user)
+            return stats.sessoes, stats.minutos, stats.calorias
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.workouts[0].duracao_minutos = 45
+            self.workouts[0].save()
+        assert self._valores()[:3] == agregado() == (2, 85, 500)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.workouts[1].delete()
+        assert self._valores()[:3] == agregado() == (2, 45, 200)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkoutRepository().bulk_delete([self.workouts[0].pk])
+        assert self._valores()[:3] == agregado() == (2, 0, 0)
+    
+    def test_active_streak(self):
+        """Testa se a sequência deixa de contar após um dia sem treino."""
+        self._registrar(1)
+        self._registrar(2)
+        stats = UserStats.objects.get(usuario=self.user)
+        
+        assert stats.sequencia_ativa(hoje=date(2024, 1, 3)) == 2
+        assert stats.sequencia_ativa(hoje=date(2024, 1, 4)) == 0
+
+
+class HistoryRollupTest(TestCase):
+    """Testes para os totais do histórico por semana e por mês.
+    
+    Valida a manutenção incremental pelos signals do histórico, a série
+    densa em uma única consulta, a reconstrução pelo comando e a página
+    de progresso.
+    """
+    
+    def setUp(self):
+        self.user = User.objects.create(
+            nome='Progresso',
+            email='progresso@test.com',
+            idade=30,
+            peso=Decimal('70.0'),
+            altura=175,
+            objetivo='manter',
+            nivel='intermediario'
+        )
+        self.workouts = [
+            Workout.objects.create(
+                nome=f'Treino {i}',
+                descricao='Teste',
+                intensidade='media',
+                duracao_minutos=30 + i * 10,
+                calorias_estimadas=200 + i * 100
+            )
+            for i in range(2)
+        ]
+    
+    def _totais(self, model):
+        return sorted(
+            model.objects.filter(usuario=self.user).values_list('inicio', 'sessoes', 'minutos', 'calorias')
+        )
+    
+    def test_incremental_updates_match_rebuild(self):
+        """Testa se criações, mudanças de data e treino e remoções equivalem à reconstrução."""
+        History.objects.create(usuario=self.user, treino=self.workouts[0], data='2024-01-29')
+        History.objects.create(usuario=self.user, treino=self.workouts[1], data=date(2024, 1, 31))
+        movido = History.objects.create(usuario=self.user, treino=self.workouts[0], data=date(2024, 2, 1))
+        
+        assert self._totais(WeeklyHistoryRollup) == [(date(2024, 1, 29), 3, 100, 700)]
+        assert self._totais(MonthlyHistoryRollup) == [
+            (date(2024, 1, 1), 2, 70, 500),
+            (date(2024, 2, 1), 1, 30, 200),
+        ]
+        
+        movido.data = date(2024, 2, 6)
+        movido.treino = self.workouts[1]
+        movido.save()
+        History.objects.get(data=date(2024, 1, 29)).delete()
+        
+        incremental = (self._totais(WeeklyHistoryRollup), self._totais(MonthlyHistoryRollup))
+        assert incremental == (
+            [(date(2024, 1, 29), 1, 40, 300), (date(2024, 2, 5), 1, 40, 300)],
+            [(date(2024, 1, 1), 1, 40, 300), (date(2024, 2, 1), 1, 40, 300)],
+        )
+        for periodo in ('semana', 'mes'):
+            HistoryRollupRepository(periodo).rebuild_for_users([self.user.id])
+        assert (self._totais(WeeklyHistoryRollup), self._totais(MonthlyHistoryRollup)) == incremental
+    
+    def test_dense_series_in_single_query(self):
+        """Testa se a série preenche os períodos sem treinos com uma única consulta."""
+        History.objects.create(usuario=self.user, treino=self.workouts[0], data=date(2024, 1, 3))
+        History.objects.create(usuario=self.user, treino=self.workouts[1], data=date(2024, 3, 20))
+        repository = HistoryRollupRepository('mes')
+        
+        with self.assertNumQueries(1):
+            serie = repository.series_for_user(self.user, date(2023, 12, 15), date(2024, 3, 31))
+        
+        assert serie == [
+            SeriesPoint(date(2023, 12, 1)),
+            SeriesPoint(date(2024, 1, 1), 1, 30, 200),
+            SeriesPoint(date(2024, 2, 1)),
+            SeriesPoint(date(2024, 3, 1), 1, 40, 300),
+        ]
+        assert len(HistoryRollupRepository('semana').series_for_user(
+            self.user, date(2024, 1, 1), date(2024, 3, 31)
+        )) == 13
+        with self.assertRaises(ValueError):
+            HistoryRollupRepository('dia')
+    
+    def test_bulk_operations_and_rebuild_command(self):
+        """Testa as operações em lote e o backfill pelo comando."""
+        HistoryRepository().bulk_save(
+            History(usuario=self.user, treino=self.workouts[1], data=date(2024, 1, dia))
+            for dia in (1, 8)
+        )
+        assert self._totais(MonthlyHistoryRollup) == [(date(2024, 1, 1), 2, 80, 600)]
+        
+        WeeklyHistoryRollup.objects.all().delete()
+        MonthlyHistoryRollup.objects.filter(usuario=self.user).update(sessoes=99)
+        out = StringIO()
+        call_command('rebuild_history_rollups', '--batch-size', '1', stdout=out)
+        
+        assert self._totais(WeeklyHistoryRollup) == [
+            (date(2024, 1, 1), 1, 40, 300),
+            (date(2024, 1, 8), 1, 40, 300),
+        ]
+        assert self._totais(MonthlyHistoryRollup) == [(date(2024, 1, 1), 2, 80, 600)]
+        assert 'Totais por mes de 1 usuários' in out.getvalue()
+    
+    def test_workout_changes_rebuild_rollups(self):
+        """Testa se editar e remover treinos recalcula os totais por período."""
+        History.objects.create(usuario=self.user, treino=self.workouts[0], data=date(2024, 1, 1))
+        History.objects.create(usuario=self.user, treino=self.workouts[1], data=date(2024, 1, 2))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.workouts[1].calorias_estimadas = 100
+            self.workouts[1].save()
+        assert self._totais(WeeklyHistoryRollup) == [(date(2024, 1, 1), 2, 70, 300)]
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkoutRepository().bulk_delete([self.workouts[0].pk])
+        assert self._totais(WeeklyHistoryRollup) == [(date(2024, 1, 1), 2, 40, 100)]
+        assert self._totais(MonthlyHistoryRollup) == [(date(2024, 1, 1), 2, 40, 100)]
+    
+    def test_progress_view(self):
+        """Testa se a página de progresso exibe a série do período escolhido."""
+        History.objects.create(usuario=self.user, treino=self.workouts[0], data=date.today())
+        auth_user = AuthUser.objects.create_user('progresso', self.user.email, 'senha-123')
+        self.client.force_login(auth_user)
+        
+        response = self.client.get(reverse('recommendation:progress'), {'periodo': 'mes'})
+        
+        assert response.status_code == 200
+        assert response.context['periodo'] == 'mes'
+        assert len(response.context['series']) == 12
+        assert response.context['series'][-1]['percentual'] == 100
+        assert response.context['total_minutos'] == 30
+
+
+class AsyncRepositoryTest(TestCase):
+    """Testes para as variantes assíncronas dos repositórios e do dashboard.
+    
+    Valida se os métodos assíncronos retornam o mesmo que os síncronos,
+    respeitando o mapa de identidade e o cache, e se o dashboard
+    assíncrono monta o mesmo contexto do síncrono.
+    """
+    
+    def setUp(self):
+        self.user = User.objects.create(
+            nome='Async',
+            email='async@test.com',
+            idade=30,
+            peso=Decimal('70.0'),
+            altura=175,
+            objetivo='manter',
+            nivel='intermediario'
+        )
+        self.workouts = [
+            Workout.objects.create(
+                nome=f'Treino {i}',
+                descricao='Teste',
+                intensidade='media',
+                duracao_minutos=30 + i * 10,
+                calorias_estimadas=200 + i * 100
+            )
+            for i in range(2)
+        ]
+        for dia in (1, 2, 3):
+            History.objects.create(
+                usuario=self.user, 
+                treino=self.workouts[dia % 2], 
+                data=date(2024, 1, dia)
+            )
+    
+    async def test_async_variants_match_sync(self):
+        """Testa se as variantes assíncronas retornam o mesmo que as síncronas."""
+        users, workouts, history = UserRepository(), WorkoutRepository(), HistoryRepository()
+        
+        assert await users.aget_by_email(self.user.email) == self.user
+        assert await users.aget_by_email('nao@existe.com') is None
+        assert await users.aget_by_id(self.user.id) == self.user
+        assert await users.afind_by_nivel('intermediario') == [self.user]
+        assert await workouts.aget_all() == self.workouts
+        assert await workouts.aget_by_id(0) is None
+        assert await workouts.afind_by_calorias_range(250, 400) == [self.workouts[1]]
+        assert await history.afind_by_user(self.user) == await sync_to_async(history.find_by_user)(self.user)
+        assert await history.astats_for_user(self.user) == HistoryStats(sessoes=3, minutos=110, calorias=800)
+        
+        primeira = await history.aget_page_by_user(self.user, limit=2)
+        segunda = await history.aget_page_by_user(self.user, limit=2, cursor=primeira.proximo_cursor)
+        assert [h.data.day for h in primeira.itens + segunda.itens] == [3, 2, 1]
+        assert not segunda.tem_proxima
+    
+    def test_async_lookups_use_identity_map_and_cache(self):
+        """Testa se a busca assíncrona por email usa o mapa de identidade e o cache."""
+        buscar = async_to_sync(UserRepository().aget_by_email_with_preferences)
+        with identity_map_scope() as mapa, self.assertNumQueries(1):
+            primeiro = buscar(self.user.email)
+            segundo = buscar(self.user.email)
+        assert primeiro is segundo
+        assert mapa.hits == 1
+        
+        cache.clear()
+        buscar = async_to_sync(CachedUserRepository().aget_by_email)
+        with self.assertNumQueries(1):
+            buscar(self.user.email)
+            cacheado = buscar(self.user.email)
+        assert cacheado == self.user
+    
+    async def test_async_dashboard_matches_sync(self):
+        """Testa se o dashboard assíncrono monta o mesmo contexto do síncrono."""
+        response = await self.async_client.get(reverse('recommendation:home_async'))
+        assert response.status_code == 302
+        assert reverse('recommendation:login') in response.url
+        
+        auth_user = await AuthUser.objects.acreate_user('async', self.user.email, 'senha-123')
+        await self.async_client.aforce_login(auth_user)
+        await sync_to_async(self.client.force_login)(auth_user)
+        
+        assincrono = await self.async_client.get(reverse('recommendation:home_async'))
+        sincrono = await sync_to_async(self.client.get)(reverse('recommendation:home'))
+        
+        assert assincrono.status_code == 200
+        for chave in ('total_sessions', 'total_minutes', 'total_calories', 'reasoning'):
+            assert assincrono.context[chave] == sincrono.context[chave]
+        assert assincrono.context['workouts'] == sincrono.context['workouts']
@@ -5,7 +5,8 @@ from .views import (
     recommendation_controller,
     workout_controller,
     history_controller,
-    preferences_controller
+    preferences_controller,
+    metrics_controller
 )
 
 app_name = 'recommendation'
@@ -17,6 +18,7 @@ urlpatterns = [
     path('delete-account/', auth_controller.delete_account_view, name='delete_account'),
     
     path('', recommendation_controller.dashboard, name='home'),
+    path('async/', recommendation_controller.dashboard_async, name='home_async'),
     
     path('profile/', user_controller.user_profile, name='profile'),
     path('profile/setup/', user_controller.user_setup, name='profile_setup'),
@@ -29,6 +31,9 @@ urlpatterns = [
     path('workouts/<int:workout_id>/', workout_controller.workout_detail, name='workout_detail'),
     
     path('history/', history_controller.user_history, name='history'),
+    path('history/progress/', history_controller.user_progress, name='progress'),
     path('history/create/', history_controller.history_create, name='history_create'),
     path('history/<int:history_id>/delete/', history_controller.history_delete, name='history_delete'),
+    
+    path('metrics/', metrics_controller.strategy_metrics_view, name='metrics'),
 ]
@@ -1,42 +1,109 @@
+from datetime import date, timedelta
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views import View
-from ..repositories import HistoryRepository, UserRepository
+from ..repositories import HistoryRepository, HistoryRollupRepository
 from ..forms import HistoryForm
 
 
 @login_required
 def user_history(request):
-    """Exibe histórico de treinos do usuário autenticado.
+    """Exibe histórico de treinos do usuário autenticado, paginado por cursor.
     
     Args:
-        request: Requisição HTTP do Django com parâmetro opcional 'limit'.
+        request: Requisição HTTP do Django com parâmetros opcionais 'limit'
+            (limitado a ``HISTORY_PAGE_MAX_SIZE``) e 'cursor' (próxima página).
         
     Returns:
         Renderização do template history.html com histórico e estatísticas
         ou redirecionamento se perfil não configurado.
     """
-    user_repository = UserRepository()
     history_repository = HistoryRepository()
     
-    user = user_repository.get_by_email(request.user.email)
+    user = request.app_user
     if not user:
         return redirect('recommendation:profile_setup')
     
-    limit = int(request.GET.get('limit', 20))
-    history = history_repository.get_recent_by_user(user, limit)
-    
-    total_minutos = sum(
-        item.treino.duracao_minutos 
-        for item in history 
-        if item.treino
-    )
+    limit = _page_limit(request.GET.get('limit'))
+    try:
+        page = history_repository.get_page_by_user(user, limit, request.GET.get('cursor') or None)
+    except ValueError:
+        page = history_repository.get_page_by_user(user, limit)
     
     return render(request, 'recommendation/history.html', {
         'user': user,
-        'history': history,
-        'total_minutos': total_minutos
+        'history': page.itens,
+        'next_cursor': page.proximo_cursor,
+        'limit': limit,
+        'total_minutos': history_repository.stats_for_user(user).minutos
+    })
+
+
+def _page_limit(valor) -> int:
+    """Converte o parâmetro 'limit' em tamanho de página válido.
+    
+    Args:
+        valor: Valor recebido na query string, ou None.
+        
+    Returns:
+        Tamanho entre 1 e ``HISTORY_PAGE_MAX_SIZE``; valores ausentes ou
+        inválidos resultam em ``HISTORY_PAGE_SIZE``.
+    """
+    padrao = getattr(settings, 'HISTORY_PAGE_SIZE', 20)
+    maximo = getattr(settings, 'HISTORY_PAGE_MAX_SIZE', 100)
+    try:
+        limit = int(valor) if valor is not None else padrao
+    except ValueError:
+        limit = padrao
+    return min(max(limit, 1), maximo)
+
+
+@login_required
+def user_progress(request):
+    """Exibe a evolução do usuário autenticado por semana ou por mês.
+    
+    Os totais vêm das tabelas de totais por período, com uma consulta
+    para toda a série; períodos sem treinos aparecem zerados.
+    
+    Args:
+        request: Requisição HTTP do Django com parâmetro opcional 'periodo'
+            ('semana' ou 'mes').
+            
+    Returns:
+        Renderização do template progress.html com a série dos últimos
+        ``PROGRESS_PERIODS`` períodos ou redirecionamento se perfil não
+        configurado.
+    """
+    user = request.app_user
+    if not user:
+        return redirect('recommendation:profile_setup')
+    
+    periodo = request.GET.get('periodo')
+    if periodo not in ('semana', 'mes'):
+        periodo = 'semana'
+    rollup_repository = HistoryRollupRepository(periodo)
+    
+    hoje = date.today()
+    quantidade = getattr(settings, 'PROGRESS_PERIODS', 12)
+    inicio = rollup_repository.period_start(hoje)
+    for _ in range(quantidade - 1):
+        inicio = rollup_repository.period_start(inicio - timedelta(days=1))
+    
+    serie = rollup_repository.series_for_user(user, inicio, hoje)
+    maximo = max((ponto.minutos for ponto in serie), default=0)
+    
+    return render(request, 'recommendation/progress.html', {
+        'user': user,
+        'periodo': periodo,
+        'series': [
+            {'ponto': ponto, 'percentual': round(ponto.minutos * 100 / maximo) if maximo else 0}
+            for ponto in serie
+        ],
+        'total_sessoes': sum(ponto.sessoes for ponto in serie),
+        'total_minutos': sum(ponto.minutos for ponto in serie),
+        'total_calorias': sum(ponto.calorias for ponto in serie)
     })
 
 
@@ -51,8 +118,7 @@ def history_create(request):
         Renderização do formulário de criação ou redirecionamento
         após salvamento bem-sucedido.
     """
-    user_repository = UserRepository()
-    user = user_repository.get_by_email(request.user.email)
+    user = request.app_user
     
     if not user:
         return redirect('recommendation:profile_setup')
@@ -88,15 +154,14 @@ def history_delete(request, history_id):
         após exclusão bem-sucedida.
     """
     history_repository = HistoryRepository()
-    user_repository = UserRepository()
     
-    user = user_repository.get_by_email(request.user.email)
+    user = request.app_user
     if not user:
         return redirect('recommendation:profile_setup')
     
     history = history_repository.get_by_id(history_id)
     
-    if not history or history.usuario.id != user.id:
+    if not history or history.usuario_id != user.id:
         return render(request, '404.html', status=404)
     
     if request.method == 'POST':
@@ -0,0 +1,22 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from ..metrics import metrics_enabled, strategy_metrics, summarize
+
+
+@staff_member_required
+def strategy_metrics_view(request):
+    """Exibe as métricas das estratégias de recomendação em JSON.
+    
+    Agrega os snapshots publicados por todos os workers. Com o parâmetro
+    ``?bruto=1``, retorna os histogramas completos em vez do resumo.
+    
+    Args:
+        request: Requisição HTTP do Django.
+        
+    Returns:
+        Resposta JSON com as métricas por estratégia e dos caches.
+    """
+    snapshot = strategy_metrics.collect()
+    dados = snapshot if request.GET.get('bruto') == '1' else summarize(snapshot)
+    dados['habilitado'] = metrics_enabled()
+    return JsonResponse(dados, json_dumps_params={'ensure_ascii': False})
@@ -1,7 +1,6 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from ..repositories import UserRepository
 from ..models import Preferences
 from ..forms import PreferencesForm
 
@@ -17,8 +16,7 @@ def preferences_create(request):
         Renderização do formulário de criação ou redirecionamento
         se preferências já existirem.
     """
-    user_repository = UserRepository()
-    user = user_repository.get_by_email(request.user.email)
+    user = request.app_user
     
     if not user:
         return redirect('recommendation:profile_setup')
@@ -57,8 +55,7 @@ def preferences_edit(request):
         Renderização do formulário de edição ou redirecionamento
         se preferências não existirem.
     """
-    user_repository = UserRepository()
-    user = user_repository.get_by_email(request.user.email)
+    user = request.app_user
     
     if not user:
         return redirect('recommendation:profile_setup')
@@ -1,8 +1,20 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from ..repositories import UserRepository, WorkoutRepository, HistoryRepository
+from django.contrib.auth.views import redirect_to_login
+from ..repositories import (
+    PrecomputedRecommendationRepository,
+    UserStatsRepository
+)
 from ..adapters import WgerWorkoutAdapter
+from ..catalog import get_catalog
+from ..metabolic_profile import metabolic_profiles
+from ..middleware import aget_app_user
 from ..models import Workout
+from ..shadow import shadow_evaluator
+from ..strategies import RecommendationResult, RecommendationStrategyFactory
 
 
 @login_required
@@ -10,53 +22,157 @@ def dashboard(request):
     """Exibe dashboard personalizado com recomendações de treinos.
     
     Busca treinos da API Wger se não houver treinos locais e exibe
-    recomendações baseadas no nível do usuário, além de estatísticas
-    do histórico de treinos.
+    as recomendações da estratégia selecionada para o usuário, servidas
+    a partir do pré-cálculo quando disponível, além de estatísticas do
+    histórico de treinos.
     
     Args:
         request: Requisição HTTP do Django.
         
     Returns:
         Renderização do template dashboard.html com dados do usuário,
-        treinos recomendados e estatísticas.
+        perfil metabólico, treinos recomendados e estatísticas.
     """
-    user_repository = UserRepository()
-    workout_repository = WorkoutRepository()
-    history_repository = HistoryRepository()
-    wger_adapter = WgerWorkoutAdapter()
-    
-    try:
-        user = user_repository.get_by_email(request.user.email)
-        if not user:
-            return redirect('recommendation:profile_setup')
-    except:
+    user = request.app_user
+    if not user:
         return redirect('recommendation:profile_setup')
     
-    all_workouts = workout_repository.get_all()
+    all_workouts = _get_or_fetch_catalog()
+    stats = UserStatsRepository().get_or_build_for_user(user)
+    precomputed = PrecomputedRecommendationRepository().get_by_user(user)
+    
+    recommendation = _get_recommendation(user, all_workouts, precomputed)
+    
+    return render(
+        request, 
+        'recommendation/dashboard.html', 
+        _dashboard_context(user, all_workouts, stats, recommendation)
+    )
+
+
+async def dashboard_async(request):
+    """Versão assíncrona do dashboard, para implantação via ASGI.
+    
+    As consultas independentes (catálogo, estatísticas e recomendação
+    pré-calculada) são agrupadas com ``asyncio.gather``, mas não executam
+    em paralelo: os métodos assíncronos do ORM do Django rodam via
+    ``sync_to_async(thread_sensitive=True)``, isto é, uma após a outra na
+    mesma thread e conexão. O ganho em relação à view síncrona é não
+    ocupar uma thread do servidor enquanto a requisição espera. A execução
+    da estratégia, que pode consultar o banco e agendar o modo sombra,
+    também roda nessa thread.
+    
+    Args:
+        request: Requisição HTTP do Django.
+        
+    Returns:
+        Renderização do template dashboard.html, com o mesmo contexto do
+        dashboard síncrono.
+    """
+    auth_user = await request.auser()
+    if not auth_user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    
+    user = await aget_app_user(request)
+    if not user:
+        return redirect('recommendation:profile_setup')
+    
+    all_workouts, stats, precomputed = await asyncio.gather(
+        sync_to_async(_get_or_fetch_catalog)(),
+        UserStatsRepository().aget_or_build_for_user(user),
+        PrecomputedRecommendationRepository().aget_by_user(user)
+    )
+    
+    recommendation = await sync_to_async(_get_recommendation)(user, all_workouts, precomputed)
+    
+    return render(
+        request, 
+        'recommendation/dashboard.html', 
+        _dashboard_context(user, all_workouts, stats, recommendation)
+    )
+
+
+def _get_or_fetch_catalog():
+    """Retorna o catálogo, buscando treinos da API Wger se estiver vazio."""
+    all_workouts = get_catalog()
     if not all_workouts:
-        fetched = wger_adapter.fetch_workouts()
+        fetched = WgerWorkoutAdapter().fetch_workouts()
         for workout in fetched:
             if not Workout.objects.filter(nome=workout.nome).exists():
                 workout.save()
-        all_workouts = workout_repository.get_all()
-    history = history_repository.find_by_user(user)
-    
-    workouts_by_level = {
-        'iniciante': [w for w in all_workouts if w.intensidade == 'baixa'],
-        'intermediario': [w for w in all_workouts if w.intensidade == 'media'],
-        'avancado': [w for w in all_workouts if w.intensidade == 'alta']
+        all_workouts = get_catalog()
+    return all_workouts
+
+
+def _dashboard_context(user, all_workouts, stats, recommendation) -> dict:
+    """Monta o contexto do template do dashboard."""
+    return {
+        'user': user,
+        'workouts': recommendation.workouts,
+        'reasoning': recommendation.reasoning,
+        'perfil_metabolico': metabolic_profiles.get_profile(user),
+        'all_workouts': all_workouts,
+        'total_sessions': stats.sessoes,
+        'total_minutes': stats.minutos,
+        'total_calories': stats.calorias,
+        'current_streak': stats.sequencia_ativa()
     }
+
+
+def _get_recommendation(user, all_workouts, precomputed) -> RecommendationResult:
+    """Obtém a recomendação do usuário, priorizando a pré-calculada.
     
-    recommended_workouts = workouts_by_level.get(user.nivel, all_workouts)[:6]
-    total_sessions = len(history)
-    total_minutes = sum(item.treino.duracao_minutos for item in history if item.treino)
-    total_calories = sum(item.treino.calorias_estimadas for item in history if item.treino)
+    A recomendação pré-calculada só é usada se foi gerada sobre o catálogo
+    atual e depois da última alteração do perfil e das preferências; caso
+    contrário, a estratégia é executada na requisição. Com o setting
+    ``RECOMMENDATION_QUERY_PUSHDOWN``, os candidatos são filtrados e
+    limitados no banco em vez de no snapshot do catálogo. As estratégias
+    em modo sombra são agendadas em segundo plano sem atrasar a resposta.
     
-    return render(request, 'recommendation/dashboard.html', {
-        'user': user,
-        'workouts': recommended_workouts,
-        'all_workouts': all_workouts,
-        'total_sessions': total_sessions,
-        'total_minutes': total_minutes,
-        'total_calories': total_calories
-    })
+    Args:
+        user: Usuário autenticado.
+        all_workouts: Snapshot do catálogo de treinos.
+        precomputed: Recomendação pré-calculada do usuário, ou None.
+        
+    Returns:
+        Resultado com treinos recomendados e justificativa.
+    """
+    if precomputed and _is_precomputed_fresh(precomputed, user, all_workouts):
+        result = RecommendationResult(
+            workouts=[all_workouts.by_id[i] for i in precomputed.treinos_ids],
+            reasoning=precomputed.justificativa
+        )
+        estrategia = precomputed.estrategia
+    else:
+        strategy = RecommendationStrategyFactory.get_strategy_for_user(user, cached=True)
+        if getattr(settings, 'RECOMMENDATION_QUERY_PUSHDOWN', False):
+            result = strategy.recommend_from_repository(user)
+        else:
+            result = strategy.recommend(user, all_workouts)
+        estrategia = strategy.name
+    
+    shadow_evaluator.submit(user, all_workouts, estrategia, result)
+    return result
+
+
+def _is_precomputed_fresh(precomputed, user, all_workouts) -> bool:
+    """Verifica se a recomendação pré-calculada ainda é válida.
+    
+    Args:
+        precomputed: Recomendação pré-calculada do usuário.
+        user: Usuário autenticado.
+        all_workouts: Snapshot do catálogo de treinos.
+        
+    Returns:
+        True se a recomendação reflete o catálogo e o perfil atuais.
+    """
+    if precomputed.versao_catalogo != all_workouts.fingerprint:
+        return False
+    
+    if user.atualizado_em > precomputed.calculado_em:
+        return False
+    
+    if hasattr(user, 'preferencias') and user.preferencias.atualizado_em > precomputed.calculado_em:
+        return False
+    
+    return True
@@ -1,7 +1,6 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from ..repositories import UserRepository
 from ..forms import UserForm
 
 
@@ -16,13 +15,8 @@ def user_profile(request):
         Renderização do template user_profile.html ou redirecionamento
         para configuração de perfil se não existir.
     """
-    user_repository = UserRepository()
-    
-    try:
-        app_user = user_repository.get_by_email(request.user.email)
-        if not app_user:
-            return redirect('recommendation:profile_setup')
-    except:
+    app_user = request.app_user
+    if not app_user:
         return redirect('recommendation:profile_setup')
     
     return render(request, 'recommendation/user_profile.html', {
@@ -42,14 +36,8 @@ def user_setup(request):
         Renderização do formulário de configuração ou redirecionamento
         após salvamento bem-sucedido.
     """
-    user_repository = UserRepository()
-    
-    try:
-        existing_user = user_repository.get_by_email(request.user.email)
-        if existing_user:
-            return redirect('recommendation:profile')
-    except:
-        pass
+    if request.app_user:
+        return redirect('recommendation:profile')
     
     if request.method == 'POST':
         form = UserForm(request.POST)
@@ -85,8 +73,7 @@ def user_edit(request):
         Renderização do formulário de edição ou redirecionamento
         após atualização bem-sucedida.
     """
-    user_repository = UserRepository()
-    app_user = user_repository.get_by_email(request.user.email)
+    app_user = request.app_user
     
     if not app_user:
         return redirect('recommendation:profile_setup')
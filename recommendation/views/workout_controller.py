@@ -1,7 +1,8 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.views import View
-from ..repositories import WorkoutRepository
+from ..repositories import get_workout_repository
+from ..catalog import get_catalog
 
 
 @login_required
@@ -14,8 +15,7 @@ def workout_list(request):
     Returns:
         Renderização do template workout_list.html com lista de treinos.
     """
-    workout_repository = WorkoutRepository()
-    workouts = workout_repository.get_all()
+    workouts = get_catalog()
     
     return render(request, 'recommendation/workout_list.html', {
         'workouts': workouts
@@ -34,7 +34,7 @@ def workout_detail(request, workout_id):
         Renderização do template workout_detail.html ou página 404
         se treino não encontrado.
     """
-    workout_repository = WorkoutRepository()
+    workout_repository = get_workout_repository()
     workout = workout_repository.get_by_id(workout_id)
     
     if not workout:
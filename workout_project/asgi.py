@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "workout_project.settings")
 
 application = get_asgi_application()
+
+from recommendation.strategies.registry import warm_up_strategies  # noqa: E402
+
+warm_up_strategies()
@@ -46,6 +46,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "recommendation.middleware.AppUserMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -95,6 +96,89 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Um backend compartilhado (Redis) permite que todos os workers convirjam
+# para a mesma versão do catálogo de treinos.
+
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+
+
+# Métricas das estratégias de recomendação
+# Desabilitadas por padrão; quando habilitadas, latência e volume de cada
+# estratégia ficam disponíveis em /metrics/ e no comando strategy_metrics.
+
+RECOMMENDATION_METRICS_ENABLED = os.getenv("RECOMMENDATION_METRICS_ENABLED") == "1"
+
+
+# Ensemble de estratégias
+# Prazo por requisição para os membros do ensemble, espera máxima pelo
+# primeiro membro quando nenhum responde no prazo e tamanho do pool de
+# threads compartilhado que os executa.
+
+RECOMMENDATION_ENSEMBLE_DEADLINE_MS = float(os.getenv("RECOMMENDATION_ENSEMBLE_DEADLINE_MS", "200"))
+RECOMMENDATION_ENSEMBLE_MAX_WAIT_MS = float(os.getenv("RECOMMENDATION_ENSEMBLE_MAX_WAIT_MS", "1000"))
+RECOMMENDATION_ENSEMBLE_WORKERS = int(os.getenv("RECOMMENDATION_ENSEMBLE_WORKERS", "8"))
+
+
+# Execução das estratégias no banco
+# Quando habilitada, as estratégias que descrevem seus candidatos como
+# consultas declarativas filtram, ordenam e limitam os treinos no banco.
+
+RECOMMENDATION_QUERY_PUSHDOWN = os.getenv("RECOMMENDATION_QUERY_PUSHDOWN") == "1"
+
+
+# Avaliação de estratégias em modo sombra
+# Estratégias candidatas (nomes do registro, separados por vírgula) executadas
+# em segundo plano a cada recomendação do dashboard. Tarefas além da fila
+# são descartadas.
+
+RECOMMENDATION_SHADOW_STRATEGIES = [
+    nome for nome in os.getenv("RECOMMENDATION_SHADOW_STRATEGIES", "").split(",") if nome
+]
+RECOMMENDATION_SHADOW_WORKERS = int(os.getenv("RECOMMENDATION_SHADOW_WORKERS", "2"))
+RECOMMENDATION_SHADOW_QUEUE_SIZE = int(os.getenv("RECOMMENDATION_SHADOW_QUEUE_SIZE", "100"))
+
+
+# Operações em lote nos repositórios
+# Quantidade padrão de linhas por comando nas operações em lote e por bloco
+# lido do cursor em ``iter_all``.
+
+RECOMMENDATION_BULK_BATCH_SIZE = int(os.getenv("RECOMMENDATION_BULK_BATCH_SIZE", "1000"))
+
+
+# Cache dos repositórios
+# Quando habilitado, as views buscam usuários por email e treinos por ID
+# através do cache (Django cache framework). Os TTLs, em segundos, valem
+# para resultados encontrados e para buscas sem resultado (cache negativo).
+
+RECOMMENDATION_REPOSITORY_CACHE = os.getenv("RECOMMENDATION_REPOSITORY_CACHE") == "1"
+RECOMMENDATION_REPOSITORY_CACHE_TTL = int(os.getenv("RECOMMENDATION_REPOSITORY_CACHE_TTL", "300"))
+RECOMMENDATION_REPOSITORY_CACHE_MISS_TTL = int(
+    os.getenv("RECOMMENDATION_REPOSITORY_CACHE_MISS_TTL", "30")
+)
+
+
+# Paginação do histórico
+# Tamanho padrão das páginas do histórico e limite máximo aceito no
+# parâmetro ``limit``.
+
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "20"))
+HISTORY_PAGE_MAX_SIZE = int(os.getenv("HISTORY_PAGE_MAX_SIZE", "100"))
+
+
+# Progresso
+# Quantidade de semanas ou meses exibidos na página de progresso.
+
+PROGRESS_PERIODS = int(os.getenv("PROGRESS_PERIODS", "12"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
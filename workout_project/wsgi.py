@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "workout_project.settings")
 
 application = get_wsgi_application()
+
+from recommendation.strategies.registry import warm_up_strategies  # noqa: E402
+
+warm_up_strategies()